@@ -0,0 +1,92 @@
+"""
+Offline benchmark of a full Agent.run.
+
+Serves the LLM responses recorded with LLM_CACHE_MODE=record from the local
+stand-in server, so a task replays the same actions without API calls or
+rate limits, with either a fixed latency or the latency each call originally
+took. Reports wall time, steps, LLM latency (p50/p95/mean) and how many
+requests the recording did not cover.
+
+Only timestamps are normalized out of the cache key (see
+llm.response_cache.cache_key): a page whose elements or text differ from the
+recording, e.g. a live site with rotating content, misses the cache from that
+step on. Replay against pages that render the same every time.
+
+Record once:
+    LLM_CACHE_MODE=record python main.py --task "..."
+Then replay:
+    python -m benchmarks.agent_replay "..." [--cache-dir llm_cache]
+        [--latency 0.5 | --recorded-latency] [--stream] [--output replay.json]
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from benchmarks.vision_pipeline import peak_rss_mb, summarize
+from config.settings import load_settings
+from core.agent import Agent
+from llm.response_cache import ResponseCache
+from llm.standin_server import StandInServer
+
+
+async def run_replay(task, settings, cache, latency_s=0.0, recorded_latency=False, max_steps=None):
+    """Run the task against the stand-in serving cache and return the report."""
+    server = StandInServer(respond=cache.responder(recorded_latency), latency_s=latency_s).start()
+    # The stand-in serves the recording; the client itself must not cache again, and
+    # there is no API quota to protect, so the rate limiter must not skew wall time
+    settings.llm = settings.llm.model_copy(update={
+        "api_url": server.url, "cache_mode": "passthrough", "requests_per_minute": 0, "tokens_per_minute": 0,
+    })
+    agent = Agent(task, settings)
+    start = time.perf_counter()
+    try:
+        history = await agent.run(max_steps=max_steps or settings.max_steps)
+    finally:
+        await agent.browser.close()
+        server.stop()
+
+    timings = agent.llm_timings
+    return {
+        "task": task,
+        "wall_s": round(time.perf_counter() - start, 3),
+        "steps": agent.n_steps,
+        "done": agent.state.is_done(),
+        "actions": sum(len(entry.get("action_results") or []) for entry in history if isinstance(entry, dict)),
+        "llm": {
+            key: summarize([t[key] * 1000 for t in timings if key in t])
+            for key in ("total_s", "first_action_s", "queue_wait_s")
+        },
+        "standin": server.stats,
+        "cache": cache.get_stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded agent run offline")
+    parser.add_argument("task", help="Task text, exactly as it was recorded")
+    parser.add_argument("--cache-dir", help="Recorded LLM responses (default: LLM_CACHE_DIR)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixed seconds added to each response")
+    parser.add_argument("--recorded-latency", action="store_true", help="Replay each call's recorded latency")
+    parser.add_argument("--stream", action="store_true", help="Stream responses and act as actions arrive")
+    parser.add_argument("--max-steps", type=int, help="Step limit (default: MAX_STEPS)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    if args.stream:
+        settings.llm = settings.llm.model_copy(update={"stream": True})
+    cache = ResponseCache(args.cache_dir or settings.llm.cache_dir)
+    report = await run_replay(args.task, settings, cache, args.latency, args.recorded_latency, args.max_steps)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"Wrote {args.output}")
+    print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+Benchmark for the clickable-element extraction script.
+
+Renders generated pages of roughly 10k and 50k elements in headless Chromium
+and times the original querySelectorAll/getXPath script against the current
+single-pass extraction, both as a full scan and as an incremental pass after a
+small DOM change. The XPaths of both scripts are compared so a speedup cannot
+come from a behaviour change.
+
+Usage:
+    python -m benchmarks.dom_extraction [--sizes 10000 50000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from playwright.async_api import async_playwright
+
+from core.browser import EXTRACT_ELEMENTS_JS
+
+# The extraction script as it was before the single-pass rewrite
+LEGACY_EXTRACT_JS = """
+() => {
+    const interactiveElements = [];
+    const interactiveTags = ['a', 'button', 'input', 'select', 'textarea', 'label'];
+    const allElements = document.querySelectorAll('*');
+
+    let index = 0;
+    for (const el of allElements) {
+        const tagName = el.tagName.toLowerCase();
+        const isInteractive =
+            interactiveTags.includes(tagName) ||
+            el.hasAttribute('role') ||
+            el.hasAttribute('tabindex') ||
+            el.hasAttribute('onclick') ||
+            el.hasAttribute('aria-label');
+
+        if (isInteractive) {
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) {
+                const style = window.getComputedStyle(el);
+                if (style.display !== 'none' && style.visibility !== 'hidden') {
+                    interactiveElements.push({
+                        index: index++,
+                        tagName: tagName,
+                        text: el.textContent.trim().substring(0, 100),
+                        attributes: {
+                            id: el.id || null,
+                            class: el.className || null,
+                            type: el.type || null,
+                            name: el.name || null,
+                            role: el.getAttribute('role') || null,
+                            'aria-label': el.getAttribute('aria-label') || null,
+                            placeholder: el.getAttribute('placeholder') || null,
+                            value: el.value || null
+                        },
+                        rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
+                        xpath: getXPath(el)
+                    });
+                }
+            }
+        }
+    }
+
+    function getXPath(element) {
+        if (element.id) return `//*[@id="${element.id}"]`;
+
+        const paths = [];
+        for (; element && element.nodeType === Node.ELEMENT_NODE; element = element.parentNode) {
+            let currentPath = element.tagName.toLowerCase();
+            const siblings = Array.from(element.parentNode?.children || [])
+                .filter(e => e.tagName === element.tagName);
+
+            if (siblings.length > 1) {
+                const index = siblings.indexOf(element) + 1;
+                currentPath += `[${index}]`;
+            }
+
+            paths.unshift(currentPath);
+        }
+
+        return '/' + paths.join('/');
+    }
+
+    return interactiveElements;
+}
+"""
+
+# Appends a handful of buttons to one list so the incremental pass has work to do
+MUTATE_JS = """
+() => {
+    const lists = document.querySelectorAll('ul');
+    const list = lists[Math.floor(lists.length / 2)];
+    for (let i = 0; i < 5; i++) {
+        const item = document.createElement('li');
+        item.innerHTML = '<button>Added ' + i + '</button>';
+        list.appendChild(item);
+    }
+}
+"""
+
+
+def generate_page(node_count, seed=0):
+    """
+    Generate an HTML page with about node_count elements mixing deep nesting
+    and wide sibling lists, with roughly one element in eight interactive.
+    """
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Benchmark</title></head><body>"]
+    emitted = 0
+    section = 0
+
+    while emitted < node_count:
+        section += 1
+        depth = rng.randint(3, 25)
+        parts.append(f'<section class="s{section}">' + "<div>" * depth)
+        emitted += depth + 1
+
+        width = rng.randint(5, 200)
+        parts.append("<ul>")
+        for i in range(width):
+            kind = rng.random()
+            if kind < 0.08:
+                parts.append(f'<li><a href="#{section}-{i}">Link {i}</a></li>')
+            elif kind < 0.12:
+                parts.append(f'<li><button type="button">Button {i}</button></li>')
+            elif kind < 0.14:
+                parts.append(f'<li><input name="f{section}-{i}" placeholder="Field {i}"></li>')
+            elif kind < 0.15:
+                parts.append(f'<li id="item-{section}-{i}" role="option">Option {i}</li>')
+            else:
+                parts.append(f"<li><span>Item {i}</span></li>")
+            emitted += 2
+        parts.append("</ul>" + "</div>" * depth + "</section>")
+        emitted += 1
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+async def time_script(page, script, arg, repeat):
+    """Run a script repeat times and return the median wall time in ms and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await page.evaluate(script, arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def benchmark_size(page, node_count, repeat):
+    await page.set_content(generate_page(node_count))
+    element_count = await page.evaluate("() => document.getElementsByTagName('*').length")
+
+    legacy_ms, legacy = await time_script(page, LEGACY_EXTRACT_JS, None, repeat)
+    full_options = {"incremental": False, "maxDirty": 200}
+    full_ms, current = await time_script(page, EXTRACT_ELEMENTS_JS, full_options, repeat)
+
+    mismatches = sum(
+        1 for old, new in zip(legacy, current["elements"]) if old["xpath"] != new["xpath"]
+    )
+    if len(legacy) != len(current["elements"]):
+        mismatches += abs(len(legacy) - len(current["elements"]))
+
+    incremental_timings = []
+    for _ in range(repeat):
+        await page.evaluate(MUTATE_JS)
+        start = time.perf_counter()
+        await page.evaluate(EXTRACT_ELEMENTS_JS, {"incremental": True, "maxDirty": 200})
+        incremental_timings.append((time.perf_counter() - start) * 1000)
+    incremental_ms = statistics.median(incremental_timings)
+
+    return {
+        "nodes": element_count,
+        "interactive": len(legacy),
+        "legacy_ms": legacy_ms,
+        "full_ms": full_ms,
+        "incremental_ms": incremental_ms,
+        "xpath_mismatches": mismatches,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark clickable-element extraction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000],
+                        help="Approximate element counts of the generated pages")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per measurement; the median is reported")
+    args = parser.parse_args()
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page(viewport={"width": 1280, "height": 800})
+
+        print(f"{'nodes':>8} {'interactive':>12} {'legacy ms':>10} {'full ms':>9} "
+              f"{'speedup':>8} {'incr ms':>8} {'mismatch':>9}")
+        for size in args.sizes:
+            row = await benchmark_size(page, size, args.repeat)
+            speedup = row["legacy_ms"] / row["full_ms"] if row["full_ms"] else float("inf")
+            print(f"{row['nodes']:>8} {row['interactive']:>12} {row['legacy_ms']:>10.1f} "
+                  f"{row['full_ms']:>9.1f} {speedup:>7.1f}x {row['incremental_ms']:>8.1f} "
+                  f"{row['xpath_mismatches']:>9}")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,281 @@
+"""
+Benchmark for the vision pipeline.
+
+Renders a fixed corpus of synthetic screenshots (navigation bars, buttons,
+form fields, paragraphs, photos and canvas text) with OpenCV, encodes them as
+PNG like Playwright does, and times each stage over the corpus:
+
+    decode      decode_screenshot on the encoded bytes
+    detection   YoloDetector.detect
+    ocr         OCRProcessor.recognize
+    formatting  MessageManager._format_vision_results on the stage outputs
+    end_to_end  VisionProcessor.process with the result cache and frame reuse off
+
+Every stage is reported as p50/p95/mean in milliseconds, along with model
+load and warmup time and peak RSS. The report is written as JSON so runs on
+different backends or releases can be compared. A stage whose model cannot be
+loaded is reported with its error instead of timings.
+
+The corpus is generated from a seed, so it is identical across runs; with
+--corpus-dir it is also written to (or, if present, read from) disk.
+
+Usage:
+    python -m benchmarks.vision_pipeline [--frames 20] [--repeat 3]
+        [--backend torch|onnx|openvino] [--imgsz 640] [--int8]
+        [--corpus-dir benchmarks/corpus] [--output vision_bench.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config.settings import load_settings
+from core.message_manager import MessageManager
+from vision.model_registry import get_model_registry
+from vision.vision_processor import VisionProcessor, decode_screenshot
+
+WORDS = ("search", "account", "settings", "checkout", "pricing", "docs", "about", "contact",
+         "download", "results", "orders", "filter", "sort", "help", "profile", "cart")
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def render_screenshot(seed, width=1280, height=800):
+    """
+    Render one synthetic page screenshot. Returns the PNG bytes and the
+    clickable elements the DOM would report for it, with rects in CSS pixels.
+    """
+    rng = random.Random(seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    elements = []
+    font = cv2.FONT_HERSHEY_SIMPLEX
+
+    def clickable(tag, text, x, y, w, h, fill, color=(0, 0, 0)):
+        cv2.rectangle(image, (x, y), (x + w, y + h), fill, -1)
+        if text:
+            cv2.putText(image, text, (x + 8, y + h - 12), font, 0.6, color, 1, cv2.LINE_AA)
+        elements.append({
+            "index": len(elements),
+            "tagName": tag,
+            "text": text,
+            "attributes": {},
+            "rect": {"x": x, "y": y, "width": w, "height": h},
+        })
+
+    # Navigation bar
+    cv2.rectangle(image, (0, 0), (width, 56), (40, 40, 40), -1)
+    x = 16
+    for _ in range(rng.randint(4, 7)):
+        text = rng.choice(WORDS).capitalize()
+        clickable("a", text, x, 12, 24 + 12 * len(text), 32, (40, 40, 40), (255, 255, 255))
+        x += 40 + 12 * len(text)
+
+    # Search field and button
+    clickable("input", "", width - 420, 12, 280, 32, (255, 255, 255))
+    clickable("button", "Search", width - 130, 12, 110, 32, (200, 120, 30), (255, 255, 255))
+
+    # Content: paragraphs, buttons, photos and a canvas with drawn text
+    y = 80
+    while y < height - 60:
+        kind = rng.random()
+        if kind < 0.4:
+            for _ in range(rng.randint(2, 5)):
+                cv2.putText(image, _sentence(rng, rng.randint(5, 12)), (32, y + 20), font, 0.55,
+                            (50, 50, 50), 1, cv2.LINE_AA)
+                y += 26
+        elif kind < 0.65:
+            x = 32
+            for _ in range(rng.randint(1, 4)):
+                text = _sentence(rng, rng.randint(1, 2))
+                clickable("button", text, x, y, 24 + 11 * len(text), 36, (230, 230, 230))
+                x += 40 + 11 * len(text)
+            y += 52
+        elif kind < 0.85:
+            w, h = rng.randint(200, 500), rng.randint(120, 220)
+            photo = np.random.default_rng(seed * 1000 + y).integers(0, 255, (h // 8, w // 8, 3), dtype=np.uint8)
+            image[y:y + h, 32:32 + w] = cv2.resize(photo, (w, h), interpolation=cv2.INTER_CUBIC)[:height - y]
+            cv2.circle(image, (32 + w // 2, y + h // 2), min(w, h) // 4, (0, 180, 0), -1)
+            y += h + 16
+        else:
+            h = 100
+            cv2.rectangle(image, (32, y), (632, y + h), (245, 235, 220), -1)
+            cv2.putText(image, _sentence(rng, 3).upper(), (48, y + 60), font, 1.2, (120, 40, 160), 2, cv2.LINE_AA)
+            y += h + 16
+
+    ok, encoded = cv2.imencode(".png", image)
+    return encoded.tobytes(), elements
+
+
+def load_corpus(frames, seed=0, corpus_dir=None):
+    """Return frames (png bytes, elements) pairs, reading or writing them under corpus_dir if given."""
+    corpus_dir = Path(corpus_dir) if corpus_dir else None
+    corpus = []
+    for i in range(frames):
+        png_path = corpus_dir / f"frame_{i:03d}.png" if corpus_dir else None
+        elements_path = corpus_dir / f"frame_{i:03d}.json" if corpus_dir else None
+        if png_path and png_path.exists() and elements_path.exists():
+            corpus.append((png_path.read_bytes(), json.loads(elements_path.read_text(encoding="utf-8"))))
+            continue
+        png, elements = render_screenshot(seed + i)
+        if corpus_dir:
+            corpus_dir.mkdir(parents=True, exist_ok=True)
+            png_path.write_bytes(png)
+            elements_path.write_text(json.dumps(elements), encoding="utf-8")
+        corpus.append((png, elements))
+    return corpus
+
+
+def summarize(timings):
+    """p50/p95/mean in ms of a list of stage timings."""
+    if not timings:
+        return None
+    values = np.array(timings)
+    return {
+        "runs": len(timings),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "mean_ms": round(float(values.mean()), 2),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in kilobytes on Linux and bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except Exception:
+            return None
+
+
+def timed(timings, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+async def run_benchmark(settings, corpus, repeat):
+    """Time every stage over the corpus and return the report."""
+    from vision.ocr_processor import OCRProcessor
+    from vision.yolo_detector import YoloDetector
+
+    vision = settings.vision
+    report = {"stages": {}, "models": {}, "errors": {}}
+    timings = {"decode": [], "detection": [], "ocr": [], "formatting": [], "end_to_end": []}
+
+    # Model load time, measured here rather than hidden in the first frame
+    detector = ocr = None
+    start = time.perf_counter()
+    try:
+        detector = YoloDetector(vision.yolo_model_path, backend=vision.detection_backend,
+                                imgsz=vision.detection_imgsz, int8=vision.detection_int8)
+        report["models"]["detection_load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        start = time.perf_counter()
+        detector.backend.warmup()
+        report["models"]["detection_warmup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    except Exception as e:
+        report["errors"]["detection"] = str(e)
+    if vision.use_easyocr:
+        start = time.perf_counter()
+        try:
+            ocr = OCRProcessor()
+            report["models"]["ocr_load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception as e:
+            report["errors"]["ocr"] = str(e)
+
+    formatter = MessageManager("benchmark")
+    for _ in range(repeat):
+        for png, _elements in corpus:
+            image = timed(timings["decode"], decode_screenshot, png)
+            results = {"detections": [], "text_regions": []}
+            if detector:
+                results["detections"] = timed(timings["detection"], detector.detect, image)
+            if ocr:
+                regions = timed(timings["ocr"], ocr.recognize, image)
+                results["text_regions"] = [
+                    dict(region, bbox=[min(p[0] for p in region["bbox"]), min(p[1] for p in region["bbox"]),
+                                       max(p[0] for p in region["bbox"]), max(p[1] for p in region["bbox"])])
+                    for region in regions
+                ]
+            timed(timings["formatting"], formatter._format_vision_results, results)
+
+    # The full pipeline, as an agent step runs it, with nothing served from memory
+    if detector or ocr:
+        processor = VisionProcessor(vision.model_copy(update={
+            "use_result_cache": False, "reuse_unchanged_frames": False, "incremental_ocr": False,
+        }))
+        for _ in range(repeat):
+            for png, elements in corpus:
+                state = {"clickable_elements": elements, "viewport": {"width": 1280, "height": 800}}
+                start = time.perf_counter()
+                await processor.process(png, state)
+                timings["end_to_end"].append((time.perf_counter() - start) * 1000)
+        report["vision_stats"] = processor.get_stats()
+
+    report["stages"] = {stage: summarize(values) for stage, values in timings.items()}
+    report["models"].update(get_model_registry().get_stats())
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vision pipeline")
+    parser.add_argument("--frames", type=int, default=20, help="Screenshots in the corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated corpus")
+    parser.add_argument("--corpus-dir", help="Read the corpus from, or write it to, this directory")
+    parser.add_argument("--backend", help="Detection backend (torch, onnx or openvino)")
+    parser.add_argument("--imgsz", type=int, help="Detection input size")
+    parser.add_argument("--int8", action="store_true", help="Use the int8 detection export")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    overrides = {}
+    if args.backend:
+        overrides["detection_backend"] = args.backend
+    if args.imgsz:
+        overrides["detection_imgsz"] = args.imgsz
+    if args.int8:
+        overrides["detection_int8"] = True
+    settings.vision = settings.vision.model_copy(update=overrides)
+
+    corpus = load_corpus(args.frames, args.seed, args.corpus_dir)
+    report = await run_benchmark(settings, corpus, args.repeat)
+    report["config"] = {
+        "frames": args.frames,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "backend": settings.vision.detection_backend,
+        "imgsz": settings.vision.detection_imgsz,
+        "int8": settings.vision.detection_int8,
+        "ocr_dom_masking": settings.vision.ocr_dom_masking,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+        print(f"Wrote {args.output}")
+    print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,6 @@
 # browser-assistant/config/settings.py
 from pydantic import BaseModel, Field
+from typing import List, Optional
 import os
 
 # Debug print to verify the API key is loaded.
@@ -11,16 +12,188 @@ class BrowserSettings(BaseModel):
         default=os.getenv("CHROME_USER_PATH", r"C:\Users\aashi\AppData\Local\Google\Chrome\User Data"),
         description="Chrome user data directory"
     )
+    incremental_extraction: bool = Field(
+        default=os.getenv("INCREMENTAL_EXTRACTION", "true").lower() in ["true", "1"],
+        description="Re-extract only DOM subtrees that changed since the last step"
+    )
+    max_dirty_subtrees: int = Field(
+        default=int(os.getenv("MAX_DIRTY_SUBTREES", 200)),
+        description="Dirty subtree count above which element extraction falls back to a full rescan"
+    )
+    screenshot_format: str = Field(
+        default=os.getenv("SCREENSHOT_FORMAT", "png"),
+        description="Screenshot encoding: png, jpeg or webp"
+    )
+    screenshot_quality: int = Field(
+        default=int(os.getenv("SCREENSHOT_QUALITY", 80)),
+        description="Encoder quality (0-100) for jpeg and webp screenshots"
+    )
+    screenshot_scale: float = Field(
+        default=float(os.getenv("SCREENSHOT_SCALE", 1.0)),
+        description="Image pixels per CSS pixel of screenshots; below 1 captures a downscaled image for vision"
+    )
+    screenshot_clip: Optional[str] = Field(
+        default=os.getenv("SCREENSHOT_CLIP"),
+        description="Viewport area to capture as 'x,y,width,height' in CSS pixels; whole viewport if unset"
+    )
+    screenshot_mode: str = Field(
+        default=os.getenv("SCREENSHOT_MODE", "viewport"),
+        description="Vision input: 'viewport' (one screenshot) or 'elements' (clips of visual elements)"
+    )
+    screenshot_element_selector: str = Field(
+        default=os.getenv("SCREENSHOT_ELEMENT_SELECTOR", "canvas, img, svg, video, [role='img']"),
+        description="Elements captured as clips in 'elements' screenshot mode"
+    )
+    screenshot_max_clips: int = Field(
+        default=int(os.getenv("SCREENSHOT_MAX_CLIPS", 8)),
+        description="Largest number of element clips captured per step"
+    )
+    settle_timeout_ms: int = Field(
+        default=int(os.getenv("SETTLE_TIMEOUT_MS", 3000)),
+        description="Maximum time to wait for a page to settle after an action"
+    )
+    settle_quiet_ms: int = Field(
+        default=int(os.getenv("SETTLE_QUIET_MS", 200)),
+        description="DOM mutation-free window required before a page counts as settled"
+    )
+    settle_long_request_ms: int = Field(
+        default=int(os.getenv("SETTLE_LONG_REQUEST_MS", 1500)),
+        description="Requests in flight longer than this (long polling, streams) are ignored when settling"
+    )
+    settle_grace_ms: int = Field(
+        default=int(os.getenv("SETTLE_GRACE_MS", 100)),
+        description="Time an action gets to start a request or navigation before the page can count as settled"
+    )
+    pool_size: int = Field(
+        default=int(os.getenv("BROWSER_POOL_SIZE", 1)),
+        description="Number of warm Chromium instances kept by the browser pool"
+    )
+    recycle_after_tasks: int = Field(
+        default=int(os.getenv("BROWSER_RECYCLE_AFTER_TASKS", 20)),
+        description="Tasks a pooled Chromium instance serves before it is replaced"
+    )
+    max_concurrent_agents: int = Field(
+        default=int(os.getenv("MAX_CONCURRENT_AGENTS", 4)),
+        description="Agent loops the scheduler runs at once on the shared browser"
+    )
+    task_timeout_s: float = Field(
+        default=float(os.getenv("TASK_TIMEOUT_S", 600)),
+        description="Wall-clock limit for a single scheduled task"
+    )
+    max_pages_per_context: int = Field(
+        default=int(os.getenv("MAX_PAGES_PER_CONTEXT", 5)),
+        description="Open tabs allowed per browser context; extra pages are closed"
+    )
+    block_resources: bool = Field(
+        default=os.getenv("BLOCK_RESOURCES", "true").lower() in ["true", "1"],
+        description="Block heavy resource types and ad/analytics domains"
+    )
+    blocked_resource_types: List[str] = Field(
+        default=[t.strip() for t in os.getenv("BLOCKED_RESOURCE_TYPES", "media,font").split(",") if t.strip()],
+        description="Playwright resource types to block; images are added when vision is disabled"
+    )
+    blocklist_path: Optional[str] = Field(
+        default=os.getenv("BLOCKLIST_PATH"),
+        description="Domain blocklist file (defaults to config/blocklist.txt)"
+    )
 
 class VisionSettings(BaseModel):
     yolo_model_path: str = Field(
         default=os.getenv("YOLO_MODEL_PATH", "yolov8x.pt"),
         description="Path to the YOLOv8x model"
     )
+    detection_backend: str = Field(
+        default=os.getenv("VISION_DETECTION_BACKEND", "torch"),
+        description="YOLO inference runtime: torch, onnx or openvino"
+    )
+    detection_imgsz: int = Field(
+        default=int(os.getenv("VISION_DETECTION_IMGSZ", 640)),
+        description="YOLO input size; exported ONNX/OpenVINO models are built for this size"
+    )
+    detection_int8: bool = Field(
+        default=os.getenv("VISION_DETECTION_INT8", "false").lower() in ["true", "1"],
+        description="Use an int8-quantized export for the onnx and openvino backends"
+    )
+    model_export_dir: str = Field(
+        default=os.getenv("VISION_MODEL_EXPORT_DIR", "models"),
+        description="Directory where exported detection models are cached"
+    )
     use_easyocr: bool = Field(
         default=True,
         description="Enable EasyOCR for text extraction"
     )
+    reuse_unchanged_frames: bool = Field(
+        default=os.getenv("VISION_REUSE_UNCHANGED", "true").lower() in ["true", "1"],
+        description="Reuse the previous vision results when the screenshot has not changed"
+    )
+    frame_change_tolerance: float = Field(
+        default=float(os.getenv("VISION_FRAME_TOLERANCE", 0.0)),
+        description="Fraction of tiles that may change while a frame still counts as unchanged"
+    )
+    frame_pixel_threshold: int = Field(
+        default=int(os.getenv("VISION_FRAME_PIXEL_THRESHOLD", 6)),
+        description="Mean luminance difference above which a tile counts as changed"
+    )
+    use_result_cache: bool = Field(
+        default=os.getenv("VISION_CACHE", "true").lower() in ["true", "1"],
+        description="Cache vision results by screenshot content and model version"
+    )
+    cache_max_bytes: int = Field(
+        default=int(os.getenv("VISION_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+        description="Memory budget of the vision results cache"
+    )
+    cache_dir: Optional[str] = Field(
+        default=os.getenv("VISION_CACHE_DIR"),
+        description="Directory the vision cache spills evicted entries to; no disk tier if unset"
+    )
+    incremental_ocr: bool = Field(
+        default=os.getenv("VISION_INCREMENTAL_OCR", "true").lower() in ["true", "1"],
+        description="Run OCR only on screen tiles that changed since the previous frame"
+    )
+    ocr_tile_size: int = Field(
+        default=int(os.getenv("VISION_OCR_TILE_SIZE", 64)),
+        description="Edge length in pixels of the tiles diffed for incremental OCR"
+    )
+    ocr_full_frame_fraction: float = Field(
+        default=float(os.getenv("VISION_OCR_FULL_FRAME_FRACTION", 0.5)),
+        description="Fraction of changed tiles above which OCR reads the full frame"
+    )
+    ocr_dom_masking: bool = Field(
+        default=os.getenv("VISION_OCR_DOM_MASKING", "true").lower() in ["true", "1"],
+        description="Mask clickable elements whose text the DOM provides before OCR and drop duplicate OCR text"
+    )
+    ocr_mask_max_height: int = Field(
+        default=int(os.getenv("VISION_OCR_MASK_MAX_HEIGHT", 80)),
+        description="Tallest element (CSS pixels) masked before OCR; taller elements may hold image text"
+    )
+    element_min_overlap: float = Field(
+        default=float(os.getenv("VISION_ELEMENT_MIN_OVERLAP", 0.5)),
+        description="Fraction of a vision box an element must cover for the box to be mapped to its index"
+    )
+    async_mode: bool = Field(
+        default=os.getenv("VISION_ASYNC", "false").lower() in ["true", "1"],
+        description="Overlap vision with the LLM call and attach its results to the next step"
+    )
+    async_min_elements: int = Field(
+        default=int(os.getenv("VISION_ASYNC_MIN_ELEMENTS", 3)),
+        description="In async mode, wait for vision when the DOM has fewer interactive elements than this"
+    )
+    max_workers: int = Field(
+        default=int(os.getenv("VISION_WORKERS", 2)),
+        description="Threads in the dedicated vision pool; detection and OCR run concurrently"
+    )
+    queue_depth: int = Field(
+        default=int(os.getenv("VISION_QUEUE_DEPTH", 2)),
+        description="Frames a vision stage may have in flight before new frames are rejected"
+    )
+    stage_timeout_s: float = Field(
+        default=float(os.getenv("VISION_STAGE_TIMEOUT_S", 10)),
+        description="Seconds to wait for detection or OCR before continuing without it"
+    )
+    intra_op_threads: int = Field(
+        default=int(os.getenv("VISION_INTRA_OP_THREADS", 0)),
+        description="Threads each inference may use inside OpenCV/PyTorch; 0 keeps the library default"
+    )
 
 class LLMSettings(BaseModel):
     groq_api_key: str = Field(
@@ -39,6 +212,84 @@ class LLMSettings(BaseModel):
         default=int(os.getenv("GROQ_MAX_TOKENS", 200)),
         description="Maximum tokens for LLM responses"
     )
+    stream: bool = Field(
+        default=os.getenv("LLM_STREAM", "false").lower() in ["true", "1"],
+        description="Stream completions and execute each action as soon as it is generated"
+    )
+    api_url: str = Field(
+        default=os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"),
+        description="Chat completions endpoint; point it at a local stand-in server for offline runs"
+    )
+    connect_timeout_s: float = Field(
+        default=float(os.getenv("LLM_CONNECT_TIMEOUT_S", 5)),
+        description="Seconds to wait for a connection to the LLM API"
+    )
+    read_timeout_s: float = Field(
+        default=float(os.getenv("LLM_READ_TIMEOUT_S", 60)),
+        description="Seconds to wait for data from the LLM API"
+    )
+    max_connections: int = Field(
+        default=int(os.getenv("LLM_MAX_CONNECTIONS", 20)),
+        description="Connections kept in the shared LLM connection pool"
+    )
+    http2: bool = Field(
+        default=os.getenv("LLM_HTTP2", "true").lower() in ["true", "1"],
+        description="Use HTTP/2 for LLM requests when the h2 package is installed"
+    )
+    requests_per_minute: int = Field(
+        default=int(os.getenv("LLM_REQUESTS_PER_MINUTE", 0)),
+        description="Requests per minute shared by all agents in the process; 0 (the default) for no limit, "
+                    "30 for the Groq free tier"
+    )
+    tokens_per_minute: int = Field(
+        default=int(os.getenv("LLM_TOKENS_PER_MINUTE", 0)),
+        description="Prompt plus completion tokens per minute shared by all agents; 0 (the default) for no "
+                    "limit, 6000 for the Groq free tier"
+    )
+    max_retries: int = Field(
+        default=int(os.getenv("LLM_MAX_RETRIES", 4)),
+        description="Retries of a rate-limited (429), unavailable (5xx) or failed LLM request"
+    )
+    retry_base_delay_s: float = Field(
+        default=float(os.getenv("LLM_RETRY_BASE_DELAY_S", 1.0)),
+        description="First retry delay; it doubles on each retry, with jitter"
+    )
+    retry_max_delay_s: float = Field(
+        default=float(os.getenv("LLM_RETRY_MAX_DELAY_S", 30.0)),
+        description="Longest delay between retries when the server sends no Retry-After"
+    )
+    cache_mode: str = Field(
+        default=os.getenv("LLM_CACHE_MODE", "passthrough"),
+        description="LLM response cache: record, replay (offline, from the cache only) or passthrough"
+    )
+    cache_dir: str = Field(
+        default=os.getenv("LLM_CACHE_DIR", "llm_cache"),
+        description="Directory of recorded LLM responses"
+    )
+    prompt_max_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_MAX_TOKENS", 6000)),
+        description="Token budget of each prompt; unused section budgets go to sections that need more"
+    )
+    prompt_system_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_SYSTEM_TOKENS", 1500)),
+        description="Token budget of the system instructions and action list (never cut, only warned about)"
+    )
+    prompt_task_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_TASK_TOKENS", 300)),
+        description="Token budget of the task description"
+    )
+    prompt_elements_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_ELEMENTS_TOKENS", 2000)),
+        description="Token budget of the current page state and its interactive elements"
+    )
+    prompt_vision_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_VISION_TOKENS", 500)),
+        description="Token budget of the vision analysis"
+    )
+    prompt_history_tokens: int = Field(
+        default=int(os.getenv("LLM_PROMPT_HISTORY_TOKENS", 1500)),
+        description="Token budget of earlier messages, filled newest first"
+    )
 
 class Settings(BaseModel):
     browser: BrowserSettings = BrowserSettings()
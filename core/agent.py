@@ -3,34 +3,79 @@ from config.settings import load_settings
 from core.browser import Browser
 from core.controller import Controller
 from core.message_manager import MessageManager
+from core.network_policy import NetworkPolicy
 from core.state import AgentState
 from llm.groq_client import GroqClient
+from llm.rate_limiter import LLMUnavailableError, get_rate_limiter
+from llm.response_cache import CachedLLMClient, ResponseCache
+from llm.response_parser import IncrementalActionParser
+from llm.transport import get_transport
+from vision.element_join import annotate_with_elements
 from vision.vision_processor import VisionProcessor
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 class Agent:
-    def __init__(self, task, settings):
+    def __init__(self, task, settings, browser=None):
         self.task = task
         self.settings = settings
         self.state = AgentState()  # Tracks progress and history
-        self.browser = Browser(settings.browser)
+        # A browser leased from a BrowserPool can be passed in; otherwise the
+        # agent launches its own
+        self.browser = browser or Browser(
+            settings.browser, network_policy=NetworkPolicy.from_settings(settings)
+        )
         self.controller = Controller()
-        self.message_manager = MessageManager(task)
+        self.message_manager = MessageManager(
+            task,
+            budgets={
+                "system": settings.llm.prompt_system_tokens,
+                "task": settings.llm.prompt_task_tokens,
+                "elements": settings.llm.prompt_elements_tokens,
+                "vision": settings.llm.prompt_vision_tokens,
+                "history": settings.llm.prompt_history_tokens,
+            },
+            max_prompt_tokens=settings.llm.prompt_max_tokens,
+        )
         self.llm_client = GroqClient(
             api_key=settings.llm.groq_api_key,
             model=settings.llm.groq_model,
             temperature=settings.llm.temperature,
             max_tokens=settings.llm.max_completion_tokens,
+            api_url=settings.llm.api_url,
+            transport=get_transport(settings.llm),
+            rate_limiter=get_rate_limiter(settings.llm),
+            max_retries=settings.llm.max_retries,
+            retry_base_delay_s=settings.llm.retry_base_delay_s,
+            retry_max_delay_s=settings.llm.retry_max_delay_s,
         )
+        if settings.llm.cache_mode != "passthrough":
+            # Record responses to disk, or replay them without calling the API
+            self.llm_client = CachedLLMClient(
+                self.llm_client, ResponseCache(settings.llm.cache_dir), settings.llm.cache_mode
+            )
         self.n_steps = 0
         self.consecutive_failures = 0
+        # Per-step LLM latency: total, rate-limiter queue wait and, when
+        # streaming, time to the first action
+        self.llm_timings = []
         if settings.use_vision:
             self.vision_processor = VisionProcessor(settings.vision)
         else:
             self.vision_processor = None
+        # In async vision mode, inference for a frame overlaps the LLM call
+        # and its results are attached to the next state
+        self.async_vision = settings.vision.async_mode
+        self._pending_vision = None
+        self.async_vision_stats = {"attached": 0, "superseded": 0}
+        # Vision reads either one (possibly scaled or clipped) screenshot or
+        # clips of the visual elements on the page
+        self.vision_input = (
+            "screenshot_clips" if settings.browser.screenshot_mode == "elements" else "screenshot_bytes"
+        )
 
     async def run(self, max_steps=100):
         # Initialize the browser (using Playwright)
@@ -41,15 +86,15 @@ class Agent:
             self.n_steps += 1
             
             try:
-                # Get current browser state
-                browser_state = await self.browser.get_state()
+                # Get current browser state, with only the lazy fields this step uses
+                include = ["tabs"]
+                if self.vision_processor:
+                    include.append(self.vision_input)
+                browser_state = await self.browser.get_state(include=include)
                 
                 # Process vision if enabled
-                if self.vision_processor and browser_state.get('screenshot'):
-                    vision_results = await self.vision_processor.process(
-                        browser_state['screenshot'], browser_state
-                    )
-                    browser_state['vision'] = vision_results
+                if self.vision_processor and browser_state.get(self.vision_input):
+                    await self._attach_vision(browser_state)
                 
                 # Add state to message history
                 self.message_manager.add_state_message(browser_state)
@@ -57,19 +102,28 @@ class Agent:
                 # Get prompt for LLM
                 prompt_message = self.message_manager.get_latest_message()
                 
-                # Get next action from LLM
-                llm_response = await self.llm_client.chat_completion(prompt_message)
+                # Get next action from LLM; when streaming, actions run as they arrive
+                results = None
+                if self.settings.llm.stream:
+                    llm_response, results = await self._stream_and_act(prompt_message)
+                else:
+                    start = time.perf_counter()
+                    llm_response = await self.llm_client.chat_completion(prompt_message)
+                    self.llm_timings.append({
+                        "total_s": round(time.perf_counter() - start, 3), **self.llm_client.last_request
+                    })
                 logger.info(f"LLM Response: {llm_response}")
                 
                 # Parse actions from LLM response
                 try:
-                    actions = self.parse_llm_response(llm_response)
-                    if not actions:
-                        logger.warning("No valid actions received. Continuing to next step.")
-                        continue
-                        
-                    # Execute actions
-                    results = await self.controller.multi_act(actions, self.browser)
+                    if not results:
+                        actions = self.parse_llm_response(llm_response)
+                        if not actions:
+                            logger.warning("No valid actions received. Continuing to next step.")
+                            continue
+                            
+                        # Execute actions
+                        results = await self.controller.multi_act(actions, self.browser)
                     logger.info(f"Action results: {results}")
                     
                     # Update state
@@ -87,17 +141,137 @@ class Agent:
                         logger.error("Too many consecutive failures. Stopping.")
                         break
                 
+            except LLMUnavailableError as e:
+                # Still rate limited after every retry: count it as a failed step, don't end the task
+                logger.error(f"LLM unavailable: {e}")
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= 3:
+                    logger.error("Too many consecutive failures. Stopping.")
+                    break
             except Exception as e:
                 logger.error(f"Error during step execution: {e}")
                 self.consecutive_failures += 1
                 if self.consecutive_failures >= 3:
                     logger.error("Too many consecutive failures. Stopping.")
                     break
-            
-            await asyncio.sleep(0.5)  # Small delay between steps
 
+        if self._pending_vision:
+            self._pending_vision.cancel()
+            self._pending_vision = None
+        if self.vision_processor:
+            logger.info(f"Vision stats: {self.vision_processor.get_stats()}")
+            if self.async_vision:
+                logger.info(f"Async vision: {self.async_vision_stats}")
+        if self.llm_timings:
+            summary = {
+                key: round(sum(t[key] for t in self.llm_timings if key in t)
+                           / max(1, sum(1 for t in self.llm_timings if key in t)), 3)
+                for key in ("first_action_s", "total_s", "queue_wait_s")
+                if any(key in t for t in self.llm_timings)
+            }
+            logger.info(f"Mean LLM latency over {len(self.llm_timings)} steps: {summary}")
+            logger.info(f"LLM rate limiter: {self.llm_client.rate_limiter.get_stats()}")
+        if isinstance(self.llm_client, CachedLLMClient):
+            logger.info(f"LLM cache ({self.llm_client.mode}): {self.llm_client.cache.get_stats()}")
         return self.state.history
 
+    async def _stream_and_act(self, prompt_message):
+        """
+        Stream the LLM response and execute each action as soon as its JSON
+        object closes, while the rest is still generating. Returns the
+        response text (without reasoning blocks) and the action results.
+        """
+        parser = IncrementalActionParser()
+        timing = {}
+        start = time.perf_counter()
+        
+        async def streamed_actions():
+            stream = self.llm_client.stream_completion(prompt_message)
+            try:
+                async for chunk in stream:
+                    for action in parser.feed(chunk):
+                        timing.setdefault("first_action_s", round(time.perf_counter() - start, 3))
+                        yield action
+                for action in parser.finish():
+                    timing.setdefault("first_action_s", round(time.perf_counter() - start, 3))
+                    yield action
+            finally:
+                # Stopping early (done or a failed action) also ends the stream
+                await stream.aclose()
+                timing["total_s"] = round(time.perf_counter() - start, 3)
+        
+        actions = streamed_actions()
+        try:
+            results = await self.controller.multi_act_stream(actions, self.browser)
+        finally:
+            await actions.aclose()
+        
+        timing.update(self.llm_client.last_request)
+        self.llm_timings.append(timing)
+        logger.info(
+            f"LLM stream: first action after {timing.get('first_action_s', 'n/a')} s, "
+            f"response ended after {timing.get('total_s', 'n/a')} s, "
+            f"queued {timing.get('queue_wait_s', 0)} s"
+        )
+        return parser.response, results
+
+    def _vision_wait_reason(self, browser_state):
+        """
+        Decide whether this step must wait for vision on the current frame
+        even in async mode. Returns the reason, or None to let it overlap the
+        LLM call.
+        """
+        if not self.async_vision:
+            return "async vision disabled"
+        elements = browser_state.get('clickable_elements') or []
+        if len(elements) < self.settings.vision.async_min_elements:
+            return f"only {len(elements)} interactive elements in the DOM"
+        return None
+
+    async def _attach_vision(self, browser_state):
+        """
+        Run vision on the state's screenshot. When the step must wait (see
+        _vision_wait_reason) the results are attached to this state;
+        otherwise inference keeps running while the LLM is called, and this
+        state gets the results of the previous frame if they are ready.
+        """
+        # Results of the previous frame, or cancel it if it is still running
+        previous = self._pending_vision
+        self._pending_vision = None
+        previous_results = None
+        if previous:
+            if previous.done() and not previous.cancelled() and previous.exception() is None:
+                previous_results = previous.result()
+            elif not previous.done():
+                # Vision is slower than a step; if this keeps happening it never attaches anything
+                previous.cancel()
+                self.async_vision_stats["superseded"] += 1
+                logger.warning(
+                    f"Vision for the previous frame was still running and was cancelled "
+                    f"({self.async_vision_stats['superseded']} so far); consider VISION_ASYNC=false"
+                )
+        
+        if self.vision_input == "screenshot_clips":
+            vision = self.vision_processor.process_clips(browser_state['screenshot_clips'], browser_state)
+        else:
+            vision = self.vision_processor.process(browser_state['screenshot_bytes'], browser_state)
+        current = asyncio.create_task(vision)
+        reason = self._vision_wait_reason(browser_state)
+        if reason:
+            if self.async_vision:
+                logger.info(f"Waiting for vision: {reason}")
+            browser_state['vision'] = await current
+            return
+        
+        self._pending_vision = current
+        if previous_results is not None:
+            # Element indices from the previous DOM may now point elsewhere: join to the current one
+            rejoined = annotate_with_elements(
+                previous_results, browser_state.get('clickable_elements'), self.settings.vision.element_min_overlap
+            )
+            browser_state['vision'] = dict(rejoined, previous_step=True)
+            self.async_vision_stats["attached"] += 1
+
     def parse_llm_response(self, llm_response):
         """
         Parse the LLM JSON response to extract action commands.
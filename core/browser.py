@@ -2,38 +2,379 @@ import asyncio
 import base64
 import logging
 from playwright.async_api import async_playwright
+from core.settle import PageSettler
+from core.state import BrowserState
 
 logger = logging.getLogger(__name__)
 
+# In-page tracker shared by every extraction. A MutationObserver records the
+# elements whose subtrees changed so the next extraction can skip clean parts
+# of the document. It also assigns each extracted element a stable index.
+DOM_TRACKER_JS = """
+function installDomTracker() {
+    if (window.__agentDomTracker) return window.__agentDomTracker;
+
+    const tracker = {
+        dirty: new Set(),       // Elements whose subtree changed since the last extraction
+        overflow: false,        // Too many dirty subtrees, next extraction must be a full rescan
+        maxDirty: 200,
+        scanned: false,         // A full scan has populated the registry
+        lastMutation: performance.now(),
+        ids: new WeakMap(),     // element -> index
+        elements: new Map(),    // index -> element
+        nextIndex: 0
+    };
+
+    const markDirty = (node) => {
+        tracker.lastMutation = performance.now();
+        if (tracker.overflow || !tracker.scanned) return;
+        const el = node && node.nodeType === Node.ELEMENT_NODE ? node : node && node.parentElement;
+        if (!el) return;
+        tracker.dirty.add(el);
+        if (tracker.dirty.size > tracker.maxDirty) {
+            tracker.overflow = true;
+            tracker.dirty.clear();
+        }
+    };
+
+    tracker.observer = new MutationObserver((mutations) => {
+        for (const mutation of mutations) markDirty(mutation.target);
+    });
+    tracker.observer.observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+
+    // Typing changes the value property without touching any attribute
+    document.addEventListener('input', (event) => markDirty(event.target), true);
+    document.addEventListener('change', (event) => markDirty(event.target), true);
+    // CSS transitions and animations can reveal elements without a DOM mutation
+    document.addEventListener('transitionend', (event) => markDirty(event.target), true);
+    document.addEventListener('animationend', (event) => markDirty(event.target), true);
+
+    window.__agentDomTracker = tracker;
+    return tracker;
+}
+"""
+
+# Installed as an init script so the tracker observes every document from the start
+DOM_TRACKER_INIT_JS = "(() => {\n" + DOM_TRACKER_JS + "\ninstallDomTracker();\n})();"
+
+EXTRACT_ELEMENTS_JS = """
+(options) => {
+""" + DOM_TRACKER_JS + """
+    const tracker = installDomTracker();
+    tracker.maxDirty = options.maxDirty;
+    const interactiveTags = ['a', 'button', 'input', 'select', 'textarea', 'label'];
+
+    // XPath of an element found by walking its ancestors. Only used for the
+    // roots of a scan; elements inside a scan get their path from the walk.
+    function pathOf(element) {
+        const paths = [];
+        for (; element && element.nodeType === Node.ELEMENT_NODE; element = element.parentNode) {
+            let currentPath = element.tagName.toLowerCase();
+            let total = 0;
+            let position = 0;
+            for (let sibling = element.parentNode?.firstElementChild; sibling; sibling = sibling.nextElementSibling) {
+                if (sibling.tagName === element.tagName) {
+                    total++;
+                    if (sibling === element) position = total;
+                }
+            }
+            if (total > 1) currentPath += `[${position}]`;
+            paths.unshift(currentPath);
+        }
+        return '/' + paths.join('/');
+    }
+
+    function isInteractive(el, tagName) {
+        return interactiveTags.includes(tagName) ||
+            el.hasAttribute('role') ||
+            el.hasAttribute('tabindex') ||
+            el.hasAttribute('onclick') ||
+            el.hasAttribute('aria-label');
+    }
+
+    // Walk the subtree under root once in document order, collecting interactive
+    // candidates with their XPath. Sibling ordinals are counted as the walk goes
+    // and each parent's path is cached, so the whole walk is linear in the
+    // subtree size. Only DOM reads happen here; layout is read in measure().
+    function collect(root, candidates) {
+        const parentPaths = new Map();
+        const frames = new Map();
+
+        const visit = (el, path) => {
+            if (el.firstElementChild) parentPaths.set(el, path);
+            const tagName = el.tagName.toLowerCase();
+            if (isInteractive(el, tagName)) candidates.push({el: el, tagName: tagName, path: path});
+        };
+
+        const frameOf = (parent) => {
+            let frame = frames.get(parent);
+            if (!frame) {
+                const totals = new Map();
+                for (let child = parent.firstElementChild; child; child = child.nextElementSibling) {
+                    totals.set(child.tagName, (totals.get(child.tagName) || 0) + 1);
+                }
+                frame = {path: parentPaths.get(parent), totals: totals, seen: new Map()};
+                frames.set(parent, frame);
+                parentPaths.delete(parent);
+            }
+            return frame;
+        };
+
+        visit(root, pathOf(root));
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+        for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+            const frame = frameOf(el.parentNode);
+            let segment = el.tagName.toLowerCase();
+            if (frame.totals.get(el.tagName) > 1) {
+                const position = (frame.seen.get(el.tagName) || 0) + 1;
+                frame.seen.set(el.tagName, position);
+                segment += `[${position}]`;
+            }
+            visit(el, frame.path + '/' + segment);
+        }
+    }
+
+    function getRect(el) {
+        const rect = el.getBoundingClientRect();
+        return {x: rect.x, y: rect.y, width: rect.width, height: rect.height};
+    }
+
+    // Turn candidates into element descriptions. Layout is read in batches
+    // (all rects, then the styles of the visible ones) so nothing in between
+    // can invalidate it.
+    function measure(candidates) {
+        const visible = [];
+        for (const candidate of candidates) {
+            const rect = getRect(candidate.el);
+            if (rect.width > 0 && rect.height > 0) {  // Only visible elements
+                candidate.rect = rect;
+                visible.push(candidate);
+            }
+        }
+
+        const styles = visible.map(candidate => window.getComputedStyle(candidate.el));
+        const interactiveElements = [];
+        for (let i = 0; i < visible.length; i++) {
+            if (styles[i].display === 'none' || styles[i].visibility === 'hidden') continue;
+            interactiveElements.push(describe(visible[i]));
+        }
+        return interactiveElements;
+    }
+
+    function describe(candidate) {
+        const el = candidate.el;
+        let index = tracker.ids.get(el);
+        if (index === undefined) {
+            index = tracker.nextIndex++;
+            tracker.ids.set(el, index);
+        }
+        tracker.elements.set(index, el);
+
+        return {
+            index: index,
+            tagName: candidate.tagName,
+            text: el.textContent.trim().substring(0, 100),
+            attributes: {
+                id: el.id || null,
+                class: el.className || null,
+                type: el.type || null,
+                name: el.name || null,
+                role: el.getAttribute('role') || null,
+                'aria-label': el.getAttribute('aria-label') || null,
+                placeholder: el.getAttribute('placeholder') || null,
+                value: el.value || null
+            },
+            rect: candidate.rect,
+            xpath: el.id ? `//*[@id="${el.id}"]` : candidate.path
+        };
+    }
+
+    function forget(index) {
+        const el = tracker.elements.get(index);
+        if (el) tracker.ids.delete(el);
+        tracker.elements.delete(index);
+    }
+
+    // Scrolling or resizing changes what is laid out and visible without any
+    // mutation (lazy layout, sticky headers, media queries): rescan fully
+    const view = [window.scrollX, window.scrollY, window.innerWidth, window.innerHeight].join(',');
+    const viewChanged = tracker.view !== undefined && tracker.view !== view;
+    tracker.view = view;
+
+    const full = !options.incremental || !tracker.scanned || tracker.overflow || viewChanged;
+    const pending = Array.from(tracker.dirty);
+    tracker.dirty.clear();
+    tracker.overflow = false;
+
+    if (full) {
+        tracker.ids = new WeakMap();
+        tracker.elements = new Map();
+        tracker.nextIndex = 0;
+
+        const candidates = [];
+        if (document.documentElement) collect(document.documentElement, candidates);
+        const interactiveElements = measure(candidates);
+        tracker.scanned = true;
+        return {full: true, elements: interactiveElements};
+    }
+
+    // Collapse the dirty set to its outermost connected roots
+    const pendingSet = new Set(pending);
+    const roots = new Set();
+    for (const el of pending) {
+        if (!el.isConnected) continue;
+        let covered = false;
+        for (let parent = el.parentElement; parent; parent = parent.parentElement) {
+            if (pendingSet.has(parent)) {
+                covered = true;
+                break;
+            }
+        }
+        if (!covered) roots.add(el);
+    }
+
+    const inDirtySubtree = (el) => {
+        for (let node = el; node; node = node.parentElement) {
+            if (roots.has(node)) return true;
+        }
+        return false;
+    };
+
+    const updated = [];
+    const removed = [];
+    const rects = [];
+    const stale = new Set();
+
+    // Refresh the rects of clean tracked elements; layout and scrolling move them
+    for (const [index, el] of tracker.elements) {
+        if (!el.isConnected) {
+            removed.push(index);
+            forget(index);
+        } else if (inDirtySubtree(el)) {
+            stale.add(index);
+        } else {
+            const rect = getRect(el);
+            if (rect.width > 0 && rect.height > 0) {
+                rects.push([index, rect]);
+            } else {
+                removed.push(index);
+                forget(index);
+            }
+        }
+    }
+
+    // Re-extract the dirty subtrees
+    const candidates = [];
+    for (const root of roots) collect(root, candidates);
+    for (const element of measure(candidates)) {
+        updated.push(element);
+        stale.delete(element.index);
+    }
+    for (const index of stale) {
+        removed.push(index);
+        forget(index);
+    }
+
+    // Tracked ancestors of a dirty subtree may have changed text
+    const ancestors = [];
+    const seen = new Set();
+    for (const root of roots) {
+        for (let parent = root.parentElement; parent; parent = parent.parentElement) {
+            if (seen.has(parent)) break;
+            seen.add(parent);
+            if (tracker.ids.has(parent)) {
+                ancestors.push({el: parent, tagName: parent.tagName.toLowerCase(), path: pathOf(parent)});
+            }
+        }
+    }
+    const refreshed = new Set();
+    for (const element of measure(ancestors)) {
+        updated.push(element);
+        refreshed.add(element.index);
+    }
+    for (const candidate of ancestors) {
+        const index = tracker.ids.get(candidate.el);
+        if (!refreshed.has(index)) {
+            removed.push(index);
+            forget(index);
+        }
+    }
+
+    // Indices of all tracked elements in document order, for the returned list
+    const order = Array.from(tracker.elements.entries())
+        .sort((a, b) => a[1].compareDocumentPosition(b[1]) & Node.DOCUMENT_POSITION_FOLLOWING ? -1 : 1)
+        .map(([index]) => index);
+
+    return {full: false, updated: updated, removed: removed, rects: rects, order: order};
+}
+"""
+
+# Viewport rects (CSS pixels) of the visible elements matching a selector,
+# clipped to the viewport, largest first
+VISUAL_ELEMENTS_JS = """
+(options) => {
+    const regions = [];
+    const width = window.innerWidth, height = window.innerHeight;
+    for (const el of document.querySelectorAll(options.selector)) {
+        const rect = el.getBoundingClientRect();
+        const x1 = Math.max(0, rect.left), y1 = Math.max(0, rect.top);
+        const x2 = Math.min(width, rect.right), y2 = Math.min(height, rect.bottom);
+        if (x2 - x1 < options.minSize || y2 - y1 < options.minSize) continue;
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') continue;
+        regions.push({x: x1, y: y1, width: x2 - x1, height: y2 - y1});
+    }
+    regions.sort((a, b) => b.width * b.height - a.width * a.height);
+    return regions.slice(0, options.max);
+}
+"""
+
+# Launch arguments shared by Browser and BrowserPool
+CHROMIUM_ARGS = ['--no-sandbox', '--disable-infobars', '--disable-dev-shm-usage']
+
 class Browser:
-    def __init__(self, browser_settings):
+    def __init__(self, browser_settings, context=None, network_policy=None):
         self.browser_settings = browser_settings
+        self.network_policy = network_policy
         self.playwright = None
-        self.context = None
+        # An injected context (e.g. from BrowserPool) is used as is; otherwise
+        # initialize() launches and owns its own Playwright and Chromium
+        self.context = context
+        self._owns_context = context is None
         self.page = None
+        self.settler = None
         self.selector_map = {}  # Map of selectors to their DOM elements
+        # Page and URL the selector map was extracted from, used to decide
+        # whether the next extraction can be incremental
+        self._extraction_page = None
+        self._extraction_url = None
 
     async def initialize(self):
         """
-        Initialize Playwright, launch the browser with the specified user data directory,
-        and create or get a browser page.
+        Prepare the browser context and create a browser page. Without an
+        injected context, Playwright is started and a fresh Chromium launched.
         """
         logger.info("Initializing browser...")
         try:
-            self.playwright = await async_playwright().start()
-            
-            # Create a new temporary directory for this session
-            import tempfile
-            temp_dir = tempfile.mkdtemp(prefix="browser_assistant_")
-            
-            # Launch browser with a fresh profile
-            browser = await self.playwright.chromium.launch(
-                headless=self.browser_settings.headless,
-                args=['--no-sandbox', '--disable-infobars', '--disable-dev-shm-usage']
-            )
+            if self.context is None:
+                self.playwright = await async_playwright().start()
+                
+                # Launch browser with a fresh profile
+                browser = await self.playwright.chromium.launch(
+                    headless=self.browser_settings.headless,
+                    args=CHROMIUM_ARGS
+                )
+                
+                # Create a new context
+                self.context = await browser.new_context()
             
-            # Create a new context
-            self.context = await browser.new_context()
+            await self.context.add_init_script(script=DOM_TRACKER_INIT_JS)
+            self.settler = PageSettler(self.context, self.browser_settings)
+            self.context.on("page", self._enforce_page_limit)
+            if self.network_policy:
+                await self.network_policy.attach(self.context)
             
             # Create a new page
             self.page = await self.context.new_page()
@@ -51,146 +392,218 @@ class Browser:
                 await self.playwright.stop()
             raise
 
-    async def get_state(self):
+    def _enforce_page_limit(self, page):
         """
-        Retrieve the current state of the browser including URL, title, DOM content,
-        and a base64-encoded screenshot, and clickable elements.
+        Close pages the page opened beyond the per-context limit (popups,
+        target=_blank). Tabs the agent opens are refused by open_tab instead,
+        and the agent's current page is never closed.
+        """
+        limit = self.browser_settings.max_pages_per_context
+        if len(self.context.pages) > limit and page is not self.page:
+            logger.warning(f"Closing new page, context already has {limit} open pages")
+            asyncio.ensure_future(page.close())
+
+    async def get_state(self, include=()):
+        """
+        Retrieve the current state of the browser.
+
+        URL, title and clickable elements are always captured. The DOM content,
+        screenshot (raw bytes as "screenshot_bytes", base64 text as "screenshot"),
+        per-element screenshot clips ("screenshot_clips") and tabs are fetched
+        lazily: only the fields named in `include` are captured now, the rest
+        when first fetched from the returned BrowserState. "screenshot_region"
+        is the viewport area (CSS pixels) the screenshot shows.
         """
         if not self.page:
             raise Exception("Browser page is not initialized.")
         
-        # Wait for network idle and any pending animations
-        try:
-            await self.page.wait_for_load_state("networkidle", timeout=3000)
-        except Exception as e:
-            logger.warning(f"Wait for network idle timed out: {e}")
-        
-        url = self.page.url
-        title = await self.page.title()
-        content = await self.page.content()
-        
-        # Capture a screenshot
-        screenshot_bytes = await self.page.screenshot()
-        screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
-        
-        # Extract clickable elements
-        clickable_elements = await self._extract_clickable_elements()
-        
-        # Get current tabs information
-        tabs = await self._get_tabs_info()
+        # Wait for in-flight requests, DOM mutations and pending animations
+        settle = await self.wait_for_settle()
         
-        state = {
-            "url": url,
-            "title": title,
-            "dom": content,
+        # Lazy fields are bound to the page the state was taken from
+        page = self.page
+        state = None
+
+        async def screenshot_b64():
+            # Encode the raw capture only when something asks for text
+            screenshot_bytes = await state.fetch("screenshot_bytes")
+            return base64.b64encode(screenshot_bytes).decode("utf-8")
+
+        loaders = {
+            "title": page.title,
+            "clickable_elements": self._extract_clickable_elements,
+            "dom": page.content,
+            "screenshot_bytes": lambda: self._capture_screenshot(page),
             "screenshot": screenshot_b64,
-            "clickable_elements": clickable_elements,
-            "tabs": tabs
+            "screenshot_clips": lambda: self._capture_element_clips(page),
+            "tabs": self._get_tabs_info,
         }
+        
+        viewport = page.viewport_size or await page.evaluate(
+            "() => ({width: window.innerWidth, height: window.innerHeight})"
+        )
+        state = BrowserState(
+            loaders,
+            url=page.url,
+            viewport=viewport,
+            screenshot_region=self._screenshot_region(viewport),
+            settle=settle,
+            timings={"settle": settle["waited_ms"]},
+        )
+        if self.network_policy:
+            state["network"] = self.network_policy.stats(page)
+        # Issue the page calls concurrently so capture takes about as long as the slowest one
+        await state.load("title", "clickable_elements", *include)
+        logger.debug(f"State capture timings (ms): {state['timings']}")
         return state
+
+    async def wait_for_settle(self, timeout_ms=None):
+        """
+        Wait until the current page is stable, up to the configured settle
+        deadline, and return the settle result including how long it waited.
+        """
+        result = await self.settler.wait(self.page, timeout_ms)
+        logger.debug(f"Page settle: {result}")
+        return result
+
+    def _screenshot_region(self, viewport):
+        """Viewport area (CSS pixels) the screenshot shows: the configured clip, or the whole viewport."""
+        if self.browser_settings.screenshot_clip:
+            x, y, width, height = (float(v) for v in self.browser_settings.screenshot_clip.split(","))
+            return {"x": x, "y": y, "width": width, "height": height}
+        return {"x": 0, "y": 0, "width": viewport["width"], "height": viewport["height"]}
+
+    async def _capture_screenshot(self, page):
+        """
+        Capture a screenshot of the page as raw image bytes in the configured
+        format and quality, downscaled and clipped to the configured region.
+        """
+        image_format = self.browser_settings.screenshot_format
+        quality = self.browser_settings.screenshot_quality
+        if image_format not in ("png", "jpeg", "webp"):
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        if self.browser_settings.screenshot_scale != 1.0 or self.browser_settings.screenshot_clip:
+            viewport = page.viewport_size or await page.evaluate(
+                "() => ({width: window.innerWidth, height: window.innerHeight})"
+            )
+            images = await self._capture_regions(page, [self._screenshot_region(viewport)])
+            return images[0]
+        if image_format == "png":
+            return await page.screenshot(type="png")
+        if image_format == "jpeg":
+            return await page.screenshot(type="jpeg", quality=quality)
+        # Playwright only encodes PNG and JPEG; Chromium can encode WebP over CDP
+        images = await self._capture_regions(page, [None])
+        return images[0]
+
+    async def _capture_regions(self, page, regions):
+        """
+        Capture viewport regions (CSS pixels; None for the whole viewport) over
+        one CDP session. Chromium renders each clip directly at
+        screenshot_scale image pixels per CSS pixel, so smaller captures cost
+        less to encode, transfer and decode.
+        """
+        image_format = self.browser_settings.screenshot_format
+        cdp = await page.context.new_cdp_session(page)
+        try:
+            metrics = await cdp.send("Page.getLayoutMetrics")
+            css_viewport = metrics["cssVisualViewport"]
+            device_pixel_ratio = metrics["visualViewport"]["clientWidth"] / max(css_viewport["clientWidth"], 1)
+            images = []
+            for region in regions:
+                params = {"format": image_format}
+                if image_format != "png":
+                    params["quality"] = self.browser_settings.screenshot_quality
+                if region:
+                    # Clips are in document coordinates and scaled from device pixels
+                    params["clip"] = {
+                        "x": css_viewport["pageX"] + region["x"],
+                        "y": css_viewport["pageY"] + region["y"],
+                        "width": region["width"],
+                        "height": region["height"],
+                        "scale": self.browser_settings.screenshot_scale / device_pixel_ratio,
+                    }
+                result = await cdp.send("Page.captureScreenshot", params)
+                images.append(base64.b64decode(result["data"]))
+            return images
+        finally:
+            await cdp.detach()
+
+    async def _capture_element_clips(self, page):
+        """
+        Capture a clip of each visible element matching screenshot_element_selector
+        (canvas, images, video: content the DOM cannot describe), largest first.
+        Returns a list of {"image": bytes, "region": viewport rect in CSS pixels}.
+        """
+        regions = await page.evaluate(VISUAL_ELEMENTS_JS, {
+            "selector": self.browser_settings.screenshot_element_selector,
+            "max": self.browser_settings.screenshot_max_clips,
+            "minSize": 16,
+        })
+        if not regions:
+            return []
+        images = await self._capture_regions(page, regions)
+        return [{"image": image, "region": region} for image, region in zip(images, regions)]
     
     async def _extract_clickable_elements(self):
-        """Extract clickable elements from the page with their properties."""
-        elements = []
-        
-        # Use JavaScript to find all potentially interactive elements
-        js_code = """
-        () => {
-            const interactiveElements = [];
-            const interactiveTags = ['a', 'button', 'input', 'select', 'textarea', 'label'];
-            const allElements = document.querySelectorAll('*');
-            
-            let index = 0;
-            for (const el of allElements) {
-                const tagName = el.tagName.toLowerCase();
-                
-                // Check if the element is potentially interactive
-                const isInteractive = 
-                    interactiveTags.includes(tagName) || 
-                    el.hasAttribute('role') || 
-                    el.hasAttribute('tabindex') || 
-                    el.hasAttribute('onclick') ||
-                    el.hasAttribute('aria-label');
-                
-                if (isInteractive) {
-                    // Get element properties
-                    const rect = el.getBoundingClientRect();
-                    if (rect.width > 0 && rect.height > 0) {  // Only visible elements
-                        const style = window.getComputedStyle(el);
-                        if (style.display !== 'none' && style.visibility !== 'hidden') {
-                            interactiveElements.push({
-                                index: index++,
-                                tagName: tagName,
-                                text: el.textContent.trim().substring(0, 100),
-                                attributes: {
-                                    id: el.id || null,
-                                    class: el.className || null,
-                                    type: el.type || null,
-                                    name: el.name || null,
-                                    role: el.getAttribute('role') || null,
-                                    'aria-label': el.getAttribute('aria-label') || null,
-                                    placeholder: el.getAttribute('placeholder') || null,
-                                    value: el.value || null
-                                },
-                                rect: {
-                                    x: rect.x,
-                                    y: rect.y,
-                                    width: rect.width,
-                                    height: rect.height
-                                },
-                                xpath: getXPath(el)
-                            });
-                        }
-                    }
-                }
-            }
-            
-            // Helper function to get XPath
-            function getXPath(element) {
-                if (element.id) return `//*[@id="${element.id}"]`;
-                
-                const paths = [];
-                for (; element && element.nodeType === Node.ELEMENT_NODE; element = element.parentNode) {
-                    let currentPath = element.tagName.toLowerCase();
-                    const siblings = Array.from(element.parentNode?.children || [])
-                        .filter(e => e.tagName === element.tagName);
-                    
-                    if (siblings.length > 1) {
-                        const index = siblings.indexOf(element) + 1;
-                        currentPath += `[${index}]`;
-                    }
-                    
-                    paths.unshift(currentPath);
-                }
-                
-                return '/' + paths.join('/');
-            }
-            
-            return interactiveElements;
-        }
         """
-        
+        Extract clickable elements from the page with their properties.
+
+        In incremental mode only the subtrees the in-page MutationObserver marked
+        dirty are re-extracted and the selector map is patched in place. A full
+        rescan runs after navigation, on a tab switch, after scrolling or a
+        viewport resize, or when the dirty set overflows. Elements are returned
+        in document order either way.
+        """
+        url = self.page.url
+        incremental = (
+            self.browser_settings.incremental_extraction
+            and self._extraction_page is self.page
+            and self._extraction_url == url
+        )
+        options = {
+            "incremental": incremental,
+            "maxDirty": self.browser_settings.max_dirty_subtrees,
+        }
+
         try:
-            result = await self.page.evaluate(js_code)
-            
-            # Update the selector map
-            self.selector_map = {}
-            for element in result:
-                self.selector_map[element['index']] = element
-            
-            return result
+            result = await self.page.evaluate(EXTRACT_ELEMENTS_JS, options)
         except Exception as e:
             logger.error(f"Error extracting clickable elements: {e}")
+            self._extraction_page = None
             return []
-    
+
+        if result["full"]:
+            self.selector_map = {element["index"]: element for element in result["elements"]}
+            order = [element["index"] for element in result["elements"]]
+        else:
+            order = result["order"]
+            for index in result["removed"]:
+                self.selector_map.pop(index, None)
+            for index, rect in result["rects"]:
+                if index in self.selector_map:
+                    self.selector_map[index]["rect"] = rect
+            for element in result["updated"]:
+                self.selector_map[element["index"]] = element
+            logger.debug(
+                f"Incremental extraction: {len(result['updated'])} updated, "
+                f"{len(result['removed'])} removed"
+            )
+
+        self._extraction_page = self.page
+        self._extraction_url = url
+        return [self.selector_map[index] for index in order if index in self.selector_map]
+
     async def _get_tabs_info(self):
         """Get information about all open tabs."""
+        pages = list(self.context.pages)
+        titles = await asyncio.gather(*(page.title() for page in pages), return_exceptions=True)
         tabs = []
-        for i, page in enumerate(self.context.pages):
+        for i, (page, title) in enumerate(zip(pages, titles)):
             tabs.append({
                 "page_id": i,
                 "url": page.url,
-                "title": await page.title()
+                "title": title if isinstance(title, str) else ""
             })
         return tabs
     
@@ -230,6 +643,16 @@ class Browser:
                 logger.error(f"Failed to click element: {e2}")
                 return False
     
+    async def click_coordinates(self, x, y):
+        """Click at viewport coordinates (CSS pixels), for targets that have no element index."""
+        try:
+            await self.page.mouse.click(x, y)
+            logger.info(f"Clicked at coordinates: {x}, {y}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to click at coordinates {x}, {y}: {e}")
+            return False
+
     async def input_text(self, index, text):
         """Input text into an element by its index."""
         if index not in self.selector_map:
@@ -247,10 +670,11 @@ class Browser:
             
     async def close(self):
         """
-        Close the browser context and stop Playwright.
+        Close the browser context and stop Playwright. An injected context is
+        left to its owner.
         """
         logger.info("Closing browser...")
-        if self.context:
+        if self.context and self._owns_context:
             await self.context.close()
         if self.playwright:
             await self.playwright.stop()
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from core.browser import Browser, CHROMIUM_ARGS
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledBrowser:
+    """A warm Chromium instance and its usage counters."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.tasks_served = 0
+        self.active = 0
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    Keeps warm Chromium instances and hands out a fresh browser context per task.
+
+    Launching Chromium takes seconds; creating a context on a running instance
+    takes milliseconds. Instances are health-checked before each lease, and an
+    instance that has served recycle_after_tasks tasks is retired: it takes no
+    new leases and is replaced once its last lease is released.
+    """
+
+    def __init__(self, browser_settings):
+        self.browser_settings = browser_settings
+        self.size = browser_settings.pool_size
+        self.recycle_after_tasks = browser_settings.recycle_after_tasks
+        self.playwright = None
+        self._instances = []
+        self._lock = asyncio.Lock()
+        self._leases = {}  # Browser -> _PooledBrowser
+        self._start_task = None
+
+    async def start(self):
+        """Start Playwright and launch the warm instances; safe to call repeatedly."""
+        if self._start_task is None:
+            self._start_task = asyncio.ensure_future(self._start())
+        start_task = self._start_task
+        try:
+            await asyncio.shield(start_task)
+        except Exception:
+            # Let the next call try again instead of re-raising this failure forever
+            if self._start_task is start_task:
+                self._start_task = None
+            raise
+
+    async def _start(self):
+        logger.info(f"Starting browser pool with {self.size} instance(s)...")
+        self.playwright = await async_playwright().start()
+        results = await asyncio.gather(*(self._launch() for _ in range(self.size)), return_exceptions=True)
+        launched = [result for result in results if isinstance(result, _PooledBrowser)]
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Don't leak the instances that did launch, or Playwright
+            for instance in launched:
+                await self._discard(instance)
+            await self.playwright.stop()
+            self.playwright = None
+            logger.error(f"Browser pool failed to start: {errors[0]}")
+            raise errors[0]
+        self._instances.extend(launched)
+        logger.info("Browser pool ready.")
+
+    async def _launch(self):
+        browser = await self.playwright.chromium.launch(
+            headless=self.browser_settings.headless,
+            args=CHROMIUM_ARGS
+        )
+        return _PooledBrowser(browser)
+
+    async def _discard(self, instance):
+        if instance in self._instances:
+            self._instances.remove(instance)
+        try:
+            await instance.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+
+    def _is_healthy(self, instance):
+        return instance.browser.is_connected()
+
+    async def acquire(self, network_policy=None):
+        """
+        Lease a Browser on a fresh context from a warm instance. The Browser
+        still needs initialize(); return it with release().
+        """
+        await self.start()
+        async with self._lock:
+            for instance in list(self._instances):
+                if not self._is_healthy(instance):
+                    logger.warning("Pooled browser is disconnected, replacing it")
+                    await self._discard(instance)
+
+            candidates = [instance for instance in self._instances if not instance.retiring]
+            if candidates:
+                instance = min(candidates, key=lambda candidate: candidate.active)
+            else:
+                instance = await self._launch()
+                self._instances.append(instance)
+
+            context = await instance.browser.new_context()
+            instance.active += 1
+            instance.tasks_served += 1
+            if instance.tasks_served >= self.recycle_after_tasks:
+                instance.retiring = True
+
+        browser = Browser(self.browser_settings, context=context, network_policy=network_policy)
+        self._leases[browser] = instance
+        return browser
+
+    async def release(self, browser):
+        """Close the leased context and recycle its instance if it is due."""
+        instance = self._leases.pop(browser, None)
+        try:
+            await browser.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {e}")
+        if instance is None:
+            return
+
+        async with self._lock:
+            instance.active -= 1
+            if instance.retiring and instance.active == 0:
+                logger.info(f"Recycling browser after {instance.tasks_served} tasks")
+                await self._discard(instance)
+                if len(self._instances) < self.size:
+                    self._instances.append(await self._launch())
+
+    @asynccontextmanager
+    async def lease(self, network_policy=None):
+        """Context manager form of acquire() and release()."""
+        browser = await self.acquire(network_policy)
+        try:
+            yield browser
+        finally:
+            await self.release(browser)
+
+    async def close(self):
+        """Close every instance and stop Playwright."""
+        for instance in list(self._instances):
+            await self._discard(instance)
+        if self._start_task and not self._start_task.done():
+            self._start_task.cancel()
+        self._start_task = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
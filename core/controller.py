@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import json
 import traceback
@@ -21,6 +20,7 @@ class Controller:
         
         # Element interaction actions
         self.registry["click_element"] = self._click_element_action
+        self.registry["click_coordinates"] = self._click_coordinates_action
         self.registry["input_text"] = self._input_text_action
         self.registry["scroll"] = self._scroll_action
         
@@ -46,8 +46,6 @@ class Controller:
         logger.info(f"Navigating to: {url}")
         try:
             await browser.navigate_to(url)
-            # Wait for a moment to ensure page loads before returning
-            await asyncio.sleep(0.5)
             return {"success": True, "message": f"Navigated to {url}"}
         except Exception as e:
             error_msg = f"Failed to navigate to {url}: {str(e)}"
@@ -64,8 +62,6 @@ class Controller:
         try:
             success = await browser.click_element_by_index(index)
             if success:
-                # Wait a moment for any page changes
-                await asyncio.sleep(0.5)
                 return {"success": True, "message": f"Clicked element with index {index}"}
             else:
                 error_msg = f"Failed to click element with index {index}"
@@ -76,6 +72,27 @@ class Controller:
             logger.error(error_msg)
             return {"error": error_msg}
 
+    async def _click_coordinates_action(self, params, browser):
+        """Click at viewport coordinates, for vision targets without an element index"""
+        x = params.get("x")
+        y = params.get("y")
+        if x is None or y is None:
+            return {"error": "x and y parameters are required"}
+        
+        logger.info(f"Clicking at coordinates: {x}, {y}")
+        try:
+            success = await browser.click_coordinates(x, y)
+            if success:
+                return {"success": True, "message": f"Clicked at coordinates {x}, {y}"}
+            else:
+                error_msg = f"Failed to click at coordinates {x}, {y}"
+                logger.warning(error_msg)
+                return {"error": error_msg}
+        except Exception as e:
+            error_msg = f"Error clicking at coordinates {x}, {y}: {str(e)}"
+            logger.error(error_msg)
+            return {"error": error_msg}
+
     async def _input_text_action(self, params, browser):
         """Input text into an element by index"""
         index = params.get("index")
@@ -108,7 +125,6 @@ class Controller:
             await browser.page.go_back()
             # Wait for page to load
             await browser.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(0.5)
             return {"success": True, "message": "Navigated back"}
         except Exception as e:
             error_msg = f"Failed to navigate back: {str(e)}"
@@ -122,7 +138,6 @@ class Controller:
             await browser.page.go_forward()
             # Wait for page to load
             await browser.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(0.5)
             return {"success": True, "message": "Navigated forward"}
         except Exception as e:
             error_msg = f"Failed to navigate forward: {str(e)}"
@@ -143,7 +158,6 @@ class Controller:
             else:
                 return {"error": f"Invalid scroll direction: {direction}. Use 'up' or 'down'."}
                 
-            await asyncio.sleep(0.3)  # Give time for scroll to complete
             return {"success": True, "message": f"Scrolled {direction} by {amount} pixels"}
         except Exception as e:
             error_msg = f"Failed to scroll: {str(e)}"
@@ -166,7 +180,6 @@ class Controller:
                 
             await pages[page_id].bring_to_front()
             browser.page = pages[page_id]
-            await asyncio.sleep(0.3)  # Brief pause after switching
             return {"success": True, "message": f"Switched to tab {page_id}"}
         except Exception as e:
             error_msg = f"Failed to switch tab: {str(e)}"
@@ -177,6 +190,13 @@ class Controller:
         """Open a new tab with optional URL"""
         url = params.get("url")
         
+        # Refuse rather than open a page the per-context limit would close behind the agent
+        limit = browser.browser_settings.max_pages_per_context
+        if len(browser.context.pages) >= limit:
+            error_msg = f"Cannot open a new tab: {limit} tabs are already open. Close a tab first."
+            logger.warning(error_msg)
+            return {"error": error_msg}
+        
         logger.info(f"Opening new tab{' with URL: ' + url if url else ''}")
         try:
             new_page = await browser.context.new_page()
@@ -184,7 +204,6 @@ class Controller:
                 await new_page.goto(url)
                 await new_page.wait_for_load_state("domcontentloaded")
             browser.page = new_page
-            await asyncio.sleep(0.5)  # Wait for tab to stabilize
             return {"success": True, "message": f"Opened new tab{' with URL: ' + url if url else ''}"}
         except Exception as e:
             error_msg = f"Failed to open tab: {str(e)}"
@@ -199,7 +218,6 @@ class Controller:
             # Switch to another tab if available
             if browser.context.pages:
                 browser.page = browser.context.pages[0]
-                await asyncio.sleep(0.3)  # Brief pause after switching
                 return {"success": True, "message": "Closed tab and switched to remaining tab"}
             else:
                 # No tabs left, this is unusual
@@ -329,7 +347,31 @@ class Controller:
             if result.get("is_done") or result.get("error"):
                 break
                 
-            # Small delay between actions to allow page to update
-            await asyncio.sleep(0.5)
+            # Let the page settle before the next action
+            settle = await browser.wait_for_settle()
+            logger.info(f"Page settled={settle['settled']} after {settle['waited_ms']} ms")
+            
+        return results
+
+    async def multi_act_stream(self, actions, browser):
+        """
+        Execute actions from an async iterator as they arrive, in sequence,
+        e.g. while the LLM is still generating the rest of its response
+        """
+        results = []
+        
+        async for action in actions:
+            # Let the page settle after the previous action
+            if results:
+                settle = await browser.wait_for_settle()
+                logger.info(f"Page settled={settle['settled']} after {settle['waited_ms']} ms")
+            
+            # Execute the action
+            result = await self.act(action, browser)
+            results.append(result)
+            
+            # Break if action is completed or had an error
+            if result.get("is_done") or result.get("error"):
+                break
             
-        return results
\ No newline at end of file
+        return results
@@ -2,14 +2,26 @@ import json
 from datetime import datetime
 from pathlib import Path
 import logging
+from llm.tokenizer import count_tokens, fit_lines, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Prompt sections in the order they are filled
+PROMPT_SECTIONS = ("system", "task", "elements", "vision", "history")
+
+# Default token budget of each section, and of the whole prompt
+DEFAULT_PROMPT_BUDGETS = {"system": 1500, "task": 300, "elements": 2000, "vision": 500, "history": 1500}
+DEFAULT_MAX_PROMPT_TOKENS = 6000
+
 class MessageManager:
-    def __init__(self, task):
+    def __init__(self, task, budgets=None, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS):
         self.task = task
         self.messages = []
         self.history = []  # Store browser state history
+        self.budgets = {**DEFAULT_PROMPT_BUDGETS, **(budgets or {})}
+        self.max_prompt_tokens = max_prompt_tokens
+        # Token count per section of the last assembled prompt
+        self.last_prompt_tokens = {}
         self.load_prompts()
 
     def load_prompts(self):
@@ -46,6 +58,9 @@ Your response must be a valid JSON object with the following structure:
 }
 ```"""
         
+        # Instructions without the task, which is budgeted separately
+        instructions = self.system_prompt
+        
         # Add task information to the system prompt
         self.system_prompt += f"\n\nYour task: {self.task}\n\n"
         
@@ -62,36 +77,40 @@ Your response must be a valid JSON object with the following structure:
 2. click_element: Click on an element by its index
     ```json
    {"click_element": {"index": 5}}
-3. input_text: Type text into an element by its index
+3. click_coordinates: Click at a vision "click at (x, y)" target that has no element index
+    ```json
+   {"click_coordinates": {"x": 640, "y": 360}}
+4. input_text: Type text into an element by its index
     ```json
    {"input_text": {"index": 3, "text": "hello world"}}
-4. go_back: Navigate back in the browser history
+5. go_back: Navigate back in the browser history
     ```json
    {"go_back": {}}
-5. go_forward: Navigate forward in the browser history
+6. go_forward: Navigate forward in the browser history
     ```json
    {"go_forward": {}}
-6. scroll: Scroll the page by amount of pixels
+7. scroll: Scroll the page by amount of pixels
     ```json
    {"scroll": {"direction": "down", "amount": 300}}
-7. switch_tab: Switch to another tab by its ID
+8. switch_tab: Switch to another tab by its ID
     ```json
    {"switch_tab": {"page_id": 1}}
-8. open_tab: Open a new tab with optional URL
+9. open_tab: Open a new tab with optional URL
     ```json
    {"open_tab": {"url": "https://example.com"}}
-9. close_tab: Close the current tab
+10. close_tab: Close the current tab
     ```json
    {"close_tab": {}}
-10. extract_content: Extract content from the page
+11. extract_content: Extract content from the page
     ```json
    {"extract_content": {"selector": "article"}}
-11. done: Mark the task as complete with success or failure
+12. done: Mark the task as complete with success or failure
     ```json
    {"done": {"text": "Task completed successfully", "success": true}}
 
 """
         self.messages[0]["content"] += actions_doc
+        self.instructions = instructions + "\n" + actions_doc
 
     def add_state_message(self, state):
         """
@@ -110,22 +129,28 @@ Your response must be a valid JSON object with the following structure:
         tabs_text = self._format_tabs(state.get("tabs", []))
         
         # Compile the full state message
-        state_message = f"""
+        header = f"""
 Current State at {timestamp}:
 URL: {state.get('url', 'N/A')}
 Title: {state.get('title', 'N/A')}
 Available Tabs:
 {tabs_text}
 Interactive Elements:
-{elements_text}
 """
+        state_message = header + elements_text + "\n"
+        
         # Add vision analysis if available
+        vision_summary = None
         if state.get("vision"):
             vision_summary = self._format_vision_results(state["vision"])
             state_message += f"\nVision Analysis:\n{vision_summary}\n"
         
-        # Add to messages
-        self.messages.append({"role": "user", "content": state_message})
+        # Add to messages; the sections let get_latest_message budget elements and vision separately
+        self.messages.append({
+            "role": "user",
+            "content": state_message,
+            "sections": {"header": header, "elements": elements_text, "vision": vision_summary},
+        })
         logger.info(f"Added state message with {len(state.get('clickable_elements', []))} elements")
 
     def _format_clickable_elements(self, elements):
@@ -185,8 +210,7 @@ Interactive Elements:
             for i, detection in enumerate(detections[:10]):  # Limit to first 10 for brevity
                 cls = detection.get("class", "unknown")
                 conf = detection.get("confidence", 0)
-                bbox = detection.get("bbox", [0, 0, 0, 0])
-                formatted_result += f"- {cls} (confidence: {conf:.2f}) at position: [{bbox[0]:.0f}, {bbox[1]:.0f}, {bbox[2]:.0f}, {bbox[3]:.0f}]\n"
+                formatted_result += f"- {cls} (confidence: {conf:.2f}) {self._format_vision_target(detection)}\n"
             
             if len(detections) > 10:
                 formatted_result += f"... and {len(detections) - 10} more objects\n"
@@ -198,13 +222,27 @@ Interactive Elements:
             for i, region in enumerate(text_regions[:15]):  # Limit to first 15 for brevity
                 text = region.get("text", "")
                 conf = region.get("confidence", 0)
-                formatted_result += f"- '{text}' (confidence: {conf:.2f})\n"
+                formatted_result += f"- '{text}' (confidence: {conf:.2f}) {self._format_vision_target(region)}\n"
                 
             if len(text_regions) > 15:
                 formatted_result += f"... and {len(text_regions) - 15} more text regions\n"
                 
+        # Results from async vision describe the page before the last actions
+        if formatted_result and vision_results.get("previous_step"):
+            formatted_result = "(From the screenshot before the last actions)\n" + formatted_result
+                
         return formatted_result if formatted_result else "No vision analysis available."
 
+    def _format_vision_target(self, item):
+        """Say how the LLM can act on a vision box: its element index, or the point to click"""
+        if item.get("element_index") is not None:
+            return f"on element [{item['element_index']}]"
+        if item.get("click_target"):
+            x, y = item["click_target"]
+            return f"click at ({x}, {y})"
+        bbox = item.get("bbox", [0, 0, 0, 0])
+        return f"at position: [{bbox[0]:.0f}, {bbox[1]:.0f}, {bbox[2]:.0f}, {bbox[3]:.0f}]"
+
     def add_llm_response(self, response):
         """Add LLM response to the conversation history"""
         try:
@@ -228,40 +266,104 @@ Interactive Elements:
             logger.error(f"Failed to add LLM response: {e}")
 
     def get_latest_message(self):
-        """Get the latest state message for the LLM with improved JSON generation guidance"""
+        """
+        Assemble the prompt for the LLM within its token budget.
         
-        # Always include system prompt
-        formatted_conversation = self.messages[0]["content"]
+        Sections are filled in priority order (system, task, elements,
+        vision, history), each up to its own budget; tokens a section leaves
+        unused go to the sections still cut short, in the same order. The
+        system instructions are never cut and the task always gets its own
+        budget, even if that overruns max_prompt_tokens. Elements and vision
+        keep whole lines, and history keeps whole messages, newest first.
+        """
+        latest = self.messages[-1] if len(self.messages) > 1 and "sections" in self.messages[-1] else None
+        history = self.messages[1:-1] if latest else self.messages[1:]
+        sections = latest["sections"] if latest else {}
         
-        # Add specific JSON instructions at the top for higher priority
-        json_instruction = """
-    IMPORTANT: Your response MUST be in valid JSON format with this exact structure:
-    {
-    "current_state": {
-        "evaluation_previous_goal": "String with evaluation",
-        "memory": "String with memory of what has been done",
-        "next_goal": "String with next immediate goal"
-    },
-    "action": [
-        {"action_name": {"param_name": "param_value"}}
-    ]
-    }
-    """
-        formatted_conversation = json_instruction + "\n\n" + formatted_conversation
+        task_text = f"Your task: {self.task}"
+        element_lines = sections.get("elements", "").split("\n") if latest else []
+        vision_lines = sections["vision"].strip().split("\n") if sections.get("vision") else []
+        history_blocks = [self._format_history_message(msg) for msg in history]
+        header_tokens = count_tokens(sections.get("header", ""))
         
-        # Add recent conversation history (limited to last 3 exchanges to reduce token count)
-        # Skip the first message (system prompt) since we already included it
-        for msg in self.messages[-6:]:  # Only include the last few messages
-            role = msg["role"]
-            content = msg["content"]
-            
-            if role == "user":
-                formatted_conversation += "\nUser message:\n"
-            elif role == "assistant":
-                formatted_conversation += "\nAssistant response:\n"
-                
-            if len(content) > 2000:  # Limit very long messages
-                content = content[:2000] + "... (truncated)"
-            formatted_conversation += content + "\n"
+        needed = {
+            "system": count_tokens(self.instructions),
+            "task": count_tokens(task_text),
+            "elements": header_tokens + sum(count_tokens(line) + 1 for line in element_lines),
+            "vision": sum(count_tokens(line) + 1 for line in vision_lines),
+            "history": sum(count_tokens(block) for block in history_blocks),
+        }
+        allotted = self._allot(needed)
+        
+        # Render every section within its allotment
+        task_text = truncate_to_tokens(task_text, allotted["task"])
+        elements_text, _ = fit_lines(element_lines, max(0, allotted["elements"] - header_tokens), "elements")
+        vision_text, _ = fit_lines(vision_lines, allotted["vision"], "vision results")
+        history_text, kept = self._fit_history(history_blocks, allotted["history"])
+        
+        prompt = f"{self.instructions}\n{task_text}\n\n{history_text}"
+        if latest:
+            prompt += "\nUser message:\n" + sections["header"] + elements_text + "\n"
+            if vision_text:
+                prompt += f"\nVision Analysis:\n{vision_text}\n"
         
-        return formatted_conversation
\ No newline at end of file
+        self.last_prompt_tokens = {
+            "system": needed["system"],
+            "task": count_tokens(task_text),
+            "elements": header_tokens + count_tokens(elements_text),
+            "vision": count_tokens(vision_text),
+            "history": count_tokens(history_text),
+            "total": count_tokens(prompt),
+        }
+        logger.info(
+            f"Prompt: {self.last_prompt_tokens['total']} tokens "
+            + ", ".join(f"{name} {self.last_prompt_tokens[name]}" for name in PROMPT_SECTIONS)
+            + f"; {kept}/{len(history_blocks)} history messages"
+        )
+        return prompt
+
+    def _allot(self, needed):
+        """Split the prompt budget between sections by priority; see get_latest_message."""
+        remaining = self.max_prompt_tokens
+        allotted = {}
+        for name in PROMPT_SECTIONS:
+            if name == "system":
+                share = needed[name]
+                if share > self.budgets[name]:
+                    logger.warning(f"System instructions take {share} tokens, over their budget of {self.budgets[name]}")
+            elif name == "task":
+                # The task always goes in, even when the instructions alone fill the prompt
+                share = min(needed[name], self.budgets[name])
+            else:
+                share = max(0, min(needed[name], self.budgets[name], remaining))
+            allotted[name] = share
+            remaining -= share
+        if remaining < 0:
+            logger.warning(
+                f"System instructions and task take {self.max_prompt_tokens - remaining} tokens, over the "
+                f"prompt budget of {self.max_prompt_tokens}; page state, vision and history are left out"
+            )
+        for name in PROMPT_SECTIONS:
+            extra = max(0, min(needed[name] - allotted[name], remaining))
+            allotted[name] += extra
+            remaining -= extra
+        return allotted
+
+    def _format_history_message(self, msg):
+        label = "Assistant response" if msg["role"] == "assistant" else "User message"
+        return f"\n{label}:\n{msg['content']}\n"
+
+    def _fit_history(self, blocks, budget):
+        """Keep the newest history messages that fit in budget, in order; the oldest kept one may be cut."""
+        kept, used = [], 0
+        for block in reversed(blocks):
+            cost = count_tokens(block)
+            if used + cost <= budget:
+                kept.append(block)
+                used += cost
+                continue
+            # Part of one more message is still worth sending if there is room for it
+            if budget - used >= 100:
+                kept.append(truncate_to_tokens(block, budget - used))
+            break
+        return "".join(reversed(kept)), len(kept)
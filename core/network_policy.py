@@ -0,0 +1,114 @@
+import logging
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCKLIST_PATH = Path(__file__).parent.parent / "config" / "blocklist.txt"
+
+
+def _empty_stats():
+    return {
+        "blocked_requests": 0,
+        "blocked_by_type": {},
+        "blocked_by_domain": 0,
+        "loaded_requests": 0,
+        "loaded_bytes": 0,
+    }
+
+
+def load_blocklist(path):
+    """Read a domain blocklist file, one domain per line, ignoring comments."""
+    path = Path(path)
+    if not path.exists():
+        logger.warning(f"Blocklist not found at {path}, no domains will be blocked")
+        return set()
+    domains = set()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip().lower()
+        if line:
+            domains.add(line)
+    return domains
+
+
+class NetworkPolicy:
+    """
+    Request-interception layer that blocks heavy or unwanted resources.
+
+    Requests are aborted when their Playwright resource type is blocked
+    (images, media, fonts, ...) or their host, or any parent domain of it, is
+    in the local blocklist. Blocked and loaded requests are counted per page.
+    Aborted requests never transfer a body, so their size is unknown; the
+    bytes that did load are summed from Content-Length for comparison with an
+    unblocked run. Note that Playwright disables the HTTP cache for routed
+    contexts.
+    """
+
+    def __init__(self, blocked_types=(), blocked_domains=()):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = set(blocked_domains)
+        self._stats = {}  # page -> stats dict
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Build the policy from the application settings, or return None if
+        resource blocking is disabled. Images are blocked only when vision is
+        off, since without vision screenshots only need layout.
+        """
+        browser_settings = settings.browser
+        if not browser_settings.block_resources:
+            return None
+        blocked_types = set(browser_settings.blocked_resource_types)
+        if not settings.use_vision:
+            blocked_types.add("image")
+        blocked_domains = load_blocklist(browser_settings.blocklist_path or DEFAULT_BLOCKLIST_PATH)
+        return cls(blocked_types, blocked_domains)
+
+    async def attach(self, context):
+        """Install the interception route and response accounting on a context."""
+        await context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+        logger.info(
+            f"Network policy blocking types {sorted(self.blocked_types)} "
+            f"and {len(self.blocked_domains)} domains"
+        )
+
+    def _is_blocked_domain(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        labels = host.split(".")
+        return any(".".join(labels[i:]) in self.blocked_domains for i in range(len(labels) - 1))
+
+    def _page_stats(self, request):
+        try:
+            page = request.frame.page
+        except Exception:
+            page = None
+        return self._stats.setdefault(page, _empty_stats())
+
+    async def _handle_route(self, route):
+        request = route.request
+        by_type = request.resource_type in self.blocked_types
+        if by_type or self._is_blocked_domain(request.url):
+            stats = self._page_stats(request)
+            stats["blocked_requests"] += 1
+            if by_type:
+                by_type_counts = stats["blocked_by_type"]
+                by_type_counts[request.resource_type] = by_type_counts.get(request.resource_type, 0) + 1
+            else:
+                stats["blocked_by_domain"] += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _on_response(self, response):
+        stats = self._page_stats(response.request)
+        stats["loaded_requests"] += 1
+        try:
+            stats["loaded_bytes"] += int(response.headers.get("content-length", 0))
+        except ValueError:
+            pass
+
+    def stats(self, page):
+        """Return the request counters for a page."""
+        return dict(self._stats.get(page) or _empty_stats())
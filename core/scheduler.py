@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from core.agent import Agent
+from core.browser_pool import BrowserPool
+from core.network_policy import NetworkPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class AgentScheduler:
+    """
+    Runs many agent tasks concurrently inside one shared Chromium process.
+
+    Every task gets its own isolated BrowserContext leased from a BrowserPool,
+    so cookies, storage and tabs never leak between tasks. At most
+    max_concurrent_agents loops run at once; each one is bounded by the step
+    limit, a wall-clock timeout and the per-context page limit enforced by
+    Browser.
+    """
+
+    def __init__(self, settings, pool=None):
+        self.settings = settings
+        self.pool = pool or BrowserPool(settings.browser)
+        self._owns_pool = pool is None
+        self.max_concurrent = settings.browser.max_concurrent_agents
+        self.task_timeout = settings.browser.task_timeout_s
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    async def run(self, tasks):
+        """
+        Run all tasks and return one result dict per task, in input order.
+        A task that fails, even before its agent starts, gets an error in its
+        result; the other tasks keep running.
+        """
+        try:
+            results = await asyncio.gather(*(self._run_task(task) for task in tasks), return_exceptions=True)
+            return [
+                result if not isinstance(result, BaseException) else self._result(task, None, f"Agent execution error: {result}", 0.0)
+                for task, result in zip(tasks, results)
+            ]
+        finally:
+            if self._owns_pool:
+                await self.pool.close()
+
+    async def _run_task(self, task):
+        async with self._semaphore:
+            start = time.monotonic()
+            browser = agent = None
+            error = None
+            logger.info(f"Starting task: {task}")
+            try:
+                # Acquiring can fail too (e.g. Chromium does not launch); that fails only this task
+                browser = await self.pool.acquire(NetworkPolicy.from_settings(self.settings))
+                agent = Agent(task, self.settings, browser=browser)
+                await asyncio.wait_for(
+                    agent.run(max_steps=self.settings.max_steps),
+                    timeout=self.task_timeout
+                )
+            except asyncio.TimeoutError:
+                error = f"Task timed out after {self.task_timeout} seconds"
+                logger.warning(f"{error}: {task}")
+            except Exception as e:
+                error = f"Agent execution error: {e}"
+                logger.error(error, exc_info=True)
+            finally:
+                if browser is not None:
+                    await self.pool.release(browser)
+
+            return self._result(task, agent, error, time.monotonic() - start)
+
+    def _result(self, task, agent, error, duration_s):
+        """The result dict of a task; agent is None when the task failed before its agent was created."""
+        state = agent.state if agent else None
+        return {
+            "task": task,
+            "done": state.is_done() if state else False,
+            "success": state.is_successful() if state else False,
+            "final_result": state.get_final_result() if state else None,
+            "steps": state.steps_completed if state else 0,
+            "error": error or (state.get_last_error() if state else None),
+            "duration_s": round(duration_s, 2),
+        }
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Resolves after the next two animation frames (so pending rAF callbacks have
+# run) with the time since the DOM tracker last saw a mutation. The timeout
+# covers background tabs, where animation frames never fire.
+QUIET_CHECK_JS = """
+() => new Promise((resolve) => {
+    const report = () => {
+        const tracker = window.__agentDomTracker;
+        resolve({
+            ready: document.readyState !== 'loading',
+            quietFor: tracker ? performance.now() - tracker.lastMutation : null
+        });
+    };
+    requestAnimationFrame(() => requestAnimationFrame(report));
+    setTimeout(report, 100);
+})
+"""
+
+
+class PageSettler:
+    """
+    Detects when a page has settled after a navigation or an action.
+
+    In-flight requests are tracked from the browser context's network events;
+    DOM mutation quiescence and pending animation frames are checked in the
+    page through the DOM tracker installed by Browser. A page is settled when
+    it has no recent in-flight requests, has painted twice, and has seen no
+    DOM mutation for the quiet window. Requests open longer than the
+    long-request threshold (long polling, streaming) are ignored and dropped,
+    as are requests of a page that closed or navigated away, which may never
+    report finishing.
+
+    An action's effects (a click starting a navigation or a fetch) can begin
+    a moment after the action returns, so a page is not reported settled
+    within the grace window unless a request or navigation has started.
+    """
+
+    def __init__(self, context, browser_settings):
+        self.timeout_ms = browser_settings.settle_timeout_ms
+        self.quiet_ms = browser_settings.settle_quiet_ms
+        self.long_request_ms = browser_settings.settle_long_request_ms
+        self.grace_ms = browser_settings.settle_grace_ms
+        self.poll_interval = 0.05
+        self._inflight = {}  # request -> (page, start time)
+        self._last_activity = {}  # page -> time its last request or navigation started
+
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_request_done)
+        context.on("requestfailed", self._on_request_done)
+        context.on("page", self._watch_page)
+        for page in context.pages:
+            self._watch_page(page)
+
+    def _watch_page(self, page):
+        page.on("close", self._forget_page)
+        page.on("framenavigated", lambda frame: self._on_navigated(page, frame))
+
+    def _on_request(self, request):
+        try:
+            page = request.frame.page
+        except Exception:
+            # Service worker requests have no frame
+            page = None
+        now = time.monotonic()
+        self._inflight[request] = (page, now)
+        self._last_activity[page] = now
+
+    def _on_request_done(self, request):
+        self._inflight.pop(request, None)
+
+    def _on_navigated(self, page, frame):
+        if frame != page.main_frame:
+            return
+        # Requests of the previous document may be dropped without a requestfailed event
+        now = time.monotonic()
+        self._last_activity[page] = now
+        for request, (request_page, _) in list(self._inflight.items()):
+            if request_page is page and not request.is_navigation_request():
+                self._inflight.pop(request, None)
+
+    def _forget_page(self, page):
+        for request, (request_page, _) in list(self._inflight.items()):
+            if request_page is page:
+                self._inflight.pop(request, None)
+        self._last_activity.pop(page, None)
+
+    def pending_requests(self, page):
+        """Return the number of requests on the page that count against settling."""
+        now = time.monotonic()
+        pending = 0
+        for request, (request_page, started) in list(self._inflight.items()):
+            if (now - started) * 1000 >= self.long_request_ms:
+                # Long polls and streams never count again; don't keep them forever
+                self._inflight.pop(request, None)
+            elif request_page is page:
+                pending += 1
+        return pending
+
+    async def wait(self, page, timeout_ms=None):
+        """
+        Wait until the page settles or the deadline passes.
+
+        Returns a dict with "settled" (bool), "waited_ms" (how long the wait
+        actually took) and "pending_requests" (requests still counted at return).
+        """
+        timeout_ms = self.timeout_ms if timeout_ms is None else timeout_ms
+        start = time.monotonic()
+        deadline = start + timeout_ms / 1000
+        grace_end = min(start + self.grace_ms / 1000, deadline)
+
+        while True:
+            pending = self.pending_requests(page)
+            now = time.monotonic()
+            # Give a just-triggered request or navigation a moment to start
+            started = self._last_activity.get(page, 0.0) >= start
+            in_grace = now < grace_end and not started
+            quiet = False
+            if pending == 0 and not in_grace:
+                try:
+                    check = await page.evaluate(QUIET_CHECK_JS)
+                    quiet_for = check["quietFor"]
+                    quiet = check["ready"] and (quiet_for is None or quiet_for >= self.quiet_ms)
+                except Exception as e:
+                    # The execution context goes away while the page navigates
+                    logger.debug(f"Settle check failed, page is still changing: {e}")
+
+            now = time.monotonic()
+            if quiet or now >= deadline:
+                result = {
+                    "settled": quiet,
+                    "waited_ms": round((now - start) * 1000, 1),
+                    "pending_requests": pending,
+                }
+                if not quiet:
+                    logger.debug(f"Page did not settle within {timeout_ms} ms: {result}")
+                return result
+
+            await asyncio.sleep(min(self.poll_interval, deadline - now))
@@ -0,0 +1,23 @@
+import threading
+
+
+class SharedInstances:
+    """
+    Process-wide instances of one class, keyed by the settings they are built
+    from: get(*key) builds factory(*key) on first use and returns that same
+    instance afterwards, from any thread, so every agent in the process
+    shares it.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def get(self, *key):
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = self.factory(*key)
+                self._instances[key] = instance
+            return instance
@@ -1,3 +1,7 @@
+import asyncio
+import time
+
+
 class AgentState:
     def __init__(self):
         # History of steps, each with LLM response and executed action results
@@ -65,4 +69,61 @@ class AgentState:
         for result in last_step.get("action_results", []):
             if result.get("error"):
                 return result.get("error")
-        return None
\ No newline at end of file
+        return None
+
+class BrowserState(dict):
+    """
+    Snapshot of the browser state whose expensive fields are fetched on demand.
+
+    Cheap fields (url, title, clickable_elements) are captured with the state.
+    Lazy fields (dom, screenshot_bytes, screenshot, tabs) stay absent until
+    they are requested through get_state(include=...) or loaded with
+    `await fetch(name)`, so plain dict access such as state.get("dom") never
+    triggers a page call. The time spent fetching each field is recorded in
+    state["timings"] in milliseconds.
+    """
+    LAZY_FIELDS = ("dom", "screenshot_bytes", "screenshot", "screenshot_clips", "tabs")
+
+    def __init__(self, loaders, **fields):
+        super().__init__(**fields)
+        self.setdefault("timings", {})
+        # Maps field names to coroutine functions that fetch them
+        self._loaders = loaders
+        # Fetches in progress, so concurrent requests for a field share one call
+        self._pending = {}
+
+    def __missing__(self, key):
+        if key in self._loaders:
+            raise KeyError(f"{key!r} has not been loaded yet; use 'await state.fetch({key!r})'")
+        raise KeyError(key)
+
+    def is_loaded(self, name):
+        """Return True if the field is present without fetching."""
+        return name in self
+
+    async def fetch(self, name):
+        """Return a field, fetching it from the page the first time it is requested."""
+        if name in self:
+            return self[name]
+        if name not in self._loaders:
+            raise KeyError(name)
+        task = self._pending.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._load_field(name))
+            self._pending[name] = task
+        return await task
+
+    async def _load_field(self, name):
+        start = time.perf_counter()
+        try:
+            value = await self._loaders[name]()
+        finally:
+            self._pending.pop(name, None)
+        self[name] = value
+        self["timings"][name] = round((time.perf_counter() - start) * 1000, 1)
+        return value
+
+    async def load(self, *names):
+        """Fetch several fields concurrently and return the state."""
+        await asyncio.gather(*(self.fetch(name) for name in names))
+        return self
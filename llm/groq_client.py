@@ -1,14 +1,20 @@
 # In llm/groq_client.py
 
 import asyncio
-import requests
 import json
 import logging
+import httpx
+from llm.rate_limiter import RETRYABLE_STATUSES, LLMUnavailableError, RateLimiter, backoff_delay, retry_after_seconds
+from llm.tokenizer import count_tokens
+from llm.transport import HTTPTransport
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
 class GroqClient:
-    def __init__(self, api_key, model, temperature=0.7, max_tokens=200):
+    def __init__(self, api_key, model, temperature=0.7, max_tokens=200, api_url=None, transport=None,
+                 rate_limiter=None, max_retries=4, retry_base_delay_s=1.0, retry_max_delay_s=30.0):
         # Strip any extra whitespace from the API key
         self.api_key = api_key.strip() if api_key else None
         if not self.api_key:
@@ -21,18 +27,19 @@ class GroqClient:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"  # Updated to exact endpoint
+        self.api_url = api_url or DEFAULT_API_URL
+        # Pooled keep-alive connections, normally shared by every agent (see get_transport)
+        self.transport = transport or HTTPTransport()
+        # Requests and tokens per minute, normally shared by every agent (see get_rate_limiter)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.retry_base_delay_s = retry_base_delay_s
+        self.retry_max_delay_s = retry_max_delay_s
+        # Queue wait and retries of the most recent call
+        self.last_request = {}
 
-    async def chat_completion(self, prompt_message):
-        """
-        Send a chat completion request to the Groq API following their exact format.
-        
-        Args:
-            prompt_message: The user message to process
-            
-        Returns:
-            String containing the LLM response or error formatted as JSON
-        """
+    def _build_request(self, prompt_message, stream=False):
+        """Build the chat completions payload and headers for a prompt."""
         # Format messages exactly as shown in the example
         messages = [
             {"role": "system", "content": "You are an AI assistant for browser automation. Your response must be valid JSON with this format: {\"current_state\": {\"evaluation_previous_goal\": \"...\", \"memory\": \"...\", \"next_goal\": \"...\"}, \"action\": [{\"action_name\": {\"param1\": \"value1\"}}]}"},
@@ -46,53 +53,185 @@ class GroqClient:
             "temperature": self.temperature,
             "max_tokens": self.max_tokens
         }
+        if stream:
+            payload["stream"] = True
         
         # Set headers exactly as shown in the example
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        return payload, headers
+
+    def _estimate_tokens(self, payload):
+        """Token count of a request's messages plus its completion budget."""
+        return sum(count_tokens(message["content"]) for message in payload["messages"]) + payload["max_tokens"]
+
+    async def _schedule(self, estimate):
+        """Wait for the rate limiter and record the queue time of this call."""
+        waited = await self.rate_limiter.acquire(estimate)
+        self.last_request["queue_wait_s"] = round(self.last_request.get("queue_wait_s", 0.0) + waited, 3)
+
+    async def _backoff(self, attempt, reason, headers=None):
+        """Sleep before the next attempt, honouring Retry-After, or raise once retries are used up."""
+        if attempt >= self.max_retries:
+            raise LLMUnavailableError(f"{reason} (gave up after {attempt + 1} attempts)")
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            # The server asked everyone to hold off, not just this agent
+            self.rate_limiter.pause(retry_after)
+        delay = backoff_delay(attempt, self.retry_base_delay_s, self.retry_max_delay_s, retry_after)
+        logger.warning(f"{reason}; retrying in {delay:.1f} s (attempt {attempt + 2}/{self.max_retries + 1})")
+        self.last_request["retries"] = attempt + 1
+        await asyncio.sleep(delay)
+
+    def _error_response(self, evaluation, memory, next_goal, error_msg):
+        """A valid JSON response ending the task, returned in place of a failed completion."""
+        self.last_request["error"] = error_msg
+        return json.dumps({
+            "current_state": {
+                "evaluation_previous_goal": evaluation,
+                "memory": memory,
+                "next_goal": next_goal
+            },
+            "action": [
+                {"done": {"text": error_msg, "success": False}}
+            ]
+        })
+
+    async def chat_completion(self, prompt_message):
+        """
+        Send a chat completion request to the Groq API following their exact format.
+        
+        Args:
+            prompt_message: The user message to process
+            
+        Returns:
+            String containing the LLM response or error formatted as JSON
+            
+        Raises:
+            LLMUnavailableError: the API stayed rate limited or unreachable
+                through every retry; the step can be retried later
+        """
+        payload, headers = self._build_request(prompt_message)
+        estimate = self._estimate_tokens(payload)
+        self.last_request = {"queue_wait_s": 0.0, "retries": 0}
         
         try:
-            # Run the blocking requests.post call in a thread
-            response = await asyncio.to_thread(
-                requests.post, 
-                self.api_url, 
-                json=payload, 
-                headers=headers
-            )
+            attempt = 0
+            while True:
+                await self._schedule(estimate)
+                try:
+                    # Reuses a pooled connection instead of a new TLS handshake per step
+                    response = await self.transport.post_json(self.api_url, payload, headers)
+                except httpx.TransportError as e:
+                    await self._backoff(attempt, f"LLM request failed: {type(e).__name__}: {e}")
+                    attempt += 1
+                    continue
+                if response.status_code not in RETRYABLE_STATUSES:
+                    break
+                await self._backoff(attempt, f"API error: {response.status_code}", response.headers)
+                attempt += 1
             
             if response.status_code == 200:
                 result = response.json()
+                usage = result.get("usage") or {}
+                self.rate_limiter.record_usage(estimate, usage.get("total_tokens"))
                 return result["choices"][0]["message"]["content"]
             else:
                 error_msg = f"API error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
                 
                 # Return a valid JSON response even in case of API error
-                return json.dumps({
-                    "current_state": {
-                        "evaluation_previous_goal": "Failed - API error",
-                        "memory": "API error occurred while processing the request",
-                        "next_goal": "Please retry or check API configuration"
-                    },
-                    "action": [
-                        {"done": {"text": error_msg, "success": False}}
-                    ]
-                })
+                return self._error_response(
+                    "Failed - API error",
+                    "API error occurred while processing the request",
+                    "Please retry or check API configuration",
+                    error_msg,
+                )
                 
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             error_msg = f"Exception in chat_completion: {str(e)}"
             logger.error(error_msg)
             
             # Return a valid JSON response even in case of exception
-            return json.dumps({
-                "current_state": {
-                    "evaluation_previous_goal": "Failed - Exception",
-                    "memory": "Exception occurred while processing the request",
-                    "next_goal": "Please retry"
-                },
-                "action": [
-                    {"done": {"text": error_msg, "success": False}}
-                ]
-            })
\ No newline at end of file
+            return self._error_response(
+                "Failed - Exception",
+                "Exception occurred while processing the request",
+                "Please retry",
+                error_msg,
+            )
+
+    async def stream_completion(self, prompt_message):
+        """
+        Stream a chat completion, yielding the content deltas as the server
+        sends them (server-sent events). Errors are yielded as the same JSON
+        response chat_completion returns, so callers can parse the stream the
+        same way in every case; a stream that fails midway simply ends.
+        Rate limits and connection failures are retried like chat_completion
+        as long as nothing has been streamed yet.
+        """
+        payload, headers = self._build_request(prompt_message, stream=True)
+        estimate = self._estimate_tokens(payload)
+        self.last_request = {"queue_wait_s": 0.0, "retries": 0}
+        streamed = False
+        
+        try:
+            attempt = 0
+            while True:
+                await self._schedule(estimate)
+                retry = None
+                try:
+                    async with self.transport.stream_json(self.api_url, payload, headers) as response:
+                        if response.status_code in RETRYABLE_STATUSES:
+                            retry = (f"API error: {response.status_code}", response.headers)
+                        elif response.status_code != 200:
+                            body = (await response.aread()).decode("utf-8", errors="replace")
+                            error_msg = f"API error: {response.status_code} - {body}"
+                            logger.error(error_msg)
+                            yield self._error_response(
+                                "Failed - API error",
+                                "API error occurred while processing the request",
+                                "Please retry or check API configuration",
+                                error_msg,
+                            )
+                            return
+                        else:
+                            done = False
+                            async for line in response.aiter_lines():
+                                # Read on to the end of the body after [DONE], so
+                                # the connection goes back to the pool
+                                if done or not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:"):].strip()
+                                if data == "[DONE]":
+                                    done = True
+                                    continue
+                                delta = json.loads(data)["choices"][0].get("delta", {})
+                                if delta.get("content"):
+                                    streamed = True
+                                    yield delta["content"]
+                            return
+                except httpx.TransportError as e:
+                    if streamed:
+                        raise
+                    retry = (f"LLM request failed: {type(e).__name__}: {e}", None)
+                await self._backoff(attempt, *retry)
+                attempt += 1
+                        
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            error_msg = f"Exception in stream_completion: {str(e)}"
+            logger.error(error_msg)
+            if streamed:
+                self.last_request["error"] = error_msg
+                return
+            yield self._error_response(
+                "Failed - Exception",
+                "Exception occurred while processing the request",
+                "Please retry",
+                error_msg,
+            )
@@ -0,0 +1,138 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+
+from core.shared import SharedInstances
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limited, or the service is briefly unavailable
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """The LLM API stayed rate limited or unavailable after every retry."""
+
+
+class TokenBucket:
+    """
+    Bucket refilled at rate_per_minute, holding at most capacity. Callers
+    reserve what they need up front; the level may go negative, and the debt
+    is how long later callers wait, so requests are served in arrival order.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        """Take amount from the bucket and return the seconds until it is covered."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, reserved, actual):
+        """
+        Settle a reservation once the real usage is known: return what was
+        over-reserved, or charge what was under. reserved is capped like in
+        reserve(), so a request bigger than the bucket is never over-credited.
+        """
+        self.level = min(self.capacity, self.level + min(reserved, self.capacity) - actual)
+
+
+class RateLimiter:
+    """
+    Client-side scheduler for LLM calls, shared by every agent in the process.
+
+    acquire() waits until both the requests-per-minute and tokens-per-minute
+    buckets allow the call; a limit of 0 disables that bucket. A server
+    Retry-After pauses every caller, not only the one that was told to wait.
+    Thread-safe, so agents on different event loops share one budget. Both
+    limits are off by default.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "queued": 0, "queue_wait_s": 0.0, "max_queue_wait_s": 0.0, "pauses": 0}
+
+    async def acquire(self, tokens=0):
+        """Wait for a slot for a request of about this many tokens; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["queued"] += 1
+                self.stats["queue_wait_s"] += wait
+                self.stats["max_queue_wait_s"] = max(self.stats["max_queue_wait_s"], wait)
+        if wait > 0:
+            logger.debug(f"LLM request queued for {wait:.2f} s by the rate limiter")
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated, actual):
+        """Correct the token bucket with the usage the API reported."""
+        if self.tokens and actual is not None:
+            with self._lock:
+                self.tokens.refund(estimated, actual)
+
+    def pause(self, seconds):
+        """Hold every caller for seconds, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.stats["pauses"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["queue_wait_s"] = round(stats["queue_wait_s"], 3)
+        stats["max_queue_wait_s"] = round(stats["max_queue_wait_s"], 3)
+        stats["mean_queue_wait_s"] = round(stats["queue_wait_s"] / max(1, stats["requests"]), 3)
+        return stats
+
+
+def retry_after_seconds(headers):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = headers.get("retry-after") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay_s=1.0, max_delay_s=30.0, retry_after=None):
+    """
+    Delay before retry number attempt (0-based): exponential backoff with
+    full jitter, or the server's Retry-After plus a little jitter so agents
+    told the same time do not all retry at once.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_delay_s)
+    return random.uniform(0, min(max_delay_s, base_delay_s * 2 ** attempt))
+
+
+_shared_limiters = SharedInstances(RateLimiter)
+
+
+def get_rate_limiter(llm_settings):
+    """The rate limiter for these limits; concurrent agents draw from one budget."""
+    return _shared_limiters.get(llm_settings.requests_per_minute, llm_settings.tokens_per_minute)
@@ -0,0 +1,188 @@
+"""
+Disk-backed record/replay cache for LLM responses.
+
+Responses are stored one JSON file per request, keyed by a hash of the
+model, temperature and the prompt messages with volatile parts (the state
+timestamps) normalized away, so the same step of the same task on the same
+pages maps to the same entry across runs:
+
+    record       call the API and save every successful response
+    replay       serve saved responses only; a miss raises LLMCacheMiss
+    passthrough  call the API, no cache
+
+The same cache can be served over HTTP by the stand-in server, so full
+Agent.run benchmarks can run offline:
+
+    python -m llm.standin_server --cache-dir llm_cache --recorded-latency
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("record", "replay", "passthrough")
+
+# "Current State at 2025-01-31 12:00:00" and similar timestamps
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?")
+
+
+class LLMCacheMiss(KeyError):
+    """No recorded response for a request in replay mode."""
+
+
+def normalize_prompt(text):
+    """Prompt text with timestamps replaced, so reruns of a step hash alike."""
+    return _TIMESTAMP.sub("<timestamp>", text)
+
+
+def cache_key(payload):
+    """
+    Hash of a chat completions payload: model, temperature and normalized
+    messages. Only timestamps are normalized; any other text that changes
+    between runs (element lists, vision results, dynamic page text) changes
+    the key, so such a step misses in replay.
+    """
+    material = {
+        "model": payload.get("model"),
+        "temperature": payload.get("temperature"),
+        "messages": [
+            {"role": message.get("role"), "content": normalize_prompt(message.get("content") or "")}
+            for message in payload.get("messages", [])
+        ],
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """One JSON file per recorded response under directory, sharded by key prefix."""
+
+    def __init__(self, directory="llm_cache"):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """The recorded entry for key, or None."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = None
+        with self._lock:
+            self.stats["hits" if entry else "misses"] += 1
+        return entry
+
+    def put(self, key, payload, response, latency_s=None):
+        """Save a response; written to a temporary file first so readers never see a partial entry."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "key": key,
+            "model": payload.get("model"),
+            "temperature": payload.get("temperature"),
+            "prompt": normalize_prompt(payload["messages"][-1]["content"]),
+            "response": response,
+            "latency_s": latency_s,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        os.replace(temporary, path)
+        with self._lock:
+            self.stats["recorded"] += 1
+
+    def responder(self, use_recorded_latency=False):
+        """
+        A respond(request) function for StandInServer: returns the recorded
+        response for a request body, or None on a miss. With
+        use_recorded_latency each response is delayed as long as the original
+        API call took.
+        """
+        def respond(request):
+            entry = self.get(cache_key(request))
+            if entry is None:
+                return None
+            if use_recorded_latency and entry.get("latency_s"):
+                time.sleep(entry["latency_s"])
+            return entry["response"]
+        return respond
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+class CachedLLMClient:
+    """
+    Wraps a GroqClient with a ResponseCache. Exposes the same
+    chat_completion and stream_completion calls; other attributes are read
+    from the wrapped client. Error responses are never recorded.
+    """
+
+    def __init__(self, client, cache, mode="record"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {CACHE_MODES}")
+        self.client = client
+        self.cache = cache
+        self.mode = mode
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _key(self, prompt_message):
+        payload, _ = self.client._build_request(prompt_message)
+        return payload, cache_key(payload)
+
+    def _replay(self, key):
+        entry = self.cache.get(key)
+        if entry is None:
+            raise LLMCacheMiss(f"No recorded LLM response for request {key[:12]}")
+        self.client.last_request = {"queue_wait_s": 0.0, "retries": 0, "cached": True}
+        return entry["response"]
+
+    async def chat_completion(self, prompt_message):
+        if self.mode == "passthrough":
+            return await self.client.chat_completion(prompt_message)
+        payload, key = self._key(prompt_message)
+        if self.mode == "replay":
+            return self._replay(key)
+
+        start = time.perf_counter()
+        response = await self.client.chat_completion(prompt_message)
+        if "error" not in self.client.last_request:
+            self.cache.put(key, payload, response, round(time.perf_counter() - start, 3))
+        return response
+
+    async def stream_completion(self, prompt_message):
+        if self.mode == "passthrough":
+            async for chunk in self.client.stream_completion(prompt_message):
+                yield chunk
+            return
+        payload, key = self._key(prompt_message)
+        if self.mode == "replay":
+            yield self._replay(key)
+            return
+
+        start = time.perf_counter()
+        chunks = []
+        stream = self.client.stream_completion(prompt_message)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # The agent stops reading after a done action; read the rest so the full response is recorded
+            async for chunk in stream:
+                chunks.append(chunk)
+            if chunks and "error" not in self.client.last_request:
+                self.cache.put(key, payload, "".join(chunks), round(time.perf_counter() - start, 3))
@@ -118,4 +118,123 @@ def clean_response_string(response_str):
         pass
     
     # If we couldn't extract a JSON object, return the cleaned response
-    return response_str.strip()
\ No newline at end of file
+    return response_str.strip()
+
+class IncrementalActionParser:
+    """
+    Incremental parser for a streamed LLM response.
+
+    feed() takes each streamed chunk and returns the actions whose JSON
+    object closed in it, so they can be executed while the rest of the
+    response is still being generated. <think>...</think> reasoning blocks
+    are skipped, also when a tag is split across chunks. Text outside the
+    top-level JSON object (markdown fences, prose) is ignored, and only the
+    "action" key of the top-level object is treated as the action array.
+    """
+
+    THINK_OPEN = "<think>"
+    THINK_CLOSE = "</think>"
+
+    def __init__(self):
+        self.raw = ""           # everything received
+        self.response = ""      # received text without reasoning blocks
+        self.actions = []
+        self._pending = ""      # received text not yet scanned (possible partial tag)
+        self._in_think = False
+        self._scan = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None
+        self._array_depth = None
+        self._object_start = None
+
+    def _strip_think(self, chunk):
+        """Return the part of chunk outside reasoning blocks that can be scanned now."""
+        self._pending += chunk
+        visible = []
+        while True:
+            if self._in_think:
+                end = self._pending.find(self.THINK_CLOSE)
+                if end < 0:
+                    self._pending = self._pending[-(len(self.THINK_CLOSE) - 1):]
+                    break
+                self._pending = self._pending[end + len(self.THINK_CLOSE):]
+                self._in_think = False
+            else:
+                start = self._pending.find(self.THINK_OPEN)
+                if start < 0:
+                    # Hold back a suffix that may be the start of a split tag
+                    hold = 0
+                    for size in range(1, len(self.THINK_OPEN)):
+                        if self._pending.endswith(self.THINK_OPEN[:size]):
+                            hold = size
+                    cut = len(self._pending) - hold
+                    visible.append(self._pending[:cut])
+                    self._pending = self._pending[cut:]
+                    break
+                visible.append(self._pending[:start])
+                self._pending = self._pending[start + len(self.THINK_OPEN):]
+                self._in_think = True
+        return "".join(visible)
+
+    def feed(self, chunk):
+        """Consume a chunk of the response and return the actions it completed."""
+        self.raw += chunk
+        self.response += self._strip_think(chunk)
+        return self._scan_actions()
+
+    def finish(self):
+        """Consume any held-back text at the end of the stream and return the actions it completed."""
+        if not self._in_think:
+            self.response += self._pending
+        self._pending = ""
+        return self._scan_actions()
+
+    def _scan_actions(self):
+        completed = []
+        text = self.response
+        for i in range(self._scan, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+            elif self._depth == 0 and char != "{":
+                # Prose or markdown around the JSON object
+                continue
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":":
+                if self._depth == 1:
+                    self._key = self._last_string
+            elif char == ",":
+                if self._depth == 1:
+                    self._key = None
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._key == "action" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._object_start = i
+            elif char in "}]":
+                if char == "}" and self._object_start is not None and self._depth == self._array_depth + 1:
+                    try:
+                        action = json.loads(text[self._object_start:i + 1])
+                        completed.append(action)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Skipping malformed streamed action: {e}")
+                    self._object_start = None
+                elif char == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+        self._scan = len(text)
+        self.actions.extend(completed)
+        return completed
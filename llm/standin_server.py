@@ -0,0 +1,176 @@
+"""
+Local stand-in for the OpenAI-compatible chat completions endpoint.
+
+Serves POST /openai/v1/chat/completions with HTTP/1.1 keep-alive, as one
+JSON body or, for "stream": true requests, as server-sent event chunks. It
+records how many TCP connections and requests it saw, so connection reuse by
+the LLM transport can be checked without calling the real API. Given a
+ResponseCache directory it serves the recorded responses instead (404 for a
+request that was never recorded), so agent runs can be replayed offline:
+
+    server = StandInServer().start()
+    client = GroqClient("key", "model", api_url=server.url)
+    ...
+    server.stats  # {"connections": 1, "requests": 5}
+
+Usage:
+    python -m llm.standin_server [--port 8808] [--cache-dir llm_cache [--recorded-latency]]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+DEFAULT_CONTENT = json.dumps({
+    "current_state": {
+        "evaluation_previous_goal": "Unknown - stand-in server",
+        "memory": "Served by the local stand-in server",
+        "next_goal": "Finish"
+    },
+    "action": [
+        {"done": {"text": "Stand-in response", "success": True}}
+    ]
+})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive: one handler instance serves every request on a connection
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.record("connections")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record("requests")
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        content = self.server.respond(request)
+        if content is None:
+            self._send_json(404, {"error": {"message": "No recorded response for this request", "type": "not_found"}})
+            return
+        if request.get("stream"):
+            self._send_stream(content, request.get("model"))
+            return
+        self._send_json(200, {
+            "id": f"standin-{self.server.stats['requests']}",
+            "object": "chat.completion",
+            "model": request.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content, model):
+        """Send content as chat.completion.chunk events, chunk_size characters at a time."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = self.server.chunk_size
+        pieces = [content[i:i + size] for i in range(0, len(content), size)]
+        try:
+            for piece in pieces:
+                event = {"object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                if self.server.chunk_delay_s:
+                    time.sleep(self.server.chunk_delay_s)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients may stop reading once they have the actions they need
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in server. respond(request) returns the assistant message
+    content for a request body, or None to answer 404; by default every
+    request gets a done action.
+    latency_s delays each response to imitate time to first token; streamed
+    responses are sent chunk_size characters per event, chunk_delay_s apart.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, respond=None, latency_s=0.0, chunk_size=16, chunk_delay_s=0.0):
+        super().__init__((host, port), _Handler)
+        self.respond = respond or (lambda request: DEFAULT_CONTENT)
+        self.latency_s = latency_s
+        self.chunk_size = chunk_size
+        self.chunk_delay_s = chunk_delay_s
+        self.stats = {"connections": 0, "requests": 0}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{COMPLETIONS_PATH}"
+
+    def record(self, counter):
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+    def start(self):
+        """Serve on a background thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="llm-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# For running the stand-in server on its own:
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay each response")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Characters per streamed event")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed events")
+    parser.add_argument("--cache-dir", help="Serve the responses recorded in this LLM cache directory")
+    parser.add_argument("--recorded-latency", action="store_true",
+                        help="Delay each cached response as long as the recorded API call took")
+    args = parser.parse_args()
+
+    respond = None
+    if args.cache_dir:
+        from llm.response_cache import ResponseCache
+        respond = ResponseCache(args.cache_dir).responder(args.recorded_latency)
+    server = StandInServer(args.host, args.port, respond=respond, latency_s=args.latency,
+                           chunk_size=args.chunk_size, chunk_delay_s=args.chunk_delay)
+    print(f"Serving stand-in completions at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Stats: {server.stats}")
+        server.server_close()
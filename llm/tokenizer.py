@@ -0,0 +1,70 @@
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken is optional (and its encodings may not be downloadable offline)
+    _ENCODING = None
+
+# Words, numbers and single punctuation marks: roughly what a BPE tokenizer splits on
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text):
+    """
+    Token count of text. Exact for the cl100k_base encoding when tiktoken is
+    installed; otherwise an estimate from the character and word/punctuation
+    counts, which errs on the high side for element lists and JSON.
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(math.ceil(len(text) / 4), len(_PIECES.findall(text)))
+
+
+def truncate_to_tokens(text, budget, marker="... (truncated)"):
+    """Cut text to at most budget tokens, marker included; text within budget is returned as is."""
+    if count_tokens(text) <= budget:
+        return text
+    budget -= count_tokens(marker)
+    if budget <= 0:
+        return ""
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text, disallowed_special=())[:budget]) + marker
+    # Binary search the longest prefix that fits
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + marker
+
+
+def fit_lines(lines, budget, noun="lines"):
+    """
+    Keep whole lines, in order, while they fit in budget tokens. Returns the
+    text and its token count; dropped lines are summarized in a final line.
+    """
+    kept, used = [], 0
+    for position, line in enumerate(lines):
+        cost = count_tokens(line) + 1  # + the newline
+        if used + cost > budget:
+            note = f"... {len(lines) - position} more {noun} not shown"
+            # Make room for the note by dropping lines from the end
+            while kept and used + count_tokens(note) > budget:
+                used -= count_tokens(kept.pop()) + 1
+                note = f"... {len(lines) - len(kept)} more {noun} not shown"
+            kept.append(note)
+            used += count_tokens(note)
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept), used
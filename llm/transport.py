@@ -0,0 +1,72 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+
+import httpx
+
+from core.shared import SharedInstances
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPTransport:
+    """
+    Pooled async HTTP client for LLM API calls.
+
+    One httpx.AsyncClient keeps connections (and their TLS sessions) alive
+    between requests, so consecutive steps and concurrent agents reuse warm
+    connections instead of opening one per call. HTTP/2 is used when the h2
+    package is installed, letting concurrent requests share one connection.
+    An AsyncClient is bound to the event loop it was created on, so one
+    client is kept per running loop.
+    """
+
+    def __init__(self, connect_timeout_s=5.0, read_timeout_s=60.0, max_connections=20, http2=True):
+        self.timeout = httpx.Timeout(read_timeout_s, connect=connect_timeout_s)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.info("h2 is not installed, LLM requests use HTTP/1.1 keep-alive")
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The AsyncClient for the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+                self._clients[loop] = client
+            return client
+
+    async def post_json(self, url, payload, headers=None):
+        """POST a JSON payload and return the httpx.Response."""
+        return await self.client.post(url, json=payload, headers=headers)
+
+    def stream_json(self, url, payload, headers=None):
+        """POST a JSON payload and return an async context manager over the streamed httpx.Response."""
+        return self.client.stream("POST", url, json=payload, headers=headers)
+
+    async def aclose(self):
+        """Close the client of the running event loop and its connections."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+_shared_transports = SharedInstances(HTTPTransport)
+
+
+def get_transport(llm_settings):
+    """The transport for these settings; every agent shares its connection pool."""
+    return _shared_transports.get(
+        llm_settings.connect_timeout_s,
+        llm_settings.read_timeout_s,
+        llm_settings.max_connections,
+        llm_settings.http2,
+    )
@@ -70,6 +70,10 @@ async def main():
                         help='Specify a task to run immediately and exit')
     parser.add_argument('--model', type=str,
                         help='Specify the LLM model to use')
+    parser.add_argument('--tasks-file', type=str,
+                        help='Run every task in a file (one per line) concurrently and exit')
+    parser.add_argument('--concurrency', type=int,
+                        help='Maximum number of tasks to run at once with --tasks-file')
     
     args = parser.parse_args()
     
@@ -89,11 +93,32 @@ async def main():
         settings.use_vision = args.vision
     if args.model:
         settings.llm.groq_model = args.model
+    if args.concurrency:
+        settings.browser.max_concurrent_agents = args.concurrency
+    
+    # Start loading the vision models in the background while the browser starts
+    if settings.use_vision:
+        from vision.model_registry import get_model_registry
+        get_model_registry().preload(settings.vision)
     
     # Create and run the terminal interface
     interface = TerminalInterface(settings)
     
-    if args.task:
+    if args.tasks_file:
+        # Run many tasks in parallel on one shared browser and exit
+        from core.scheduler import AgentScheduler
+        with open(args.tasks_file, encoding="utf-8") as f:
+            tasks = [line.strip() for line in f if line.strip()]
+        print(f"Running {len(tasks)} tasks with concurrency {settings.browser.max_concurrent_agents}")
+        results = await AgentScheduler(settings).run(tasks)
+        for result in results:
+            status = "done" if result["done"] else "not done"
+            print(f"[{status}, {result['steps']} steps, {result['duration_s']}s] {result['task']}")
+            if result["final_result"]:
+                print(f"    {result['final_result']}")
+            if result["error"]:
+                print(f"    Error: {result['error']}")
+    elif args.task:
         # Run a single task and exit
         from core.agent import Agent
         agent = Agent(args.task, settings)
@@ -103,6 +128,10 @@ async def main():
     else:
         # Start interactive mode
         await interface.start()
+    
+    # Close the pooled LLM connections shared by every agent
+    from llm.transport import get_transport
+    await get_transport(settings.llm).aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
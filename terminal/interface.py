@@ -4,12 +4,16 @@ import time
 import os
 from config.settings import load_settings
 from core.agent import Agent
+from core.browser_pool import BrowserPool
+from core.network_policy import NetworkPolicy
 
 logger = logging.getLogger(__name__)
 
 class TerminalInterface:
     def __init__(self, settings):
         self.settings = settings
+        # Warm browsers shared by every task run from this interface
+        self.browser_pool = BrowserPool(settings.browser)
         self.setup_logging()
 
     def setup_logging(self):
@@ -44,17 +48,32 @@ class TerminalInterface:
         """Start the terminal interface for the agent"""
         self._print_banner()
         
+        # Launch the browsers while the user types the first task
+        pool_start = asyncio.create_task(self._warm_pool())
+        
         print("Enter your task (or type 'exit' to quit):")
-        while True:
-            task = await self._get_user_input(">> ")
-            if task.strip().lower() in ['exit', 'quit']:
-                print("Exiting the assistant. Goodbye!")
-                break
+        try:
+            while True:
+                task = await self._get_user_input(">> ")
+                if task.strip().lower() in ['exit', 'quit']:
+                    print("Exiting the assistant. Goodbye!")
+                    break
 
-            # Run the agent with a progress display
-            await self._run_agent_with_progress(task)
-            
-            print("\nEnter another task or type 'exit' to quit:")
+                # Run the agent with a progress display
+                await self._run_agent_with_progress(task)
+                
+                print("\nEnter another task or type 'exit' to quit:")
+        finally:
+            if not pool_start.done():
+                pool_start.cancel()
+            await self.browser_pool.close()
+
+    async def _warm_pool(self):
+        """Start the browser pool in the background; a failed launch is retried by the next task."""
+        try:
+            await self.browser_pool.start()
+        except Exception as e:
+            logger.warning(f"Could not start the browser pool: {e}")
 
     def _print_banner(self):
         """Display a welcome banner"""
@@ -79,19 +98,23 @@ class TerminalInterface:
 
     async def _run_agent_with_progress(self, task):
         """Run the agent with a progress display"""
-        # Create a new agent instance for each task
-        agent = Agent(task, self.settings)
         print(f"\n🔄 Starting task: {task}")
         
         # Progress indicators
         spinner = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
         spinner_idx = 0
         
-        # Start agent in background task
-        agent_task = asyncio.create_task(agent.run(max_steps=self.settings.max_steps))
-        
-        # Show progress while agent runs
+        browser = None
         try:
+            # Create a new agent instance for each task on a fresh context from the pool;
+            # a browser that fails to launch only fails this task
+            browser = await self.browser_pool.acquire(NetworkPolicy.from_settings(self.settings))
+            agent = Agent(task, self.settings, browser=browser)
+            
+            # Start agent in background task
+            agent_task = asyncio.create_task(agent.run(max_steps=self.settings.max_steps))
+            
+            # Show progress while agent runs
             while not agent_task.done():
                 print(f"\r{spinner[spinner_idx]} Agent working...", end="", flush=True)
                 spinner_idx = (spinner_idx + 1) % len(spinner)
@@ -110,11 +133,12 @@ class TerminalInterface:
             print(f"\n❌ Error occurred while running agent: {str(e)}")
             logger.error(f"Agent execution error: {e}", exc_info=True)
         finally:
-            # Make sure to close browser resources
-            try:
-                await agent.browser.close()
-            except Exception as e:
-                logger.warning(f"Error closing browser: {e}")
+            # Return the context to the pool; the browser itself stays warm
+            if browser is not None:
+                try:
+                    await self.browser_pool.release(browser)
+                except Exception as e:
+                    logger.warning(f"Error releasing browser: {e}")
 
     def _display_agent_results(self, agent, history):
         """Display the agent execution results"""
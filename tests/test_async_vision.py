@@ -0,0 +1,67 @@
+import asyncio
+
+from config.settings import load_settings
+from core.agent import Agent
+
+
+class FakeVisionProcessor:
+    """Returns one text region on the button at (100, 100), joined to element 3, after delay seconds."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def process(self, screenshot, state):
+        await asyncio.sleep(self.delay)
+        return {
+            "detections": [],
+            "text_regions": [{"text": "Buy", "confidence": 0.9, "bbox": [100, 100, 140, 120], "element_index": 3}],
+        }
+
+
+def _agent(delay=0.0):
+    settings = load_settings()
+    settings.vision = settings.vision.model_copy(update={"async_mode": True, "async_min_elements": 0})
+    settings.browser = settings.browser.model_copy(update={"screenshot_mode": "viewport"})
+    agent = Agent("test", settings)
+    agent.vision_processor = FakeVisionProcessor(delay)
+    return agent
+
+
+def _state(index):
+    return {
+        "screenshot_bytes": b"png",
+        "clickable_elements": [{"index": index, "text": "Buy", "rect": {"x": 90, "y": 90, "width": 80, "height": 40}}],
+    }
+
+
+def test_previous_frame_results_are_rejoined_to_the_current_dom():
+    agent = _agent()
+
+    async def two_steps():
+        await agent._attach_vision(_state(3))
+        await asyncio.sleep(0.01)
+        second = _state(7)
+        await agent._attach_vision(second)
+        agent._pending_vision.cancel()
+        return second
+
+    state = asyncio.run(two_steps())
+    region = state["vision"]["text_regions"][0]
+    assert state["vision"]["previous_step"] is True
+    assert region["element_index"] == 7
+    assert agent.async_vision_stats["attached"] == 1
+
+
+def test_superseded_vision_is_counted():
+    agent = _agent(delay=10)
+
+    async def two_steps():
+        await agent._attach_vision(_state(3))
+        second = _state(3)
+        await agent._attach_vision(second)
+        agent._pending_vision.cancel()
+        return second
+
+    state = asyncio.run(two_steps())
+    assert "vision" not in state
+    assert agent.async_vision_stats["superseded"] == 1
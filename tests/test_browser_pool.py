@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+import core.browser_pool as browser_pool
+from config.settings import BrowserSettings
+from core.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def new_context(self):
+        return object()
+
+
+class FakePlaywright:
+    """Launches fail while fail_launches is above zero."""
+
+    def __init__(self, fail_launches):
+        self.fail_launches = fail_launches
+        self.browsers = []
+        self.stopped = 0
+        self.chromium = self
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped += 1
+
+    async def launch(self, **kwargs):
+        await asyncio.sleep(0)
+        if self.fail_launches > 0:
+            self.fail_launches -= 1
+            raise RuntimeError("Chromium failed to launch")
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+def test_failed_start_closes_launched_instances_and_can_be_retried(monkeypatch):
+    playwright = FakePlaywright(fail_launches=1)
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: playwright)
+    pool = BrowserPool(BrowserSettings(pool_size=3))
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await pool.start()
+        assert all(browser.closed for browser in playwright.browsers)
+        assert playwright.stopped == 1
+        assert pool._start_task is None
+
+        # The next start launches again instead of re-raising the old failure
+        await pool.start()
+        assert len(pool._instances) == 3
+        await pool.close()
+
+    asyncio.run(scenario())
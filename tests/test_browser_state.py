@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from core.state import BrowserState
+
+
+class Loader:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_lazy_fields_are_absent_until_fetched():
+    dom = Loader("<html></html>")
+    state = BrowserState({"dom": dom}, url="https://example.com")
+
+    assert state.get("dom") is None
+    assert not state.is_loaded("dom")
+    with pytest.raises(KeyError, match="fetch"):
+        state["dom"]
+    assert dom.calls == 0
+
+    assert asyncio.run(state.fetch("dom")) == "<html></html>"
+    assert state["dom"] == "<html></html>"
+    assert "dom" in state["timings"]
+
+
+def test_concurrent_fetches_share_one_call():
+    tabs = Loader([{"url": "https://example.com"}], delay=0.01)
+    state = BrowserState({"tabs": tabs})
+
+    async def run():
+        return await asyncio.gather(state.fetch("tabs"), state.fetch("tabs"), state.fetch("tabs"))
+
+    results = asyncio.run(run())
+    assert tabs.calls == 1
+    assert all(result is results[0] for result in results)
+    assert asyncio.run(state.fetch("tabs")) is results[0]
+    assert tabs.calls == 1
+
+
+def test_unknown_field():
+    state = BrowserState({})
+    with pytest.raises(KeyError):
+        asyncio.run(state.fetch("dom"))
+
+
+def test_failed_fetch_can_be_retried():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("page closed")
+        return b"png"
+
+    state = BrowserState({"screenshot_bytes": flaky})
+    with pytest.raises(RuntimeError):
+        asyncio.run(state.fetch("screenshot_bytes"))
+    assert not state.is_loaded("screenshot_bytes")
+    assert asyncio.run(state.fetch("screenshot_bytes")) == b"png"
@@ -0,0 +1,83 @@
+import asyncio
+
+from config.settings import BrowserSettings
+from core.controller import Controller
+
+
+class FakeContext:
+    def __init__(self, pages):
+        self.pages = list(pages)
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+class FakePage:
+    async def goto(self, url):
+        self.url = url
+
+    async def wait_for_load_state(self, state):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, open_pages, max_pages):
+        self.browser_settings = BrowserSettings(max_pages_per_context=max_pages)
+        self.context = FakeContext(FakePage() for _ in range(open_pages))
+        self.page = self.context.pages[0]
+
+
+def test_open_tab_is_refused_at_the_page_limit():
+    browser = FakeBrowser(open_pages=3, max_pages=3)
+    current = browser.page
+
+    result = asyncio.run(Controller().act({"open_tab": {"url": "https://example.com"}}, browser))
+
+    assert "error" in result
+    assert len(browser.context.pages) == 3
+    assert browser.page is current
+
+
+def test_open_tab_below_the_limit_switches_to_the_new_tab():
+    browser = FakeBrowser(open_pages=1, max_pages=3)
+
+    result = asyncio.run(Controller().act({"open_tab": {"url": "https://example.com"}}, browser))
+
+    assert result["success"]
+    assert browser.page is browser.context.pages[-1]
+    assert browser.page.url == "https://example.com"
+
+
+def test_multi_act_stream_acts_as_actions_arrive_and_stops_at_done():
+    from llm.response_parser import IncrementalActionParser
+
+    events = []
+    response = '{"action": [{"note": {"n": 1}}, {"note": {"n": 2}}, {"done": {}}, {"note": {"n": 3}}]}'
+
+    class SettlingBrowser:
+        async def wait_for_settle(self):
+            events.append("settle")
+            return {"settled": True, "waited_ms": 0}
+
+    async def note(params, browser):
+        events.append(params["n"])
+        return {"message": "noted"}
+
+    async def actions():
+        parser = IncrementalActionParser()
+        for start in range(0, len(response), 4):
+            events.append("chunk")
+            for action in parser.feed(response[start:start + 4]):
+                yield action
+
+    controller = Controller()
+    controller.registry["note"] = note
+    results = asyncio.run(controller.multi_act_stream(actions(), SettlingBrowser()))
+
+    assert [result.get("is_done", False) for result in results] == [False, False, True]
+    assert 3 not in events
+    # The first action ran before the response was fully received
+    assert events.index(1) < len(events) - 1 - events[::-1].index("chunk")
+    assert events.count("settle") == 2
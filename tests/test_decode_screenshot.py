@@ -0,0 +1,54 @@
+import asyncio
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from config.settings import BrowserSettings
+from core.browser import Browser
+from vision.vision_processor import decode_screenshot
+
+
+def frame():
+    image = np.zeros((20, 30, 3), dtype=np.uint8)
+    image[:, :, 2] = 255  # red in BGR
+    return image
+
+
+def test_raw_png_bytes_decode_to_bgr():
+    ok, encoded = cv2.imencode(".png", frame())
+    decoded = decode_screenshot(encoded.tobytes())
+    assert decoded.shape == (20, 30, 3)
+    assert (decoded == frame()).all()
+
+
+def test_base64_text_is_still_accepted():
+    ok, encoded = cv2.imencode(".png", frame())
+    assert (decode_screenshot(base64.b64encode(encoded.tobytes()).decode("ascii")) == frame()).all()
+
+
+def test_decoded_arrays_pass_through():
+    image = frame()
+    assert decode_screenshot(image) is image
+
+
+def test_undecodable_bytes_are_rejected():
+    with pytest.raises(ValueError):
+        decode_screenshot(b"not an image")
+
+
+def test_capture_uses_the_configured_format_and_quality():
+    class Page:
+        async def screenshot(self, **options):
+            self.options = options
+            return b"jpeg"
+
+    page = Page()
+    browser = Browser(BrowserSettings(screenshot_format="jpeg", screenshot_quality=70), context=object())
+    assert asyncio.run(browser._capture_screenshot(page)) == b"jpeg"
+    assert page.options == {"type": "jpeg", "quality": 70}
+
+    browser = Browser(BrowserSettings(screenshot_format="gif"), context=object())
+    with pytest.raises(ValueError):
+        asyncio.run(browser._capture_screenshot(page))
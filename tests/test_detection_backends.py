@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from vision.detection_backends import DetectionBackend, detection_agreement
+
+
+def detection(cls, bbox, confidence=0.9):
+    return {"class": cls, "bbox": bbox, "confidence": confidence}
+
+
+def test_agreement_matches_same_class_boxes_once():
+    reference = [detection("button", [0, 0, 10, 10]), detection("icon", [20, 20, 30, 30])]
+    candidate = [
+        detection("button", [0, 0, 10, 10]),
+        detection("button", [1, 1, 10, 10], confidence=0.5),  # duplicate of an already matched box
+        detection("link", [20, 20, 30, 30]),                   # right place, wrong class
+    ]
+    agreement = detection_agreement(reference, candidate)
+    assert agreement["matched"] == 1
+    assert agreement["precision"] == pytest.approx(1 / 3)
+    assert agreement["recall"] == 0.5
+    assert agreement["mean_iou"] == 1.0
+
+
+def test_agreement_of_empty_lists():
+    assert detection_agreement([], [])["recall"] == 1.0
+    assert detection_agreement([detection("button", [0, 0, 10, 10])], [])["recall"] == 0.0
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        DetectionBackend("yolov8n.pt", backend="tensorrt")
+
+
+def test_version_tells_runtimes_sizes_and_weights_apart(tmp_path):
+    weights = tmp_path / "a" / "yolo.pt"
+    weights.parent.mkdir()
+    weights.write_bytes(b"weights")
+    other = tmp_path / "b" / "yolo.pt"
+    other.parent.mkdir()
+    other.write_bytes(b"weights")
+
+    versions = {
+        DetectionBackend(weights).version,
+        DetectionBackend(weights, imgsz=320).version,
+        DetectionBackend(weights, backend="onnx").version,
+        DetectionBackend(weights, backend="onnx", int8=True).version,
+        DetectionBackend(other).version,
+    }
+    assert len(versions) == 5
+    # int8 only applies to exported runtimes
+    assert DetectionBackend(weights, int8=True).version == DetectionBackend(weights).version
+
+    before = DetectionBackend(weights).version
+    weights.write_bytes(b"retrained weights")
+    os.utime(weights, ns=(0, 1))
+    assert DetectionBackend(weights).version != before
+
+
+def test_exports_are_not_shared_between_different_weights(tmp_path):
+    exports = tmp_path / "exports"
+    paths = []
+    for directory in ("a", "b"):
+        weights = tmp_path / directory / "yolo.pt"
+        weights.parent.mkdir()
+        weights.write_bytes(b"weights")
+        paths.append(weights)
+
+    first = DetectionBackend(paths[0], backend="onnx", export_dir=exports)._export_path()
+    assert DetectionBackend(paths[0], backend="onnx", export_dir=exports)._export_path() == first
+    assert DetectionBackend(paths[1], backend="onnx", export_dir=exports)._export_path() != first
+
+    paths[0].write_bytes(b"retrained weights")
+    os.utime(paths[0], ns=(0, 1))
+    assert DetectionBackend(paths[0], backend="onnx", export_dir=exports)._export_path() != first
+    assert DetectionBackend(paths[0], backend="openvino", export_dir=exports)._export_path().name.endswith(
+        "_openvino_model"
+    )
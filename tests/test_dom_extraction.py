@@ -0,0 +1,45 @@
+import asyncio
+import re
+
+import pytest
+
+from benchmarks.dom_extraction import LEGACY_EXTRACT_JS, generate_page
+from core.browser import EXTRACT_ELEMENTS_JS
+
+
+def test_generated_page_is_deterministic_and_sized():
+    page = generate_page(2000, seed=1)
+    assert generate_page(2000, seed=1) == page
+    assert generate_page(2000, seed=2) != page
+    assert len(re.findall(r"<[a-z]+[ >]", page)) >= 2000
+
+
+def run_in_chromium(html, *scripts):
+    """Evaluate (script, arg) pairs on html in headless Chromium; skips when Chromium is not available."""
+    async_api = pytest.importorskip("playwright.async_api")
+
+    async def run():
+        async with async_api.async_playwright() as playwright:
+            try:
+                browser = await playwright.chromium.launch()
+            except Exception as e:
+                pytest.skip(f"Chromium is not available: {e}")
+            try:
+                page = await browser.new_page()
+                await page.set_content(html)
+                return [await page.evaluate(script, arg) for script, arg in scripts]
+            finally:
+                await browser.close()
+
+    return asyncio.run(run())
+
+
+def test_single_pass_extraction_matches_the_legacy_xpaths():
+    legacy, current = run_in_chromium(
+        generate_page(3000, seed=3),
+        (LEGACY_EXTRACT_JS, None),
+        (EXTRACT_ELEMENTS_JS, {"incremental": False, "maxDirty": 200}),
+    )
+    assert current["full"]
+    assert [element["xpath"] for element in current["elements"]] == [element["xpath"] for element in legacy]
+    assert [element["text"] for element in current["elements"]] == [element["text"] for element in legacy]
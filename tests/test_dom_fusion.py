@@ -0,0 +1,58 @@
+import numpy as np
+
+from vision.dom_fusion import drop_dom_duplicates, mask_known_text
+
+
+def element(index, x, y, width, height, text="", **attributes):
+    return {"index": index, "text": text, "attributes": attributes,
+            "rect": {"x": x, "y": y, "width": width, "height": height}}
+
+
+def noisy_image(width=200, height=100):
+    return np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_mask_flattens_elements_with_known_text_only():
+    image = noisy_image()
+    elements = [
+        element(0, 10, 10, 40, 20, text="Search"),
+        element(1, 100, 10, 40, 20),  # nothing known: left for OCR
+        element(2, 60, 50, 30, 10, placeholder="Email"),
+    ]
+    masked, fraction = mask_known_text(image, elements)
+
+    assert (masked[10:30, 10:50] == masked[10, 10]).all()
+    assert (masked[50:60, 60:90] == masked[50, 60]).all()
+    assert (masked[10:30, 100:140] == image[10:30, 100:140]).all()
+    assert fraction == (40 * 20 + 30 * 10) / (200 * 100)
+    # The input is not modified
+    assert not (image[10:30, 10:50] == image[10, 10]).all()
+
+
+def test_mask_skips_tall_elements_and_scales_to_image_pixels():
+    image = noisy_image()
+    elements = [element(0, 0, 0, 50, 100, text="A card"), element(1, 5, 5, 10, 5, text="Buy")]
+    # Image is twice the CSS size, offset by the viewport region origin (2, 2)
+    masked, fraction = mask_known_text(image, elements, transform=(2.0, 2.0, 2.0), max_height=80)
+
+    assert (masked[6:16, 6:26] == masked[6, 6]).all()
+    assert fraction == 20 * 10 / (200 * 100)
+
+
+def test_mask_without_elements_returns_the_image():
+    image = noisy_image()
+    masked, fraction = mask_known_text(image, [])
+    assert masked is image and fraction == 0.0
+
+
+def test_ocr_text_already_in_the_dom_is_dropped():
+    elements = [element(0, 0, 0, 100, 30, text="Sign in to your account"), element(1, 0, 50, 100, 30, value="hello")]
+    regions = [
+        {"text": "Sign in", "bbox": [10, 5, 60, 25]},          # inside element 0, known text
+        {"text": "Forgot?", "bbox": [10, 5, 60, 25]},          # inside element 0, new text
+        {"text": "HELLO!", "bbox": [10, 55, 60, 75]},          # value, after normalization
+        {"text": "Sign in", "bbox": [110, 5, 160, 25]},        # known text, but outside any element
+    ]
+    kept, dropped = drop_dom_duplicates(regions, elements)
+    assert dropped == 2
+    assert [region["text"] for region in kept] == ["Forgot?", "Sign in"]
@@ -0,0 +1,57 @@
+import asyncio
+
+from config.settings import BrowserSettings
+from core.browser import Browser
+
+
+def _element(index, text):
+    return {"index": index, "tagName": "a", "text": text, "attributes": {},
+            "rect": {"x": 0, "y": index * 10, "width": 50, "height": 10}}
+
+
+class FakePage:
+    """Replays extraction results in the shape EXTRACT_ELEMENTS_JS returns them."""
+
+    url = "https://example.com"
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.options = []
+
+    async def evaluate(self, script, options):
+        self.options.append(options)
+        return self.results.pop(0)
+
+
+def test_incremental_extraction_keeps_document_order():
+    page = FakePage([
+        {"full": True, "elements": [_element(0, "Home"), _element(1, "Cart")]},
+        # A new element (index 2) was inserted between the two, and Cart's rect moved
+        {"full": False, "updated": [_element(2, "Deals")], "removed": [],
+         "rects": [[1, {"x": 0, "y": 30, "width": 50, "height": 10}]], "order": [0, 2, 1]},
+    ])
+    browser = Browser(BrowserSettings(incremental_extraction=True), context=object())
+    browser.page = page
+
+    first = asyncio.run(browser._extract_clickable_elements())
+    second = asyncio.run(browser._extract_clickable_elements())
+
+    assert [element["text"] for element in first] == ["Home", "Cart"]
+    assert page.options[1]["incremental"] is True
+    assert [element["text"] for element in second] == ["Home", "Deals", "Cart"]
+    assert second[2]["rect"]["y"] == 30
+
+
+def test_removed_elements_leave_the_selector_map():
+    page = FakePage([
+        {"full": True, "elements": [_element(0, "Home"), _element(1, "Cart")]},
+        {"full": False, "updated": [], "removed": [0], "rects": [], "order": [1]},
+    ])
+    browser = Browser(BrowserSettings(incremental_extraction=True), context=object())
+    browser.page = page
+
+    asyncio.run(browser._extract_clickable_elements())
+    elements = asyncio.run(browser._extract_clickable_elements())
+
+    assert [element["index"] for element in elements] == [1]
+    assert list(browser.selector_map) == [1]
@@ -0,0 +1,46 @@
+from vision.element_join import annotate_with_elements
+
+
+def element(index, x, y, width, height):
+    return {"index": index, "rect": {"x": x, "y": y, "width": width, "height": height}}
+
+
+CARD = element(7, 0, 0, 300, 200)
+BUTTON = element(3, 20, 20, 80, 30)
+
+
+def test_smallest_qualifying_element_wins():
+    results = {"detections": [{"class": "button", "bbox": [25, 22, 95, 48]}], "text_regions": []}
+    annotated = annotate_with_elements(results, [CARD, BUTTON])
+    assert annotated["detections"][0]["element_index"] == 3
+    assert "click_target" not in annotated["detections"][0]
+
+
+def test_partial_overlap_below_the_threshold_does_not_match():
+    # Under half the box lies on the button; the card covers all of it
+    results = {"text_regions": [{"text": "x", "bbox": [70, 30, 150, 50]}]}
+    annotated = annotate_with_elements(results, [BUTTON, CARD], min_overlap=0.5)
+    assert annotated["text_regions"][0]["element_index"] == 7
+
+
+def test_unmatched_boxes_get_a_click_target_at_their_centre():
+    results = {"detections": [{"class": "icon", "bbox": [400, 10, 420, 30]}]}
+    annotated = annotate_with_elements(results, [CARD, BUTTON])
+    assert annotated["detections"][0]["click_target"] == [410, 20]
+    assert "element_index" not in annotated["detections"][0]
+
+    # Also without any elements at all
+    annotated = annotate_with_elements(results, [])
+    assert annotated["detections"][0]["click_target"] == [410, 20]
+
+
+def test_rejoining_replaces_earlier_annotations_and_leaves_input_untouched():
+    results = {"detections": [{"class": "button", "bbox": [25, 22, 95, 48]}]}
+    first = annotate_with_elements(results, [BUTTON])
+    moved = element(3, 500, 500, 80, 30)
+    second = annotate_with_elements(first, [moved])
+
+    assert "element_index" not in results["detections"][0]
+    assert first["detections"][0]["element_index"] == 3
+    assert "element_index" not in second["detections"][0]
+    assert second["detections"][0]["click_target"] == [60, 35]
@@ -0,0 +1,32 @@
+import numpy as np
+
+from vision.frame_hash import changed_fraction, tile_signature
+
+
+def page(height=400, width=640):
+    image = np.full((height, width, 3), 240, dtype=np.uint8)
+    image[40:80, 40:300] = 30  # a heading
+    return image
+
+
+def test_identical_frames_have_not_changed():
+    assert changed_fraction(tile_signature(page()), tile_signature(page())) == 0.0
+
+
+def test_single_pixel_noise_is_ignored():
+    noisy = page()
+    noisy[200, 320] = 0  # a caret blink
+    assert changed_fraction(tile_signature(page()), tile_signature(noisy)) == 0.0
+
+
+def test_real_content_change_is_detected():
+    changed = page()
+    changed[200:260, 100:400] = 30  # a new block of text
+    fraction = changed_fraction(tile_signature(page()), tile_signature(changed))
+    assert 0.0 < fraction < 0.5
+
+
+def test_missing_or_resized_signature_counts_as_fully_changed():
+    signature = tile_signature(page())
+    assert changed_fraction(None, signature) == 1.0
+    assert changed_fraction(signature, tile_signature(page(), grid=(16, 10))) == 1.0
@@ -0,0 +1,84 @@
+import logging
+
+from core.message_manager import MessageManager
+from llm.tokenizer import count_tokens, fit_lines, truncate_to_tokens
+
+
+def _state(step, elements=60):
+    return {
+        "url": f"https://example.com/{step}",
+        "title": "Example",
+        "tabs": [{"page_id": 0, "title": "Example", "url": f"https://example.com/{step}"}],
+        "clickable_elements": [
+            {"index": i, "tagName": "a", "text": f"Link {i} on step {step}", "attributes": {}} for i in range(elements)
+        ],
+        "vision": {
+            "detections": [],
+            "text_regions": [{"text": f"text {i}", "confidence": 0.8, "bbox": [0, 0, 1, 1]} for i in range(15)],
+        },
+    }
+
+
+def _manager(**budgets):
+    max_tokens = budgets.pop("max_tokens", 2000)
+    budgets = {"elements": 300, "vision": 80, "history": 400, **budgets}
+    return MessageManager("Find the cheapest flight to Paris", budgets=budgets, max_prompt_tokens=max_tokens)
+
+
+def test_prompt_stays_within_budget_and_keeps_sections():
+    manager = _manager()
+    for step in range(4):
+        manager.add_state_message(_state(step))
+        prompt = manager.get_latest_message()
+
+    assert count_tokens(prompt) <= 2000
+    assert manager.last_prompt_tokens["total"] == count_tokens(prompt)
+    assert "Your task: Find the cheapest flight to Paris" in prompt
+    assert "https://example.com/3" in prompt
+    assert "more elements not shown" in prompt
+    # The JSON instruction is no longer prepended on top of the system prompt
+    assert not prompt.lstrip().startswith("IMPORTANT")
+
+
+def test_history_keeps_the_newest_messages():
+    manager = _manager(history=400)
+    for step in range(4):
+        manager.add_state_message(_state(step, elements=5))
+    prompt = manager.get_latest_message()
+    assert "https://example.com/2" in prompt
+    assert "https://example.com/0" not in prompt
+
+
+def test_unused_budget_flows_to_sections_cut_short():
+    manager = _manager(max_tokens=6000, elements=100)
+    manager.add_state_message(_state(0))
+    manager.get_latest_message()
+    # Elements need far more than their own budget, and the prompt has room for them
+    assert manager.last_prompt_tokens["elements"] > 100
+
+
+def test_task_survives_instructions_over_the_prompt_budget(caplog):
+    manager = _manager(max_tokens=100)
+    manager.add_state_message(_state(0))
+    with caplog.at_level(logging.WARNING):
+        prompt = manager.get_latest_message()
+    assert "Your task: Find the cheapest flight to Paris" in prompt
+    # Page state gets no tokens: only a note that its elements were left out
+    assert "Link 0 on step 0" not in prompt
+    assert "60 more elements not shown" in prompt
+    assert "over the prompt budget" in caplog.text
+
+
+def test_fit_lines_keeps_whole_lines_and_notes_the_rest():
+    text, used = fit_lines([f"line number {i}" for i in range(100)], 50, "lines")
+    assert used <= 50
+    assert text.splitlines()[0] == "line number 0"
+    assert text.splitlines()[-1].endswith("more lines not shown")
+
+
+def test_truncate_to_tokens():
+    text = "word " * 500
+    assert truncate_to_tokens("short", 10) == "short"
+    cut = truncate_to_tokens(text, 50)
+    assert count_tokens(cut) <= 50
+    assert cut.endswith("... (truncated)")
@@ -0,0 +1,68 @@
+import sys
+import threading
+import types
+
+from config.settings import VisionSettings
+from vision.detection_backends import DetectionBackend
+from vision.model_registry import ModelRegistry
+
+
+def test_detectors_are_shared_per_model_runtime_and_size():
+    registry = ModelRegistry()
+    first = registry.detector("yolo.pt")
+    assert registry.detector("yolo.pt") is first
+    assert registry.detector("yolo.pt", imgsz=320) is not first
+    assert registry.detector_for(VisionSettings(yolo_model_path="yolo.pt", detection_imgsz=640)) is first
+
+
+def test_concurrent_callers_share_one_ocr_load(monkeypatch):
+    loads = []
+
+    class Reader:
+        def __init__(self, languages):
+            loads.append(languages)
+
+        def readtext(self, image):
+            return []
+
+    monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=Reader))
+    registry = ModelRegistry()
+    readers = []
+    threads = [threading.Thread(target=lambda: readers.append(registry.ocr_reader())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [["en"]]
+    assert all(reader is readers[0] for reader in readers)
+    assert readers[0].readtext(None) == []
+
+
+def test_preload_runs_once_and_completes_when_a_load_fails(monkeypatch):
+    calls = []
+
+    def load(self):
+        calls.append(self.version)
+        raise RuntimeError("weights missing")
+
+    monkeypatch.setattr(DetectionBackend, "load", load)
+    registry = ModelRegistry()
+    settings = VisionSettings(yolo_model_path="missing.pt", use_easyocr=False)
+
+    future = registry.preload(settings)
+    assert registry.preload(settings) is future
+    assert future.result(timeout=5) is None
+    assert len(calls) == 1
+
+
+def test_weights_downloaded_after_the_first_request_share_the_detector(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = ModelRegistry()
+    first = registry.detector("w.pt")
+    version = first.version
+    # ultralytics downloads named weights into the working directory on first load
+    (tmp_path / "w.pt").write_bytes(b"weights")
+
+    assert registry.detector("w.pt") is first
+    assert first.version == version
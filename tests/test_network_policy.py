@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+from config.settings import BrowserSettings
+from core.network_policy import NetworkPolicy, load_blocklist
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type, page):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type, frame=SimpleNamespace(page=page))
+        self.outcome = None
+
+    async def abort(self, reason):
+        self.outcome = reason
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+def route(policy, url, resource_type="script", page="page"):
+    fake = FakeRoute(url, resource_type, page)
+    asyncio.run(policy._handle_route(fake))
+    return fake.outcome
+
+
+def test_blocklist_file_ignores_comments_and_case(tmp_path):
+    path = tmp_path / "blocklist.txt"
+    path.write_text("# trackers\nDoubleClick.net\n\nads.example.com  # inline\n", encoding="utf-8")
+    assert load_blocklist(path) == {"doubleclick.net", "ads.example.com"}
+    assert load_blocklist(tmp_path / "missing.txt") == set()
+
+
+def test_blocks_by_type_and_by_domain_or_parent_domain():
+    policy = NetworkPolicy(blocked_types={"image", "font"}, blocked_domains={"doubleclick.net"})
+
+    assert route(policy, "https://example.com/logo.png", "image") == "blockedbyclient"
+    assert route(policy, "https://stats.g.doubleclick.net/collect") == "blockedbyclient"
+    assert route(policy, "https://doubleclick.net.example.com/app.js") == "continued"
+    assert route(policy, "https://example.com/app.js") == "continued"
+
+    stats = policy.stats("page")
+    assert stats["blocked_requests"] == 2
+    assert stats["blocked_by_type"] == {"image": 1}
+    assert stats["blocked_by_domain"] == 1
+    assert policy.stats("other page")["blocked_requests"] == 0
+
+
+def test_loaded_bytes_are_counted_from_content_length():
+    policy = NetworkPolicy()
+    request = SimpleNamespace(frame=SimpleNamespace(page="page"))
+    policy._on_response(SimpleNamespace(request=request, headers={"content-length": "1200"}))
+    policy._on_response(SimpleNamespace(request=request, headers={}))
+    stats = policy.stats("page")
+    assert stats["loaded_requests"] == 2 and stats["loaded_bytes"] == 1200
+
+
+def test_images_are_blocked_only_without_vision(tmp_path):
+    browser = BrowserSettings(block_resources=True, blocklist_path=str(tmp_path / "none.txt"))
+    with_vision = NetworkPolicy.from_settings(SimpleNamespace(browser=browser, use_vision=True))
+    without_vision = NetworkPolicy.from_settings(SimpleNamespace(browser=browser, use_vision=False))
+    assert "image" not in with_vision.blocked_types
+    assert "image" in without_vision.blocked_types
+
+    disabled = BrowserSettings(block_resources=False)
+    assert NetworkPolicy.from_settings(SimpleNamespace(browser=disabled, use_vision=False)) is None
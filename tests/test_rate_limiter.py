@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+
+from llm.groq_client import GroqClient
+from llm.rate_limiter import (
+    LLMUnavailableError,
+    RateLimiter,
+    TokenBucket,
+    backoff_delay,
+    retry_after_seconds,
+)
+
+
+def test_bucket_serves_burst_then_queues_in_arrival_order():
+    bucket = TokenBucket(60)  # one per second, burst of 60
+    waits = [bucket.reserve(1, now=bucket.updated) for _ in range(62)]
+    assert waits[:60] == [0.0] * 60
+    assert waits[60:] == pytest.approx([1.0, 2.0])
+
+
+def test_refund_is_capped_at_what_was_reserved():
+    bucket = TokenBucket(6000)
+    # A request estimated above capacity only reserves the capacity
+    bucket.reserve(10000, now=bucket.updated)
+    assert bucket.level == 0
+    bucket.refund(10000, actual=1000)
+    assert bucket.level == 5000
+
+
+def test_record_usage_charges_underestimates():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    asyncio.run(limiter.acquire(1000))
+    limiter.record_usage(1000, 1500)
+    assert limiter.tokens.level == pytest.approx(4500, abs=1)
+
+
+def test_limits_are_off_by_default():
+    limiter = RateLimiter()
+    waits = asyncio.run(_acquire_many(limiter, 100))
+    assert max(waits) == 0.0
+
+
+async def _acquire_many(limiter, count):
+    return [await limiter.acquire(10000) for _ in range(count)]
+
+
+def test_retry_after_seconds_and_http_date():
+    assert retry_after_seconds({"retry-after": "2.5"}) == 2.5
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 1.0, 8.0) <= 8.0
+    assert 3.0 <= backoff_delay(0, 1.0, 8.0, retry_after=3.0) <= 4.0
+
+
+class FakeTransport:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def post_json(self, url, payload, headers=None):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        if status == 200:
+            body = {"choices": [{"message": {"content": "ok"}}], "usage": {"total_tokens": 10}}
+        else:
+            body = {"error": {"message": "busy"}}
+        headers = {"retry-after": "0"} if status == 429 else {}
+        return httpx.Response(status, json=body, headers=headers)
+
+
+def _client(statuses, max_retries=4):
+    transport = FakeTransport(statuses)
+    client = GroqClient("test-key-123", "model", transport=transport, max_retries=max_retries,
+                        retry_base_delay_s=0.001)
+    return client, transport
+
+
+def test_rate_limited_call_is_retried():
+    client, transport = _client([429, 503, 200])
+    assert asyncio.run(client.chat_completion("hi")) == "ok"
+    assert transport.calls == 3
+    assert client.last_request["retries"] == 2
+
+
+def test_gives_up_after_retries_without_ending_the_task():
+    client, transport = _client([429] * 3, max_retries=2)
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(client.chat_completion("hi"))
+    assert transport.calls == 3
+
+
+def test_other_errors_are_not_retried():
+    client, transport = _client([401])
+    response = asyncio.run(client.chat_completion("hi"))
+    assert '"done"' in response
+    assert transport.calls == 1
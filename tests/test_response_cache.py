@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from llm.response_cache import CachedLLMClient, LLMCacheMiss, ResponseCache, cache_key
+
+
+def _payload(prompt, model="model", temperature=0.7):
+    return {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": 200,
+        "messages": [{"role": "system", "content": "system"}, {"role": "user", "content": prompt}],
+    }
+
+
+def test_cache_key_ignores_timestamps_only():
+    key = cache_key(_payload("Current State at 2025-01-01 10:00:00:\nURL: a"))
+    assert key == cache_key(_payload("Current State at 2026-10-17 09:09:09:\nURL: a"))
+    assert key != cache_key(_payload("Current State at 2025-01-01 10:00:00:\nURL: b"))
+    assert key != cache_key(_payload("Current State at 2025-01-01 10:00:00:\nURL: a", model="other"))
+    assert key != cache_key(_payload("Current State at 2025-01-01 10:00:00:\nURL: a", temperature=0.0))
+
+
+class FakeClient:
+    """Stands in for GroqClient: builds payloads and returns a fixed response."""
+
+    def __init__(self, response='{"action": [{"done": {}}]}', error=False):
+        self.response = response
+        self.error = error
+        self.calls = 0
+        self.last_request = {}
+
+    def _build_request(self, prompt, stream=False):
+        return _payload(prompt), {}
+
+    async def chat_completion(self, prompt):
+        self.calls += 1
+        self.last_request = {"error": "API error"} if self.error else {}
+        return self.response
+
+    async def stream_completion(self, prompt):
+        self.calls += 1
+        self.last_request = {}
+        for position in range(0, len(self.response), 5):
+            yield self.response[position:position + 5]
+
+
+def test_record_then_replay(tmp_path):
+    cache = ResponseCache(tmp_path)
+    live = FakeClient()
+    recorded = asyncio.run(CachedLLMClient(live, cache, "record").chat_completion("step 1"))
+
+    offline = FakeClient(response="never used")
+    replayed = asyncio.run(CachedLLMClient(offline, cache, "replay").chat_completion("step 1"))
+    assert replayed == recorded
+    assert offline.calls == 0
+    with pytest.raises(LLMCacheMiss):
+        asyncio.run(CachedLLMClient(offline, cache, "replay").chat_completion("step 2"))
+
+
+def test_errors_are_not_recorded(tmp_path):
+    cache = ResponseCache(tmp_path)
+    asyncio.run(CachedLLMClient(FakeClient(error=True), cache, "record").chat_completion("step 1"))
+    assert cache.get_stats()["recorded"] == 0
+
+
+def test_stream_closed_early_is_recorded_in_full(tmp_path):
+    cache = ResponseCache(tmp_path)
+    client = CachedLLMClient(FakeClient(), cache, "record")
+
+    async def read_first_chunk():
+        stream = client.stream_completion("step 1")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    asyncio.run(read_first_chunk())
+    assert cache.get(cache_key(_payload("step 1")))["response"] == FakeClient().response
+
+
+def test_responder_serves_recordings_and_misses_with_none(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put(cache_key(_payload("step 1")), _payload("step 1"), "recorded")
+    respond = cache.responder()
+    assert respond(_payload("step 1")) == "recorded"
+    assert respond(_payload("step 2")) is None
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CachedLLMClient(FakeClient(), ResponseCache(tmp_path), "rewind")
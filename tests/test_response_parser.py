@@ -0,0 +1,64 @@
+import json
+
+from llm.response_parser import IncrementalActionParser
+
+RESPONSE = json.dumps({
+    "current_state": {"evaluation_previous_goal": "Unknown", "memory": "", "next_goal": "search"},
+    "action": [
+        {"click_element": {"index": 3}},
+        {"input_text": {"index": 5, "text": "a {tricky} \"string\" ]"}},
+        {"done": {"text": "ok"}},
+    ],
+})
+
+
+def feed_in_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.append(parser.feed(text[start:start + size]))
+    completed.append(parser.finish())
+    return completed
+
+
+def test_actions_are_returned_as_their_objects_close():
+    parser = IncrementalActionParser()
+    batches = feed_in_chunks(parser, RESPONSE, 7)
+    actions = [action for batch in batches for action in batch]
+    assert actions == json.loads(RESPONSE)["action"]
+    assert parser.actions == actions
+    # Each action arrives in the chunk that closed it, not all at the end
+    assert sum(1 for batch in batches if batch) == 3
+
+
+def test_single_character_chunks():
+    parser = IncrementalActionParser()
+    feed_in_chunks(parser, RESPONSE, 1)
+    assert parser.actions == json.loads(RESPONSE)["action"]
+
+
+def test_reasoning_blocks_are_skipped_even_when_tags_are_split():
+    text = "<think>maybe {\"action\": [{\"bad\": {}}]}</think>```json\n" + RESPONSE + "\n```"
+    parser = IncrementalActionParser()
+    feed_in_chunks(parser, text, 3)
+    assert parser.actions == json.loads(RESPONSE)["action"]
+    assert "<think" not in parser.response
+    assert parser.raw == text
+
+
+def test_only_the_top_level_action_array_is_parsed():
+    text = json.dumps({
+        "current_state": {"action": [{"not": "this"}]},
+        "action": [{"scroll_down": {"amount": None}}],
+    })
+    parser = IncrementalActionParser()
+    feed_in_chunks(parser, text, 5)
+    assert parser.actions == [{"scroll_down": {"amount": None}}]
+
+
+def test_held_back_partial_tag_is_released_by_finish():
+    parser = IncrementalActionParser()
+    parser.feed('{"action": [{"go_back": {}}]} <thi')
+    assert parser.response.endswith("} ")
+    parser.finish()
+    assert parser.response.endswith("<thi")
+    assert parser.actions == [{"go_back": {}}]
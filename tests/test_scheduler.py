@@ -0,0 +1,48 @@
+import asyncio
+
+from config.settings import load_settings
+from core.scheduler import AgentScheduler
+
+
+class FakeBrowser:
+    async def initialize(self):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("page crashed")
+
+
+class FakePool:
+    """The first acquire fails; later ones lease a browser whose page crashes."""
+
+    def __init__(self):
+        self.acquired = 0
+        self.released = []
+
+    async def start(self):
+        pass
+
+    async def acquire(self, network_policy=None):
+        self.acquired += 1
+        if self.acquired == 1:
+            raise RuntimeError("Chromium failed to launch")
+        return FakeBrowser()
+
+    async def release(self, browser):
+        self.released.append(browser)
+
+    async def close(self):
+        pass
+
+
+def test_failed_acquire_fails_only_its_task():
+    settings = load_settings()
+    settings.use_vision = False
+    pool = FakePool()
+
+    results = asyncio.run(AgentScheduler(settings, pool=pool).run(["first", "second"]))
+
+    assert [result["task"] for result in results] == ["first", "second"]
+    assert "Chromium failed to launch" in results[0]["error"]
+    assert results[0]["steps"] == 0
+    # The sibling ran to its own error and returned its context
+    assert "page crashed" in results[1]["error"]
+    assert len(pool.released) == 1
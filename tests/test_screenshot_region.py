@@ -0,0 +1,79 @@
+import asyncio
+import base64
+
+from config.settings import BrowserSettings
+from core.browser import Browser
+from vision.dom_fusion import element_boxes, frame_transform, map_to_viewport
+
+
+def test_frame_transform_prefers_region_then_screenshot_region_then_viewport():
+    state = {"viewport": {"width": 1280, "height": 800},
+             "screenshot_region": {"x": 100, "y": 50, "width": 640, "height": 400}}
+    assert frame_transform(320, state) == (0.5, 100, 50)
+    assert frame_transform(640, state, region={"x": 0, "y": 0, "width": 320, "height": 200}) == (2.0, 0, 0)
+    assert frame_transform(640, {"viewport": {"width": 1280, "height": 800}}) == (0.5, 0.0, 0.0)
+    assert frame_transform(640, None) == (1.0, 0.0, 0.0)
+
+
+def test_map_to_viewport_inverts_element_boxes():
+    transform = (0.5, 100.0, 50.0)
+    element = {"index": 0, "rect": {"x": 120, "y": 70, "width": 40, "height": 20}}
+    _, boxes = element_boxes([element], transform)
+    assert boxes.tolist() == [[10, 10, 30, 20]]
+
+    results = {"detections": [{"class": "button", "bbox": boxes[0].tolist()}]}
+    mapped = map_to_viewport(results, transform)
+    assert mapped["detections"][0]["bbox"] == [120, 70, 160, 90]
+    assert mapped["text_regions"] == []
+    assert results["detections"][0]["bbox"] == [10, 10, 30, 20]
+
+
+class FakeCDP:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+        if method == "Page.getLayoutMetrics":
+            return {"cssVisualViewport": {"clientWidth": 1280, "pageX": 0, "pageY": 600},
+                    "visualViewport": {"clientWidth": 2560}}
+        return {"data": base64.b64encode(b"image").decode("ascii")}
+
+    async def detach(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.cdp = FakeCDP()
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+
+class FakePage:
+    viewport_size = {"width": 1280, "height": 800}
+
+    def __init__(self):
+        self.context = FakeContext()
+
+
+def test_clipped_capture_is_scaled_in_document_coordinates():
+    settings = BrowserSettings(screenshot_format="jpeg", screenshot_scale=0.5, screenshot_clip="0,100,640,400")
+    browser = Browser(settings, context=object())
+    page = FakePage()
+
+    assert browser._screenshot_region(page.viewport_size) == {"x": 0, "y": 100, "width": 640, "height": 400}
+    assert asyncio.run(browser._capture_screenshot(page)) == b"image"
+
+    method, params = page.context.cdp.sent[-1]
+    assert method == "Page.captureScreenshot"
+    # Scrolled 600 px down on a 2x display: the clip is offset by the scroll and
+    # scaled so 0.5 image pixels come out per CSS pixel
+    assert params["clip"] == {"x": 0, "y": 700, "width": 640, "height": 400, "scale": 0.25}
+    assert params["format"] == "jpeg" and "quality" in params
+
+
+def test_default_region_is_the_whole_viewport():
+    browser = Browser(BrowserSettings(), context=object())
+    assert browser._screenshot_region({"width": 1280, "height": 800}) == {"x": 0, "y": 0, "width": 1280, "height": 800}
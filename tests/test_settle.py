@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from config.settings import BrowserSettings
+from core.settle import PageSettler
+
+
+class Emitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, *args):
+        for handler in self.handlers.get(event, []):
+            handler(*args)
+
+
+class FakePage(Emitter):
+    def __init__(self):
+        super().__init__()
+        self.main_frame = FakeFrame(self)
+
+    async def evaluate(self, script):
+        # Painted, loaded and no recent DOM mutation
+        return {"ready": True, "quietFor": None}
+
+
+class FakeFrame:
+    def __init__(self, page):
+        self.page = page
+
+
+class FakeRequest:
+    def __init__(self, page, navigation=False):
+        self.frame = page.main_frame
+        self.navigation = navigation
+
+    def is_navigation_request(self):
+        return self.navigation
+
+
+def _settler(**overrides):
+    context = Emitter()
+    context.pages = []
+    settings = BrowserSettings(**{"settle_timeout_ms": 1000, "settle_grace_ms": 100, **overrides})
+    settler = PageSettler(context, settings)
+    page = FakePage()
+    context.emit("page", page)
+    return settler, context, page
+
+
+def test_requests_of_a_closed_page_are_dropped():
+    settler, context, page = _settler()
+    context.emit("request", FakeRequest(page))
+    assert settler.pending_requests(page) == 1
+    page.emit("close", page)
+    assert settler._inflight == {}
+
+
+def test_navigation_drops_requests_of_the_previous_document():
+    settler, context, page = _settler()
+    context.emit("request", FakeRequest(page))
+    navigation = FakeRequest(page, navigation=True)
+    context.emit("request", navigation)
+    page.emit("framenavigated", page.main_frame)
+    assert list(settler._inflight) == [navigation]
+
+
+def test_long_requests_are_pruned():
+    settler, context, page = _settler(settle_long_request_ms=1500)
+    request = FakeRequest(page)
+    context.emit("request", request)
+    settler._inflight[request] = (page, time.monotonic() - 2)
+    assert settler.pending_requests(page) == 0
+    assert settler._inflight == {}
+
+
+def test_quiet_page_is_not_settled_before_the_grace_window():
+    settler, context, page = _settler()
+    result = asyncio.run(settler.wait(page))
+    assert result["settled"]
+    assert result["waited_ms"] >= 100
+
+
+def test_request_started_by_an_action_is_waited_for():
+    settler, context, page = _settler()
+    request = FakeRequest(page)
+
+    async def click_then_fetch():
+        async def fetch():
+            await asyncio.sleep(0.03)
+            context.emit("request", request)
+            await asyncio.sleep(0.3)
+            context.emit("requestfinished", request)
+
+        task = asyncio.create_task(fetch())
+        result = await settler.wait(page)
+        await task
+        return result
+
+    result = asyncio.run(click_then_fetch())
+    assert result["settled"]
+    assert result["waited_ms"] >= 300
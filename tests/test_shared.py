@@ -0,0 +1,37 @@
+import threading
+import time
+
+from config.settings import LLMSettings, VisionSettings
+from core.shared import SharedInstances
+from llm.rate_limiter import get_rate_limiter
+from vision.executor import get_vision_executor
+
+
+def test_one_instance_per_key_even_under_concurrent_first_use():
+    built = []
+
+    def factory(*key):
+        time.sleep(0.01)
+        built.append(key)
+        return object()
+
+    shared = SharedInstances(factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(shared.get("a", 1))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == [("a", 1)]
+    assert all(result is results[0] for result in results)
+    assert shared.get("a", 2) is not results[0]
+
+
+def test_getters_share_instances_per_settings():
+    limits = LLMSettings(requests_per_minute=30, tokens_per_minute=6000)
+    assert get_rate_limiter(limits) is get_rate_limiter(limits.model_copy())
+    assert get_rate_limiter(limits) is not get_rate_limiter(limits.model_copy(update={"requests_per_minute": 10}))
+
+    vision = VisionSettings(max_workers=3)
+    assert get_vision_executor(vision) is get_vision_executor(vision.model_copy())
@@ -0,0 +1,88 @@
+import asyncio
+import base64
+
+from config.settings import BrowserSettings
+from core.browser import Browser
+
+
+class Tracker:
+    """Counts page calls in flight, to tell concurrent capture from sequential."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def call(self, value):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return value
+
+
+class FakeSettler:
+    async def wait(self, page, timeout_ms=None):
+        return {"settled": True, "waited_ms": 12}
+
+
+class FakePage:
+    url = "https://example.com"
+    viewport_size = {"width": 1280, "height": 800}
+
+    def __init__(self, tracker, title="Example"):
+        self.tracker = tracker
+        self._title = title
+
+    async def title(self):
+        if isinstance(self._title, Exception):
+            raise self._title
+        return await self.tracker.call(self._title)
+
+    async def content(self):
+        return await self.tracker.call("<html></html>")
+
+    async def evaluate(self, script, options=None):
+        return await self.tracker.call({"full": True, "elements": []})
+
+
+class FakeContext:
+    def __init__(self, pages):
+        self.pages = pages
+
+
+def make_browser():
+    tracker = Tracker()
+    page = FakePage(tracker)
+    closed = FakePage(tracker, title=RuntimeError("Target closed"))
+    browser = Browser(BrowserSettings(incremental_extraction=False), context=FakeContext([page, closed]))
+    browser.page = page
+    browser.settler = FakeSettler()
+    captures = []
+
+    async def capture(page):
+        captures.append(page)
+        return await tracker.call(b"png")
+
+    browser._capture_screenshot = capture
+    return browser, tracker, captures
+
+
+def test_state_fields_are_captured_concurrently_with_timings():
+    browser, tracker, captures = make_browser()
+    state = asyncio.run(browser.get_state(include=("screenshot_bytes", "screenshot", "tabs")))
+
+    assert tracker.max_running >= 3
+    assert state["title"] == "Example"
+    assert state["clickable_elements"] == []
+    assert not state.is_loaded("dom")
+    # The base64 screenshot reuses the raw capture
+    assert len(captures) == 1
+    assert state["screenshot"] == base64.b64encode(b"png").decode("utf-8")
+    assert state["timings"]["settle"] == 12
+    assert {"title", "clickable_elements", "screenshot_bytes", "tabs"} <= set(state["timings"])
+
+
+def test_a_failing_tab_title_does_not_fail_the_tab_list():
+    browser, _, _ = make_browser()
+    tabs = asyncio.run(browser._get_tabs_info())
+    assert [tab["title"] for tab in tabs] == ["Example", ""]
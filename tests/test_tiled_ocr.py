@@ -0,0 +1,92 @@
+import numpy as np
+
+from vision.tiled_ocr import IncrementalOCR
+
+
+class FakeRecognizer:
+    """Reports one text region per call covering the whole image it was given."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image):
+        self.calls.append(image.shape[:2])
+        height, width = image.shape[:2]
+        return [{"text": f"read {len(self.calls)}", "confidence": 0.9, "bbox": [0, 0, width, height]}]
+
+
+def blank(height=256, width=256):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def test_first_frame_and_size_change_read_the_full_frame():
+    recognize = FakeRecognizer()
+    ocr = IncrementalOCR(recognize, tile_size=64)
+    ocr(blank())
+    ocr(blank(128, 256))
+    assert recognize.calls == [(256, 256), (128, 256)]
+    assert ocr.stats["full_frame_runs"] == 2
+
+
+def test_unchanged_frame_reuses_previous_regions():
+    recognize = FakeRecognizer()
+    ocr = IncrementalOCR(recognize, tile_size=64)
+    first = ocr(blank())
+    assert ocr(blank()) == first
+    assert len(recognize.calls) == 1
+
+
+def test_only_changed_tiles_are_read_and_merged_with_unchanged_text():
+    calls = []
+
+    def recognize(image):
+        calls.append(image.shape[:2])
+        if len(calls) == 1:
+            return [
+                {"text": "kept", "confidence": 0.9, "bbox": [10, 10, 50, 30]},
+                {"text": "stale", "confidence": 0.9, "bbox": [150, 150, 190, 170]},
+            ]
+        return [{"text": "new", "confidence": 0.9, "bbox": [2, 2, 20, 12]}]
+
+    ocr = IncrementalOCR(recognize, tile_size=64, margin=8)
+    ocr(blank())
+    frame = blank()
+    frame[140:180, 140:180] = 255  # inside tile (row 2, col 2)
+    regions = ocr(frame)
+
+    # One crop: the changed tile plus the margin
+    assert calls[1] == (64 + 16, 64 + 16)
+    texts = {region["text"]: region["bbox"] for region in regions}
+    assert set(texts) == {"kept", "new"}
+    # The crop's box is mapped back to frame coordinates
+    assert texts["new"] == [128 - 8 + 2, 128 - 8 + 2, 128 - 8 + 20, 128 - 8 + 12]
+    assert ocr.stats["incremental_runs"] == 1 and ocr.stats["tiles_read"] == 1
+
+
+def test_crop_grows_over_a_text_box_it_cuts_through():
+    calls = []
+
+    def recognize(image):
+        calls.append(image.shape[:2])
+        return [{"text": "line", "confidence": 0.9, "bbox": [0, 10, 200, 30]}] if len(calls) == 1 else []
+
+    ocr = IncrementalOCR(recognize, tile_size=64, margin=8)
+    ocr(blank())
+    frame = blank()
+    frame[15:25, 5:20] = 255  # changes only the first tile, which cuts the text line
+    ocr(frame)
+
+    height, width = calls[1]
+    assert width >= 200 + 8  # the whole line is re-read
+    assert height == 64 + 8
+
+
+def test_large_change_falls_back_to_full_frame():
+    recognize = FakeRecognizer()
+    ocr = IncrementalOCR(recognize, tile_size=64, full_frame_fraction=0.5)
+    ocr(blank())
+    frame = blank()
+    frame[:, :160] = 255  # 12 of 16 tiles
+    ocr(frame)
+    assert recognize.calls[-1] == (256, 256)
+    assert ocr.stats["full_frame_runs"] == 2
@@ -0,0 +1,54 @@
+import asyncio
+
+from llm.groq_client import GroqClient
+from llm.standin_server import DEFAULT_CONTENT, StandInServer
+from llm.transport import HTTPTransport
+
+
+def run_client(server, calls, stream=False):
+    transport = HTTPTransport(http2=False)
+    client = GroqClient("test-key-123", "model", api_url=server.url, transport=transport)
+
+    async def call():
+        if stream:
+            return "".join([chunk async for chunk in client.stream_completion("hello")])
+        return await client.chat_completion("hello")
+
+    async def run():
+        try:
+            return [await call() for _ in range(calls)]
+        finally:
+            await transport.aclose()
+
+    return asyncio.run(run())
+
+
+def test_sequential_calls_reuse_one_connection():
+    server = StandInServer().start()
+    try:
+        responses = run_client(server, calls=3)
+    finally:
+        server.stop()
+    assert responses == [DEFAULT_CONTENT] * 3
+    assert server.stats == {"connections": 1, "requests": 3}
+
+
+def test_streamed_calls_reuse_one_connection():
+    server = StandInServer(chunk_size=5).start()
+    try:
+        responses = run_client(server, calls=2, stream=True)
+    finally:
+        server.stop()
+    assert responses == [DEFAULT_CONTENT] * 2
+    assert server.stats == {"connections": 1, "requests": 2}
+
+
+def test_one_client_per_event_loop():
+    transport = HTTPTransport(http2=False)
+
+    async def client():
+        return transport.client
+
+    first = asyncio.run(client())
+    second = asyncio.run(client())
+    assert first is not second
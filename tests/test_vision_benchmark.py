@@ -0,0 +1,24 @@
+from benchmarks.vision_pipeline import load_corpus, render_screenshot, summarize
+
+
+def test_corpus_is_deterministic_per_seed():
+    png, elements = render_screenshot(3)
+    assert render_screenshot(3) == (png, elements)
+    assert render_screenshot(4)[0] != png
+    assert png.startswith(b"\x89PNG")
+    assert all(element["rect"]["width"] > 0 for element in elements)
+    assert [element["index"] for element in elements] == list(range(len(elements)))
+
+
+def test_corpus_is_written_once_and_read_back(tmp_path):
+    written = load_corpus(2, seed=5, corpus_dir=tmp_path)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "frame_000.json", "frame_000.png", "frame_001.json", "frame_001.png",
+    ]
+    assert load_corpus(2, seed=99, corpus_dir=tmp_path) == written
+
+
+def test_summarize():
+    assert summarize([]) is None
+    summary = summarize([1.0, 2.0, 3.0, 4.0])
+    assert summary == {"runs": 4, "p50_ms": 2.5, "p95_ms": 3.85, "mean_ms": 2.5}
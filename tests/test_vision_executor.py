@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vision.executor import VisionBusyError, VisionExecutor
+
+
+def test_stages_run_side_by_side():
+    executor = VisionExecutor(max_workers=2)
+    barrier = threading.Barrier(2, timeout=2)
+
+    async def run():
+        # Each stage waits for the other: only passes if both run at once
+        return await asyncio.gather(
+            executor.run("detection", barrier.wait),
+            executor.run("ocr", barrier.wait),
+        )
+
+    asyncio.run(run())
+    stats = executor.get_stats()
+    assert stats["detection"]["runs"] == 1 and stats["ocr"]["runs"] == 1
+    executor.shutdown()
+
+
+def test_a_stage_at_its_queue_depth_rejects_the_next_frame():
+    executor = VisionExecutor(max_workers=2, queue_depth=1)
+    release = threading.Event()
+
+    async def run():
+        first = asyncio.ensure_future(executor.run("ocr", release.wait, 2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(VisionBusyError):
+            await executor.run("ocr", time.sleep, 0)
+        release.set()
+        await first
+
+    asyncio.run(run())
+    assert executor.get_stats()["ocr"]["rejected"] == 1
+    executor.shutdown()
+
+
+def test_timed_out_job_keeps_counting_until_it_returns():
+    executor = VisionExecutor(max_workers=1, queue_depth=1, stage_timeout_s=0.05)
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run("detection", release.wait, 2)
+        assert executor.get_stats()["detection"]["in_flight"] == 1
+        with pytest.raises(VisionBusyError):
+            await executor.run("detection", time.sleep, 0)
+
+    asyncio.run(run())
+    release.set()
+    deadline = time.monotonic() + 2
+    while executor.get_stats()["detection"]["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = executor.get_stats()["detection"]
+    assert stats["in_flight"] == 0 and stats["timeouts"] == 1
+    executor.shutdown()
+
+
+def test_errors_are_counted_and_raised():
+    executor = VisionExecutor()
+
+    def fail():
+        raise ValueError("bad frame")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run("ocr", fail))
+    assert executor.get_stats()["ocr"]["errors"] == 1
+    executor.shutdown()
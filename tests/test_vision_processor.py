@@ -0,0 +1,79 @@
+import asyncio
+
+import cv2
+import numpy as np
+
+from config.settings import VisionSettings
+from vision.vision_processor import VisionProcessor
+
+
+def png(image):
+    ok, encoded = cv2.imencode(".png", image)
+    return encoded.tobytes()
+
+
+def page(block_y=40):
+    image = np.full((200, 320, 3), 240, dtype=np.uint8)
+    image[block_y:block_y + 60, 40:280] = 30
+    return image
+
+
+def make_processor(tmp_path, **settings):
+    settings = VisionSettings(**{
+        "use_easyocr": False,
+        "incremental_ocr": False,
+        "reuse_unchanged_frames": True,
+        "use_result_cache": True,
+        "cache_dir": str(tmp_path),
+        **settings,
+    })
+    processor = VisionProcessor(settings)
+    processor.model = True  # models are never loaded; detection is replaced below
+    processor.ocr_reader = False
+    calls = []
+
+    async def detect(image):
+        calls.append(image.shape)
+        return [{"class": "button", "confidence": 0.9, "bbox": [40, 40, 280, 100]}]
+
+    processor._run_object_detection = detect
+    return processor, calls
+
+
+def test_frame_after_a_cache_hit_can_still_be_reused(tmp_path):
+    processor, calls = make_processor(tmp_path)
+    first, other = png(page()), png(page(block_y=120))
+    blink = page()
+    blink[150, 300] = 0  # a caret blink: new bytes, same page
+    blink = png(blink)
+
+    async def run():
+        await processor.process(first, None)
+        await processor.process(other, None)
+        cached = await processor.process(first, None)
+        reused = await processor.process(blink, None)
+        return cached, reused
+
+    cached, reused = asyncio.run(run())
+    assert cached.get("cached") is True
+    assert reused.get("reused") is True
+    assert len(calls) == 2
+    assert processor.stats["frame_reuse_hits"] == 1
+
+
+def test_misses_are_only_counted_when_reuse_is_attempted(tmp_path):
+    processor, calls = make_processor(tmp_path / "off", reuse_unchanged_frames=False)
+    asyncio.run(processor.process(png(page()), None))
+    asyncio.run(processor.process(png(page(block_y=120)), None))
+    assert len(calls) == 2
+    assert processor.stats["frame_reuse_misses"] == 0
+
+    processor, calls = make_processor(tmp_path / "clips", use_result_cache=False)
+    clip = {"image": png(page()), "region": {"x": 0, "y": 0, "width": 320, "height": 200}}
+    asyncio.run(processor.process_clips([clip, clip], None))
+    assert len(calls) == 2
+    assert processor.stats["frame_reuse_misses"] == 0
+
+    asyncio.run(processor.process(png(page()), None))
+    asyncio.run(processor.process(png(page(block_y=120)), None))
+    assert processor.stats["frame_reuse_misses"] == 2
@@ -0,0 +1,68 @@
+import json
+import os
+
+import numpy as np
+
+from config.settings import load_settings
+from vision.detection_backends import DetectionBackend
+from vision.result_cache import VisionResultCache
+from vision.vision_processor import VisionProcessor
+
+
+def _results(text):
+    return {"detections": [], "text_regions": [{"text": text, "confidence": 0.9, "bbox": [0, 0, 10, 10]}]}
+
+
+def test_key_depends_on_pixels_and_version():
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    key = VisionResultCache.make_key(image, "v1")
+    assert key == VisionResultCache.make_key(image.copy(), "v1")
+    assert key != VisionResultCache.make_key(image, "v2")
+    assert key != VisionResultCache.make_key(np.ones((4, 4, 3), dtype=np.uint8), "v1")
+    assert VisionResultCache.make_key(b"png", "v1") != VisionResultCache.make_key(b"jpg", "v1")
+
+
+def test_lru_spills_to_disk_and_promotes_back(tmp_path):
+    entry_size = len(json.dumps(_results("a")))
+    cache = VisionResultCache(max_bytes=entry_size * 2, cache_dir=tmp_path)
+    for key in ("a", "b", "c"):
+        cache.put(key, _results(key), inference_s=0.5)
+
+    assert cache.stats["evictions"] == 1
+    assert (tmp_path / "a.json").exists()
+    assert cache.get("a") == _results("a")
+    assert cache.stats["disk_hits"] == 1
+    assert cache.get("missing") is None
+    assert cache.get_stats()["saved_inference_s"] == 0.5
+
+
+def _state(text):
+    return {
+        "viewport": {"width": 1280, "height": 800},
+        "clickable_elements": [{"index": 0, "text": text, "rect": {"x": 10, "y": 10, "width": 80, "height": 30}}],
+    }
+
+
+def test_masked_results_are_keyed_by_the_dom():
+    vision = load_settings().vision
+    masking = VisionProcessor(vision.model_copy(update={"ocr_dom_masking": True}))
+    assert masking._results_version(_state("Sign in")) != masking._results_version(_state("Sign out"))
+    assert masking._results_version(_state("Sign in")) == masking._results_version(_state("Sign in"))
+    assert masking._results_version({}) == masking.model_version
+
+    plain = VisionProcessor(vision.model_copy(update={"ocr_dom_masking": False}))
+    assert plain._results_version(_state("Sign in")) == plain._results_version(_state("Sign out"))
+
+
+def test_detector_version_tells_same_named_weights_apart(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first, second = tmp_path / "a" / "yolov8n.pt", tmp_path / "b" / "yolov8n.pt"
+    first.write_bytes(b"weights")
+    second.write_bytes(b"weights")
+    version = DetectionBackend(first).version
+    assert version != DetectionBackend(second).version
+
+    # Weights rewritten in place get a new version
+    os.utime(first, ns=(1, 1))
+    assert DetectionBackend(first).version != version
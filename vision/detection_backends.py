@@ -0,0 +1,266 @@
+import hashlib
+import logging
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+
+class DetectionBackend:
+    """
+    YOLO detector bound to one inference runtime and input size.
+
+    "torch" runs the .pt weights through ultralytics as before. "onnx" and
+    "openvino" export the weights once at the configured imgsz, cache the
+    export under export_dir, and run it through ultralytics' ONNX Runtime or
+    OpenVINO inference path, which is considerably faster on CPU. With int8,
+    the ONNX export is dynamically quantized with onnxruntime and the OpenVINO
+    export uses ultralytics' int8 calibration.
+    """
+
+    def __init__(self, model_path, backend="torch", imgsz=640, int8=False, export_dir="models"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown detection backend {backend!r}, expected one of {BACKENDS}")
+        self.model_path = Path(model_path)
+        self.backend = backend
+        self.imgsz = imgsz
+        self.int8 = int8 and backend != "torch"
+        self.export_dir = Path(export_dir)
+        # Fixed for the life of the backend, so its version (and the cache keys
+        # built on it) does not change when ultralytics downloads the weights
+        self.weights_id = self._weights_id()
+        self.model = None
+        # One instance is shared by every agent; ultralytics predictors are not thread-safe
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "total_ms": 0.0, "load_ms": 0.0}
+
+    @classmethod
+    def from_settings(cls, vision_settings):
+        """Build the backend selected in VisionSettings."""
+        return cls(
+            vision_settings.yolo_model_path,
+            backend=vision_settings.detection_backend,
+            imgsz=vision_settings.detection_imgsz,
+            int8=vision_settings.detection_int8,
+            export_dir=vision_settings.model_export_dir,
+        )
+
+    @property
+    def key(self):
+        """The constructor arguments that select a model: weights path, runtime, input size and int8."""
+        return (str(self.model_path.resolve()), self.backend, self.imgsz, self.int8)
+
+    @property
+    def version(self):
+        """Identifies the weights, runtime and input size producing the detections."""
+        version = f"{self.model_path.stem}-{self.weights_id}:{self.backend}:{self.imgsz}"
+        return version + ":int8" if self.int8 else version
+
+    def _weights_id(self):
+        """
+        Short hash of the weights' full path, size and modification time, so
+        same-named weights in different directories, or weights rewritten in
+        place, never share cached detections.
+        """
+        path = self.model_path.resolve()
+        try:
+            stat = path.stat()
+            identity = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            # Not on disk (yet): ultralytics downloads named weights on first load
+            identity = str(self.model_path)
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:12]
+
+    def _export_path(self):
+        """Cached export location, named by the weights identity so other or rewritten weights never reuse it."""
+        suffix = "_int8" if self.int8 else ""
+        name = f"{self.model_path.stem}-{self.weights_id}_{self.imgsz}{suffix}"
+        if self.backend == "onnx":
+            return self.export_dir / f"{name}.onnx"
+        return self.export_dir / f"{name}_openvino_model"
+
+    def _export(self):
+        """Export the weights for this backend unless a cached export exists; return its path."""
+        from ultralytics import YOLO
+
+        target = self._export_path()
+        if target.exists():
+            return target
+
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Exporting {self.model_path} to {self.backend} at imgsz={self.imgsz}")
+        model = YOLO(str(self.model_path))
+        if self.backend == "onnx":
+            exported = Path(model.export(format="onnx", imgsz=self.imgsz))
+            if self.int8:
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                quantize_dynamic(str(exported), str(target), weight_type=QuantType.QUInt8)
+                exported.unlink()
+            else:
+                shutil.move(str(exported), target)
+        else:
+            exported = Path(model.export(format="openvino", imgsz=self.imgsz, int8=self.int8))
+            shutil.move(str(exported), target)
+        logger.info(f"Cached {self.backend} export at {target}")
+        return target
+
+    def load(self):
+        """Load (exporting first if needed) the model for this backend."""
+        with self._lock:
+            if self.model is not None:
+                return self.model
+            from ultralytics import YOLO
+
+            start = time.perf_counter()
+            if self.backend == "torch":
+                self.model = YOLO(str(self.model_path))
+            else:
+                self.model = YOLO(str(self._export()), task="detect")
+            self.stats["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            logger.info(f"Loaded {self.version} detector in {self.stats['load_ms']} ms")
+            return self.model
+
+    def warmup(self):
+        """Run one inference on a blank frame so the first real frame does not pay for setup."""
+        model = self.load()
+        with self._lock:
+            model(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), imgsz=self.imgsz, verbose=False)
+
+    def detect(self, image):
+        """
+        Run detection on a BGR image and return a list of detections with
+        "class", "confidence" and "bbox" ([x1, y1, x2, y2]).
+        """
+        model = self.load()
+        with self._lock:
+            start = time.perf_counter()
+            results = model(image, imgsz=self.imgsz, verbose=False)
+        detections = []
+        for result in results:
+            for box in result.boxes:
+                cls_id = int(box.cls[0].item())
+                detections.append({
+                    "class": result.names.get(cls_id, "unknown") if result.names else "unknown",
+                    "confidence": float(box.conf[0]),
+                    "bbox": box.xyxy[0].tolist()
+                })
+        self.stats["calls"] += 1
+        self.stats["total_ms"] += (time.perf_counter() - start) * 1000
+        return detections
+
+    def get_stats(self):
+        """Return call count, mean latency and load time for this backend."""
+        calls = self.stats["calls"]
+        return {
+            "backend": self.version,
+            "calls": calls,
+            "mean_ms": round(self.stats["total_ms"] / calls, 1) if calls else None,
+            "load_ms": self.stats["load_ms"],
+        }
+
+
+def _iou(box, boxes):
+    """IoU of one [x1, y1, x2, y2] box against an (N, 4) array of boxes."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+
+def detection_agreement(reference, candidate, iou_threshold=0.5):
+    """
+    Compare two detection lists. Detections are matched greedily by
+    confidence to the unmatched reference box of the same class with the
+    highest IoU above iou_threshold. Returns precision and recall of the
+    candidate against the reference and the mean IoU of the matches.
+    """
+    if not reference and not candidate:
+        return {"precision": 1.0, "recall": 1.0, "mean_iou": 1.0, "matched": 0}
+
+    ref_boxes = np.array([d["bbox"] for d in reference], dtype=float).reshape(-1, 4)
+    ref_classes = [d["class"] for d in reference]
+    unmatched = np.ones(len(reference), dtype=bool)
+    ious = []
+
+    for detection in sorted(candidate, key=lambda d: d["confidence"], reverse=True):
+        if not unmatched.any():
+            break
+        overlap = _iou(np.array(detection["bbox"], dtype=float), ref_boxes)
+        same_class = np.array([c == detection["class"] for c in ref_classes])
+        overlap = np.where(unmatched & same_class, overlap, 0.0)
+        best = int(np.argmax(overlap))
+        if overlap[best] >= iou_threshold:
+            unmatched[best] = False
+            ious.append(float(overlap[best]))
+
+    matched = len(ious)
+    return {
+        "precision": matched / len(candidate) if candidate else 1.0,
+        "recall": matched / len(reference) if reference else 1.0,
+        "mean_iou": sum(ious) / matched if matched else 0.0,
+        "matched": matched,
+    }
+
+
+def compare_backends(images, backends, warmup=1):
+    """
+    Run every backend over the images and report per-backend mean latency
+    and agreement with the first backend, which serves as the reference.
+    """
+    outputs = {}
+    for backend in backends:
+        backend.load()
+        for _ in range(warmup):
+            backend.detect(images[0])
+        latencies = []
+        detections = []
+        for image in images:
+            start = time.perf_counter()
+            detections.append(backend.detect(image))
+            latencies.append((time.perf_counter() - start) * 1000)
+        outputs[backend.version] = (latencies, detections)
+
+    reference = outputs[backends[0].version][1]
+    report = {}
+    for version, (latencies, detections) in outputs.items():
+        agreements = [detection_agreement(ref, cand) for ref, cand in zip(reference, detections)]
+        report[version] = {
+            "mean_ms": round(float(np.mean(latencies)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "precision": round(float(np.mean([a["precision"] for a in agreements])), 3),
+            "recall": round(float(np.mean([a["recall"] for a in agreements])), 3),
+            "mean_iou": round(float(np.mean([a["mean_iou"] for a in agreements])), 3),
+        }
+    return report
+
+
+# For comparing backends on local screenshots:
+if __name__ == "__main__":
+    import argparse
+    import json
+    import cv2
+
+    parser = argparse.ArgumentParser(description="Compare YOLO detection backends")
+    parser.add_argument("images", nargs="+", help="Screenshots to run detection on")
+    parser.add_argument("--model", default="yolov8x.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--int8", action="store_true", help="Also compare int8 variants")
+    args = parser.parse_args()
+
+    images = [cv2.imread(path) for path in args.images]
+    backends = [DetectionBackend(args.model, name, args.imgsz) for name in args.backends]
+    if args.int8:
+        backends += [DetectionBackend(args.model, name, args.imgsz, int8=True)
+                     for name in args.backends if name != "torch"]
+    print(json.dumps(compare_backends(images, backends), indent=2))
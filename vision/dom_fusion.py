@@ -0,0 +1,140 @@
+import hashlib
+import json
+import re
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize(text):
+    return _NON_WORD.sub(" ", str(text)).strip().lower()
+
+
+def _element_texts(element):
+    """All text the DOM already gives the LLM for an element."""
+    attributes = element.get("attributes") or {}
+    texts = [element.get("text"), attributes.get("aria-label"), attributes.get("placeholder"), attributes.get("value")]
+    return [_normalize(text) for text in texts if text]
+
+
+def frame_transform(image_width, state, region=None):
+    """
+    Relate image pixels to viewport CSS pixels, the space of the DOM rects.
+
+    region is the viewport area (CSS pixels) the image shows; it defaults to
+    the state's "screenshot_region", then to the whole viewport. Returns
+    (scale, x, y): image pixels per CSS pixel and the CSS position of the
+    image's top-left corner, so css = image / scale + (x, y).
+    """
+    state = state or {}
+    region = region or state.get("screenshot_region") or state.get("viewport")
+    if not region or not region.get("width"):
+        return 1.0, 0.0, 0.0
+    return image_width / region["width"], region.get("x", 0.0), region.get("y", 0.0)
+
+
+def elements_digest(state, region=None):
+    """
+    Short hash of what DOM masking depends on: the rect and known texts of
+    every clickable element, and the viewport area the image shows (with the
+    same fallbacks as frame_transform).
+    """
+    state = state or {}
+    region = region or state.get("screenshot_region") or state.get("viewport")
+    digest = hashlib.sha256(json.dumps(region, sort_keys=True, default=str).encode("utf-8"))
+    for element in state.get("clickable_elements") or []:
+        rect = element.get("rect") or {}
+        material = [rect.get(key) for key in ("x", "y", "width", "height")] + _element_texts(element)
+        digest.update(json.dumps(material, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def element_boxes(elements, transform=(1.0, 0.0, 0.0)):
+    """Return the elements with a rect and their boxes as an (N, 4) array of image-pixel [x1, y1, x2, y2]."""
+    scale, x, y = transform
+    with_rect = [element for element in elements if element.get("rect")]
+    rects = np.array(
+        [[e["rect"]["x"], e["rect"]["y"], e["rect"]["width"], e["rect"]["height"]] for e in with_rect],
+        dtype=float,
+    ).reshape(-1, 4)
+    boxes = np.empty_like(rects)
+    boxes[:, :2] = rects[:, :2] - (x, y)
+    boxes[:, 2:] = boxes[:, :2] + rects[:, 2:]
+    return with_rect, boxes * scale
+
+
+def map_to_viewport(vision_results, transform):
+    """Return a copy of vision results with every bbox mapped from image pixels to viewport CSS pixels."""
+    scale, x, y = transform
+
+    def to_css(bbox):
+        x1, y1, x2, y2 = (float(v) for v in bbox)
+        return [round(x1 / scale + x, 1), round(y1 / scale + y, 1), round(x2 / scale + x, 1), round(y2 / scale + y, 1)]
+
+    mapped = dict(vision_results)
+    for field in ("detections", "text_regions"):
+        mapped[field] = [dict(item, bbox=to_css(item["bbox"])) for item in vision_results.get(field, [])]
+    return mapped
+
+
+def mask_known_text(image, elements, transform=(1.0, 0.0, 0.0), max_height=80):
+    """
+    Return a copy of image with the boxes of elements whose text the DOM
+    already provides flattened to their mean colour, plus the fraction of the
+    image that was masked.
+
+    Only elements no taller than max_height CSS pixels are masked: buttons,
+    links, labels and inputs hold a line or two of text, while a tall
+    clickable card may also contain images or canvas text that OCR should
+    still read.
+    """
+    elements, boxes = element_boxes(elements, transform)
+    if not len(boxes):
+        return image, 0.0
+
+    keep = np.array([bool(_element_texts(element)) for element in elements])
+    keep &= (boxes[:, 3] - boxes[:, 1]) <= max_height * transform[0]
+    height, width = image.shape[:2]
+    boxes = np.clip(np.round(boxes[keep]), 0, [width, height, width, height]).astype(int)
+
+    masked = image.copy()
+    covered = np.zeros((height, width), dtype=bool)
+    for x1, y1, x2, y2 in boxes:
+        if x2 > x1 and y2 > y1:
+            region = masked[y1:y2, x1:x2]
+            region[:] = region.mean(axis=(0, 1))
+            covered[y1:y2, x1:x2] = True
+    return masked, float(covered.mean())
+
+
+def drop_dom_duplicates(text_regions, elements, transform=(1.0, 0.0, 0.0)):
+    """
+    Remove OCR text regions whose text is already in the DOM: a region is
+    dropped when its centre lies inside an element whose text, aria-label,
+    placeholder or value contains the recognized text. Returns the kept
+    regions and the number dropped.
+    """
+    elements, boxes = element_boxes(elements, transform)
+    if not text_regions or not len(boxes):
+        return list(text_regions), 0
+
+    region_boxes = np.array([region["bbox"] for region in text_regions], dtype=float).reshape(-1, 4)
+    centers_x = (region_boxes[:, 0] + region_boxes[:, 2]) / 2
+    centers_y = (region_boxes[:, 1] + region_boxes[:, 3]) / 2
+    # inside[i, j]: centre of region i lies in element j
+    inside = (
+        (centers_x[:, None] >= boxes[None, :, 0]) & (centers_x[:, None] <= boxes[None, :, 2])
+        & (centers_y[:, None] >= boxes[None, :, 1]) & (centers_y[:, None] <= boxes[None, :, 3])
+    )
+
+    texts = [_element_texts(element) for element in elements]
+    kept = []
+    for region, candidates in zip(text_regions, inside):
+        text = _normalize(region.get("text", ""))
+        duplicate = bool(text) and any(
+            text in known for j in np.flatnonzero(candidates) for known in texts[j]
+        )
+        if not duplicate:
+            kept.append(region)
+    return kept, len(text_regions) - len(kept)
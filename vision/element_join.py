@@ -0,0 +1,54 @@
+import numpy as np
+
+from vision.dom_fusion import element_boxes
+
+
+def annotate_with_elements(vision_results, elements, min_overlap=0.5):
+    """
+    Join vision boxes to the clickable elements they lie on.
+
+    Every detection and text region is matched, in one vectorized pass, to
+    the element covering at least min_overlap of its box; when several do,
+    the smallest (most specific) element wins. Matched boxes get the
+    element's "element_index"; unmatched ones get a "click_target" [x, y] for
+    the click_coordinates action. Boxes must already be in viewport CSS
+    pixels (see map_to_viewport). Annotations from an earlier join are
+    replaced, so results can be re-joined to a newer DOM. Returns a new
+    results dict; the input is left untouched.
+    """
+    fields = [field for field in ("detections", "text_regions") if vision_results.get(field)]
+    boxes = [item["bbox"] for field in fields for item in vision_results[field]]
+    if not boxes:
+        return vision_results
+
+    regions = np.array(boxes, dtype=float).reshape(-1, 4)
+    elements, targets = element_boxes(elements or [])
+
+    # overlap[i, j]: fraction of region i covered by element j
+    width = np.minimum(regions[:, None, 2], targets[None, :, 2]) - np.maximum(regions[:, None, 0], targets[None, :, 0])
+    height = np.minimum(regions[:, None, 3], targets[None, :, 3]) - np.maximum(regions[:, None, 1], targets[None, :, 1])
+    intersection = np.clip(width, 0, None) * np.clip(height, 0, None)
+    region_area = np.maximum((regions[:, 2] - regions[:, 0]) * (regions[:, 3] - regions[:, 1]), 1e-9)
+    overlap = intersection / region_area[:, None]
+
+    # Among qualifying elements pick the smallest, so a button wins over the card around it
+    target_area = (targets[:, 2] - targets[:, 0]) * (targets[:, 3] - targets[:, 1])
+    ranked = np.where(overlap >= min_overlap, target_area[None, :], np.inf)
+    best = np.argmin(ranked, axis=1) if len(targets) else np.zeros(len(regions), dtype=int)
+    matched = np.isfinite(ranked[np.arange(len(regions)), best]) if len(targets) else np.zeros(len(regions), dtype=bool)
+
+    centers = np.column_stack(((regions[:, 0] + regions[:, 2]) / 2, (regions[:, 1] + regions[:, 3]) / 2))
+    annotated = dict(vision_results)
+    position = 0
+    for field in fields:
+        items = []
+        for item in vision_results[field]:
+            item = {key: value for key, value in item.items() if key not in ("element_index", "click_target")}
+            if matched[position]:
+                item["element_index"] = elements[best[position]]["index"]
+            else:
+                item["click_target"] = [round(float(v)) for v in centers[position]]
+            items.append(item)
+            position += 1
+        annotated[field] = items
+    return annotated
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.shared import SharedInstances
+
+logger = logging.getLogger(__name__)
+
+
+class VisionBusyError(RuntimeError):
+    """Raised when a vision stage already has its maximum number of frames in flight."""
+
+
+def _limit_intra_op_threads(threads):
+    """Worker initializer: cap the threads OpenCV and PyTorch use inside one inference."""
+    if threads <= 0:
+        return
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+class VisionExecutor:
+    """
+    Dedicated thread pool for vision inference.
+
+    Detection and OCR run here instead of the event loop's default executor,
+    so they never compete with the app's other to_thread work, and both
+    stages of one frame can run side by side. Each stage may have at most
+    queue_depth frames in flight; a further frame is rejected with
+    VisionBusyError instead of queueing behind a slow one. Callers stop
+    waiting after stage_timeout_s. A timed-out job keeps its worker until the
+    model returns, and keeps counting against the queue depth until then.
+
+    Threads rather than processes: the models release the GIL during
+    inference and are too large to copy into worker processes. intra_op_threads
+    bounds the threads each inference spawns, so workers * intra_op_threads
+    can be kept at or below the core count.
+    """
+
+    def __init__(self, max_workers=2, queue_depth=2, stage_timeout_s=10.0, intra_op_threads=0):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.stage_timeout_s = stage_timeout_s
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="vision",
+            initializer=_limit_intra_op_threads,
+            initargs=(intra_op_threads,),
+        )
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _stage_stats(self, stage):
+        return self.stats.setdefault(
+            stage, {"runs": 0, "rejected": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0}
+        )
+
+    def _release(self, stage, start, future):
+        with self._lock:
+            self._in_flight[stage] -= 1
+            stats = self._stage_stats(stage)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                stats["errors"] += 1
+            else:
+                stats["runs"] += 1
+                stats["total_ms"] += (time.perf_counter() - start) * 1000
+
+    async def run(self, stage, fn, *args):
+        """
+        Run fn(*args) on the vision pool as the given stage and return its result.
+
+        Raises VisionBusyError when the stage is at its queue depth and
+        asyncio.TimeoutError when it takes longer than stage_timeout_s.
+        """
+        with self._lock:
+            if self._in_flight.get(stage, 0) >= self.queue_depth:
+                self._stage_stats(stage)["rejected"] += 1
+                raise VisionBusyError(f"Vision stage {stage!r} already has {self.queue_depth} frames in flight")
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+
+        start = time.perf_counter()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._release(stage, start, f))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.stage_timeout_s)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._stage_stats(stage)["timeouts"] += 1
+            logger.warning(f"Vision stage {stage!r} timed out after {self.stage_timeout_s} seconds")
+            raise
+
+    def get_stats(self):
+        """Return per-stage run, rejection, timeout and error counts with mean latency."""
+        with self._lock:
+            report = {}
+            for stage, stats in self.stats.items():
+                report[stage] = dict(stats, in_flight=self._in_flight.get(stage, 0))
+                runs = stats["runs"]
+                report[stage]["mean_ms"] = round(stats["total_ms"] / runs, 1) if runs else None
+                del report[stage]["total_ms"]
+            return report
+
+    def shutdown(self):
+        """Stop the workers without waiting for running inferences."""
+        self._executor.shutdown(wait=False)
+
+
+_shared_executors = SharedInstances(VisionExecutor)
+
+
+def get_vision_executor(vision_settings):
+    """The vision executor for these settings; concurrent agents share its bounded pool."""
+    return _shared_executors.get(
+        vision_settings.max_workers,
+        vision_settings.queue_depth,
+        vision_settings.stage_timeout_s,
+        vision_settings.intra_op_threads,
+    )
@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+
+
+def tile_signature(image, grid=(32, 20)):
+    """
+    Compute a tile hash of a BGR image: the mean luminance of each cell of a
+    grid (columns, rows), as a small uint8 array.
+
+    Area averaging makes the signature insensitive to single-pixel noise such
+    as a blinking caret or antialiasing, while any real layout or content
+    change moves the mean of at least one cell.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return cv2.resize(gray, grid, interpolation=cv2.INTER_AREA)
+
+
+def changed_cells(signature_a, signature_b, pixel_threshold=6):
+    """
+    Return a boolean grid marking the cells whose mean luminance differs by
+    more than pixel_threshold between two signatures.
+    """
+    diff = cv2.absdiff(signature_a, signature_b)
+    return diff > pixel_threshold
+
+
+def changed_fraction(signature_a, signature_b, pixel_threshold=6):
+    """Return the fraction of grid cells that changed between two signatures."""
+    if signature_a is None or signature_b is None or signature_a.shape != signature_b.shape:
+        return 1.0
+    return float(np.count_nonzero(changed_cells(signature_a, signature_b, pixel_threshold))) / signature_a.size
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from vision.detection_backends import DetectionBackend
+
+logger = logging.getLogger(__name__)
+
+
+class SharedOCRReader:
+    """
+    EasyOCR reader shared across agents. readtext calls are serialized because
+    the reader keeps per-call state on its recognizer; every other attribute
+    is passed through to the reader.
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self._lock = threading.Lock()
+
+    def readtext(self, image, **kwargs):
+        with self._lock:
+            return self.reader.readtext(image, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.reader, name)
+
+
+class ModelRegistry:
+    """
+    Process-wide owner of the vision models.
+
+    Every VisionProcessor, YoloDetector and OCRProcessor asks the registry for
+    its models, so YOLO and EasyOCR are loaded once per process however many
+    agents or helpers use them. preload() loads and warms the models on a
+    background thread at startup, so the first agent step does not pay for
+    loading; a caller that needs a model before preload finishes simply
+    waits for the same load instead of starting a second one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._detectors = {}
+        self._ocr_readers = {}
+        self._ocr_locks = {}
+        self._preloads = {}
+        self.stats = {"load_ms": {}, "warmup_ms": {}}
+
+    def detector(self, model_path, backend="torch", imgsz=640, int8=False, export_dir="models"):
+        """Return the shared DetectionBackend for this model, runtime and input size (loaded on first use)."""
+        return self._shared_detector(
+            DetectionBackend(model_path, backend=backend, imgsz=imgsz, int8=int8, export_dir=export_dir)
+        )
+
+    def detector_for(self, vision_settings):
+        """Return the shared DetectionBackend selected in VisionSettings."""
+        return self._shared_detector(DetectionBackend.from_settings(vision_settings))
+
+    def _shared_detector(self, candidate):
+        with self._lock:
+            # Keyed by the constructor arguments: the version of weights that are
+            # not downloaded yet changes once they are on disk
+            return self._detectors.setdefault(candidate.key, candidate)
+
+    def ocr_reader(self, languages=("en",)):
+        """Return the shared EasyOCR reader for these languages, loading it on first use."""
+        key = tuple(languages)
+        with self._lock:
+            load_lock = self._ocr_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            if key not in self._ocr_readers:
+                import easyocr
+                start = time.perf_counter()
+                self._ocr_readers[key] = SharedOCRReader(easyocr.Reader(list(key)))
+                self.stats["load_ms"][f"easyocr:{'+'.join(key)}"] = round((time.perf_counter() - start) * 1000, 1)
+                logger.info(f"Loaded EasyOCR reader for {key}")
+            return self._ocr_readers[key]
+
+    def _warm_ocr(self, reader):
+        image = np.full((64, 256, 3), 255, dtype=np.uint8)
+        cv2.putText(image, "warmup", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        reader.readtext(image)
+
+    def _load_all(self, vision_settings):
+        """Load and warm every model the settings use; failures are logged and left to the first caller."""
+        detector = self.detector_for(vision_settings)
+        try:
+            detector.load()
+            self.stats["load_ms"][detector.version] = detector.stats["load_ms"]
+            start = time.perf_counter()
+            detector.warmup()
+            self.stats["warmup_ms"][detector.version] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception as e:
+            logger.error(f"Failed to preload YOLO model: {e}")
+
+        if vision_settings.use_easyocr:
+            try:
+                reader = self.ocr_reader()
+                start = time.perf_counter()
+                self._warm_ocr(reader)
+                self.stats["warmup_ms"]["easyocr:en"] = round((time.perf_counter() - start) * 1000, 1)
+            except ImportError:
+                logger.warning("EasyOCR not installed. Text detection will be skipped.")
+            except Exception as e:
+                logger.error(f"Failed to preload EasyOCR model: {e}")
+        logger.info(f"Vision models ready: {self.stats}")
+
+    def preload(self, vision_settings):
+        """
+        Start loading and warming the models for these settings on a
+        background thread. Returns a Future that completes when they are
+        ready; calling it again for the same settings returns the same Future.
+        """
+        key = (self.detector_for(vision_settings).key, vision_settings.use_easyocr)
+        with self._lock:
+            future = self._preloads.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            self._preloads[key] = future
+
+        def run():
+            try:
+                future.set_result(self._load_all(vision_settings))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="vision-preload", daemon=True).start()
+        return future
+
+    def get_stats(self):
+        """Return model load and warmup times in milliseconds."""
+        return {name: dict(times) for name, times in self.stats.items()}
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry():
+    """Return the process-wide model registry."""
+    return _registry
@@ -1,9 +1,9 @@
-import easyocr
+from vision.model_registry import get_model_registry
 
 class OCRProcessor:
     def __init__(self):
-        # Initialize the EasyOCR reader for English language.
-        self.reader = easyocr.Reader(['en'])
+        # Use the process-wide EasyOCR reader for English language.
+        self.reader = get_model_registry().ocr_reader(['en'])
 
     def recognize(self, image):
         """
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from core.shared import SharedInstances
+
+logger = logging.getLogger(__name__)
+
+
+class VisionResultCache:
+    """
+    Content-addressed cache of vision results.
+
+    Entries are keyed by a hash of the encoded screenshot plus the model
+    version, so a page that comes back with identical pixels (a login page, a
+    search results template) skips detection and OCR even in a later task.
+    The in-memory tier is an LRU bounded by the serialized size of its
+    entries. With a cache directory, entries evicted from memory spill to disk
+    as JSON files and are promoted back on a disk hit.
+    """
+
+    def __init__(self, max_bytes, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()  # key -> (results, size, inference seconds)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "saved_inference_s": 0.0,
+        }
+
+    @staticmethod
+    def make_key(screenshot, model_version):
+        """Hash the screenshot content (encoded bytes or decoded array) with the model version."""
+        digest = hashlib.sha256()
+        if isinstance(screenshot, np.ndarray):
+            digest.update(repr(screenshot.shape).encode())
+            digest.update(np.ascontiguousarray(screenshot).data)
+        elif isinstance(screenshot, str):
+            digest.update(screenshot.encode())
+        else:
+            digest.update(screenshot)
+        digest.update(b"\0" + model_version.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return cached results for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["saved_inference_s"] += entry[2]
+                return entry[0]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            results, inference_s = entry
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+            self.stats["saved_inference_s"] += inference_s
+        self.put(key, results, inference_s)
+        return results
+
+    def put(self, key, results, inference_s):
+        """Store results computed in inference_s seconds, evicting least recently used entries."""
+        payload = json.dumps(results, default=float)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        spilled = []
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (results, size, inference_s)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, (old_results, old_size, old_inference_s) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.stats["evictions"] += 1
+                spilled.append((old_key, old_results, old_inference_s))
+
+        for old_key, old_results, old_inference_s in spilled:
+            self._write_disk(old_key, old_results, old_inference_s)
+
+    def _disk_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return data["results"], data["inference_s"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vision cache entry {path}: {e}")
+            return None
+
+    def _write_disk(self, key, results, inference_s):
+        if not self.cache_dir:
+            return
+        try:
+            payload = {"results": results, "inference_s": inference_s}
+            self._disk_path(key).write_text(json.dumps(payload, default=float), encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"Failed to spill vision cache entry to disk: {e}")
+
+    def hit_ratio(self):
+        """Return the fraction of lookups served from the cache."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def get_stats(self):
+        """Return the cache counters, hit ratio and current memory use."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        stats["hit_ratio"] = round(self.hit_ratio(), 3)
+        stats["saved_inference_s"] = round(stats["saved_inference_s"], 3)
+        return stats
+
+
+_shared_caches = SharedInstances(VisionResultCache)
+
+
+def get_shared_cache(vision_settings):
+    """The results cache for these settings, reused across agents and tasks."""
+    return _shared_caches.get(vision_settings.cache_max_bytes, vision_settings.cache_dir)
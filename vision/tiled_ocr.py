@@ -0,0 +1,148 @@
+import logging
+import threading
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _merge_overlapping(rects):
+    """Merge intersecting [x1, y1, x2, y2] rectangles until none overlap."""
+    rects = [list(rect) for rect in rects]
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        merged = []
+        for rect in rects:
+            for other in merged:
+                if _intersects(rect, other):
+                    other[:] = [min(rect[0], other[0]), min(rect[1], other[1]),
+                                max(rect[2], other[2]), max(rect[3], other[3])]
+                    merged_any = True
+                    break
+            else:
+                merged.append(rect)
+        rects = merged
+    return rects
+
+
+class IncrementalOCR:
+    """
+    Re-reads only the screen regions that changed since the previous frame.
+
+    The frame is split into square tiles and diffed against the previous
+    frame. Changed tiles are grouped into connected rectangles, each grown by
+    a margin and by any previous text box it touches so that a line of text is
+    never read half-cut. OCR runs on those crops only; its boxes are remapped
+    to frame coordinates and merged with the cached text regions that lie
+    entirely in unchanged areas. A first frame, a size change, or a change
+    covering more than full_frame_fraction of the tiles falls back to
+    full-frame OCR.
+    """
+
+    def __init__(self, recognize, tile_size=64, pixel_threshold=24, full_frame_fraction=0.5, margin=8):
+        # recognize(image) -> list of {"text", "confidence", "bbox": [x1, y1, x2, y2]}
+        self.recognize = recognize
+        self.tile_size = tile_size
+        self.pixel_threshold = pixel_threshold
+        self.full_frame_fraction = full_frame_fraction
+        self.margin = margin
+        self._previous_gray = None
+        self._previous_regions = None
+        # A timed-out call may still be running when the next frame arrives
+        self._lock = threading.Lock()
+        self.stats = {"full_frame_runs": 0, "incremental_runs": 0, "tiles_read": 0, "tiles_total": 0}
+
+    def reset(self):
+        """Forget the previous frame so the next call reads the full frame."""
+        self._previous_gray = None
+        self._previous_regions = None
+
+    def _changed_tiles(self, gray):
+        """Return a boolean grid (rows, cols) of tiles whose pixels changed."""
+        height, width = gray.shape
+        tile = self.tile_size
+        rows, cols = -(-height // tile), -(-width // tile)
+        diff = cv2.absdiff(gray, self._previous_gray)
+        padded = np.zeros((rows * tile, cols * tile), dtype=diff.dtype)
+        padded[:height, :width] = diff
+        tile_max = padded.reshape(rows, tile, cols, tile).max(axis=(1, 3))
+        return tile_max > self.pixel_threshold
+
+    def _changed_rects(self, changed, shape):
+        """Group changed tiles into pixel rectangles [x1, y1, x2, y2] around each connected area."""
+        height, width = shape
+        tile = self.tile_size
+        count, _, stats, _ = cv2.connectedComponentsWithStats(changed.astype(np.uint8), connectivity=8)
+        rects = []
+        for label in range(1, count):
+            col, row, cols, rows = stats[label][:4]
+            rects.append([
+                max(0, int(col) * tile - self.margin),
+                max(0, int(row) * tile - self.margin),
+                min(width, int(col + cols) * tile + self.margin),
+                min(height, int(row + rows) * tile + self.margin),
+            ])
+
+        # Grow each rectangle over previous text boxes it cuts through, until
+        # no box is left partly inside a rectangle
+        for rect in rects:
+            grown = True
+            while grown:
+                grown = False
+                for region in self._previous_regions:
+                    x1, y1, x2, y2 = (int(v) for v in region["bbox"])
+                    inside = rect[0] <= x1 and rect[1] <= y1 and x2 <= rect[2] and y2 <= rect[3]
+                    if _intersects(rect, region["bbox"]) and not inside:
+                        rect[0] = max(0, min(rect[0], x1 - self.margin))
+                        rect[1] = max(0, min(rect[1], y1 - self.margin))
+                        rect[2] = min(width, max(rect[2], x2 + self.margin))
+                        rect[3] = min(height, max(rect[3], y2 + self.margin))
+                        grown = True
+
+        # Merge rectangles that now overlap so no text is read twice
+        return _merge_overlapping(rects)
+
+    def __call__(self, image):
+        """Return the text regions of image, reading only what changed since the last call."""
+        with self._lock:
+            return self._read(image)
+
+    def _read(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        full = self._previous_gray is None or self._previous_gray.shape != gray.shape
+
+        if not full:
+            changed = self._changed_tiles(gray)
+            self.stats["tiles_total"] += changed.size
+            changed_count = int(np.count_nonzero(changed))
+            if changed_count == 0:
+                self._previous_gray = gray
+                return list(self._previous_regions)
+            full = changed_count > self.full_frame_fraction * changed.size
+
+        if full:
+            regions = self.recognize(image)
+            self.stats["full_frame_runs"] += 1
+        else:
+            rects = self._changed_rects(changed, gray.shape)
+            regions = [
+                region for region in self._previous_regions
+                if not any(_intersects(rect, region["bbox"]) for rect in rects)
+            ]
+            for x1, y1, x2, y2 in rects:
+                for region in self.recognize(image[y1:y2, x1:x2]):
+                    bx1, by1, bx2, by2 = region["bbox"]
+                    region["bbox"] = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+                    regions.append(region)
+            self.stats["incremental_runs"] += 1
+            self.stats["tiles_read"] += changed_count
+            logger.debug(f"Incremental OCR read {changed_count}/{changed.size} tiles in {len(rects)} regions")
+
+        self._previous_gray = gray
+        self._previous_regions = regions
+        return list(regions)
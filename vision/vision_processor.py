@@ -3,28 +3,86 @@ import cv2
 import numpy as np
 import logging
 import asyncio
-from io import BytesIO
-from PIL import Image
+import time
+from vision.dom_fusion import drop_dom_duplicates, elements_digest, frame_transform, map_to_viewport, mask_known_text
+from vision.element_join import annotate_with_elements
+from vision.executor import VisionBusyError, get_vision_executor
+from vision.model_registry import get_model_registry
+from vision.frame_hash import tile_signature, changed_fraction
+from vision.result_cache import VisionResultCache, get_shared_cache
+from vision.tiled_ocr import IncrementalOCR
 
 logger = logging.getLogger(__name__)
 
+
+def decode_screenshot(screenshot):
+    """
+    Decode a screenshot into a BGR NumPy image.
+
+    Accepts raw encoded bytes (PNG, JPEG or WebP), an already decoded NumPy
+    image (returned as is), or base64 text for callers that still pass it.
+    Raw bytes are wrapped without copying and decoded once by cv2.imdecode,
+    which produces BGR directly.
+    """
+    if isinstance(screenshot, np.ndarray):
+        return screenshot
+    if isinstance(screenshot, str):
+        screenshot = base64.b64decode(screenshot)
+    image = cv2.imdecode(np.frombuffer(screenshot, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Screenshot could not be decoded")
+    return image
+
+
 class VisionProcessor:
     def __init__(self, vision_settings):
         self.yolo_model_path = vision_settings.yolo_model_path
         self.use_easyocr = vision_settings.use_easyocr
+        # Models are shared by every processor through the registry; the
+        # detector runs on the runtime (PyTorch, ONNX Runtime or OpenVINO) chosen in the settings
+        self.registry = get_model_registry()
+        self.detector = self.registry.detector_for(vision_settings)
         self.model = None
         self.ocr_reader = None
         
-        # Lazy-load the models when first needed
-        # This avoids loading them if they're not used
+        # Models are preloaded at startup; otherwise they load when first needed
+        
+        # Reuse of results when the frame has not changed since the last step
+        self.reuse_unchanged_frames = vision_settings.reuse_unchanged_frames
+        self.frame_change_tolerance = vision_settings.frame_change_tolerance
+        self.frame_pixel_threshold = vision_settings.frame_pixel_threshold
+        self._last_signature = None
+        self._last_results = None
+        self._last_version = None
+        self.stats = {"frame_reuse_hits": 0, "frame_reuse_misses": 0, "ocr_masked_fraction": 0.0, "ocr_dom_duplicates": 0}
+        
+        # OCR skips the text the DOM already provides for clickable elements
+        self.ocr_dom_masking = vision_settings.ocr_dom_masking
+        self.ocr_mask_max_height = vision_settings.ocr_mask_max_height
+        self.element_min_overlap = vision_settings.element_min_overlap
+        
+        # OCR that re-reads only the tiles that changed since the previous frame
+        self.incremental_ocr = None
+        if vision_settings.incremental_ocr:
+            self.incremental_ocr = IncrementalOCR(
+                self._recognize_text,
+                tile_size=vision_settings.ocr_tile_size,
+                full_frame_fraction=vision_settings.ocr_full_frame_fraction,
+            )
+        
+        # Results cache shared by every processor in the process
+        self.cache = get_shared_cache(vision_settings) if vision_settings.use_result_cache else None
+        
+        # Bounded worker pool shared by every processor in the process
+        self.executor = get_vision_executor(vision_settings)
         
     async def _load_models(self):
         """Load YOLO and OCR models when first needed"""
         if self.model is None:
             try:
-                from ultralytics import YOLO
-                logger.info(f"Loading YOLO model from {self.yolo_model_path}")
-                self.model = YOLO(self.yolo_model_path)
+                logger.info(f"Loading YOLO model {self.detector.version} from {self.yolo_model_path}")
+                # Waits for the preload instead of loading twice if it is still running
+                self.model = await asyncio.to_thread(self.detector.load)
                 logger.info("YOLO model loaded successfully")
             except Exception as e:
                 logger.error(f"Failed to load YOLO model: {e}")
@@ -32,9 +90,8 @@ class VisionProcessor:
         
         if self.use_easyocr and self.ocr_reader is None:
             try:
-                import easyocr
                 logger.info("Loading EasyOCR model")
-                self.ocr_reader = easyocr.Reader(['en'])
+                self.ocr_reader = await asyncio.to_thread(self.registry.ocr_reader)
                 logger.info("EasyOCR model loaded successfully")
             except ImportError:
                 logger.warning("EasyOCR not installed. Text detection will be skipped.")
@@ -43,112 +100,206 @@ class VisionProcessor:
                 logger.error(f"Failed to load EasyOCR model: {e}")
                 self.ocr_reader = False
 
-    async def process(self, screenshot_base64, state):
+    @property
+    def model_version(self):
+        """Identifies the models producing results, so cached results are never mixed across models."""
+        return f"yolo={self.detector.version};easyocr={self.use_easyocr};dom_mask={self.ocr_dom_masking}"
+
+    def _results_version(self, state, region=None):
+        """
+        model_version, plus a digest of the DOM when OCR masks it: masked OCR
+        output depends on the elements as well as the pixels.
         """
-        Process a screenshot (provided as a base64 string) and return vision analysis.
+        if self.ocr_dom_masking and (state or {}).get("clickable_elements"):
+            return f"{self.model_version};dom={elements_digest(state, region)}"
+        return self.model_version
+
+    async def process(self, screenshot, state, region=None):
+        """
+        Process a screenshot and return vision analysis.
+
+        The screenshot is normally the raw bytes from Playwright; a decoded
+        NumPy image or base64 text is also accepted (see decode_screenshot).
+        It may be downscaled or show only part of the viewport: region is the
+        viewport area it shows in CSS pixels (default: the state's
+        "screenshot_region", else the whole viewport). Boxes are returned in
+        viewport CSS pixels, annotated with the index of the clickable element
+        they lie on, or with a coordinate click target when they lie on none
+        (see annotate_with_elements).
+        """
+        results = await self._analyze(screenshot, state, region)
+        return self._to_viewport(results, state, region)
+
+    async def process_clips(self, clips, state):
+        """
+        Process per-element screenshot clips, each a dict with the encoded
+        "image" and the viewport "region" it shows, and return their merged
+        analysis in viewport CSS pixels. Clips run one after another so the
+        stages stay within the executor's queue depth.
+        """
+        merged = {"detections": [], "text_regions": []}
+        for clip in clips:
+            # Clips of different elements are not successive frames
+            results = await self._analyze(clip["image"], state, clip["region"], track_frames=False)
+            if results.get("error"):
+                merged.setdefault("errors", []).append(results["error"])
+            if results.get("image_size"):
+                transform = frame_transform(results["image_size"][0], state, clip["region"])
+                results = map_to_viewport(results, transform)
+            merged["detections"] += results["detections"]
+            merged["text_regions"] += results["text_regions"]
+        
+        elements = (state or {}).get("clickable_elements")
+        return annotate_with_elements(merged, elements, self.element_min_overlap) if elements else merged
+
+    def _to_viewport(self, results, state, region=None):
+        """Map results from image pixels to viewport CSS pixels and join them to the state's elements."""
+        if not results.get("image_size"):
+            return results
+        results = map_to_viewport(results, frame_transform(results["image_size"][0], state, region))
+        elements = (state or {}).get("clickable_elements")
+        if not elements:
+            return results
+        return annotate_with_elements(results, elements, self.element_min_overlap)
+
+    async def _analyze(self, screenshot, state, region=None, track_frames=True):
+        """
+        Run detection and OCR on the screenshot, serving cached or reused
+        results where possible. Boxes are in image pixels. With track_frames,
+        the image is treated as the next frame of the page for frame reuse and
+        incremental OCR.
         """
         # Load models if needed
         await self._load_models()
         
-        # Decode the screenshot from base64 to a NumPy array image
         try:
-            # Convert base64 to bytes
-            screenshot_bytes = base64.b64decode(screenshot_base64)
+            # Identical pixels seen before, in this task or another, are served from the cache
+            version = self._results_version(state, region)
+            cache_key = None
+            if self.cache:
+                cache_key = VisionResultCache.make_key(screenshot, version)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Vision results served from cache")
+                    if track_frames:
+                        # Keep the signature so a near-identical next frame can still be reused
+                        self._last_signature = (
+                            tile_signature(decode_screenshot(screenshot)) if self.reuse_unchanged_frames else None
+                        )
+                        self._last_results = cached
+                        self._last_version = version
+                    return dict(cached, cached=True)
             
-            # Convert to PIL Image first
-            image_pil = Image.open(BytesIO(screenshot_bytes))
+            # Decode straight to a BGR NumPy array
+            image = decode_screenshot(screenshot)
             
-            # Convert PIL to OpenCV format (numpy array)
-            image = cv2.cvtColor(np.array(image_pil), cv2.COLOR_RGB2BGR)
+            # Skip inference when the page looks the same as last time
+            signature = tile_signature(image)
+            if track_frames and self.reuse_unchanged_frames:
+                if self._last_results is not None and version == self._last_version:
+                    changed = changed_fraction(self._last_signature, signature, self.frame_pixel_threshold)
+                    if changed <= self.frame_change_tolerance:
+                        self.stats["frame_reuse_hits"] += 1
+                        logger.info(f"Frame unchanged ({changed:.1%} of tiles differ), reusing vision results")
+                        return dict(self._last_results, reused=True)
+                self.stats["frame_reuse_misses"] += 1
+            inference_start = time.perf_counter()
             
             # Initialize results
             analysis_results = {
                 "detections": [],
-                "text_regions": []
+                "text_regions": [],
+                "image_size": [image.shape[1], image.shape[0]]
             }
             
-            # Run YOLO detection if model loaded successfully
+            # Run YOLO detection and OCR concurrently for the models that loaded successfully
+            stages = {}
             if self.model and self.model is not False:
-                try:
-                    detections = await self._run_object_detection(image)
-                    analysis_results["detections"] = detections
-                except Exception as e:
-                    logger.error(f"Error in object detection: {e}")
-            
-            # Run OCR if enabled and loaded successfully
+                stages["detections"] = ("object detection", self._run_object_detection(image))
             if self.ocr_reader and self.ocr_reader is not False:
-                try:
-                    text_regions = await self._run_ocr(image)
-                    analysis_results["text_regions"] = text_regions
-                except Exception as e:
-                    logger.error(f"Error in OCR: {e}")
+                stages["text_regions"] = ("OCR", self._run_ocr(image, state, region, incremental=track_frames))
+            outcomes = await asyncio.gather(*(stage for _, stage in stages.values()), return_exceptions=True)
             
+            complete = True
+            for (field, (name, _)), outcome in zip(stages.items(), outcomes):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    logger.error(f"Timed out in {name}")
+                elif isinstance(outcome, VisionBusyError):
+                    logger.warning(f"Skipped {name}: {outcome}")
+                elif isinstance(outcome, BaseException):
+                    logger.error(f"Error in {name}: {outcome}")
+                else:
+                    analysis_results[field] = outcome
+                    continue
+                complete = False
+            
+            # Partial results are returned but never reused or cached
+            if not complete:
+                return analysis_results
+            
+            if track_frames:
+                self._last_signature = signature
+                self._last_results = analysis_results
+                self._last_version = version
+            if cache_key:
+                self.cache.put(cache_key, analysis_results, time.perf_counter() - inference_start)
             return analysis_results
             
         except Exception as e:
             logger.error(f"Failed to process screenshot: {e}")
             return {"error": str(e), "detections": [], "text_regions": []}
 
+    def get_stats(self):
+        """Return the vision counters, including frame reuse and result cache statistics."""
+        stats = dict(self.stats)
+        stats["detection"] = self.detector.get_stats()
+        stats["executor"] = self.executor.get_stats()
+        stats["models"] = self.registry.get_stats()
+        if self.incremental_ocr:
+            stats["ocr"] = dict(self.incremental_ocr.stats)
+        if self.cache:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
     async def _run_object_detection(self, image):
         """Run YOLO object detection on the image"""
-        detections = []
-        
-        # Run in a thread to avoid blocking the event loop
-        def detect():
-            results = self.model(image)
-            obj_detections = []
-            
-            for result in results:
-                boxes = result.boxes
-                for i, box in enumerate(boxes):
-                    # Get box coordinates (x1, y1, x2, y2 format)
-                    coords = box.xyxy[0].tolist()
-                    # Get confidence score
-                    conf = float(box.conf[0])
-                    # Get class ID and name
-                    cls_id = int(box.cls[0].item())
-                    cls_name = result.names[cls_id]
-                    
-                    obj_detections.append({
-                        "class": cls_name,
-                        "confidence": conf,
-                        "bbox": coords
-                    })
-            
-            return obj_detections
-        
-        # Run detection in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        detections = await loop.run_in_executor(None, detect)
-        
-        return detections
+        return await self.executor.run("detection", self.detector.detect, image)
 
-    async def _run_ocr(self, image):
-        """Run OCR on the image to detect text"""
-        text_regions = []
+    def _recognize_text(self, image):
+        """Run EasyOCR on an image and return text regions with x1,y1,x2,y2 boxes"""
+        results = self.ocr_reader.readtext(image)
+        regions = []
         
-        # Run in a thread to avoid blocking the event loop
-        def recognize_text():
-            results = self.ocr_reader.readtext(image)
-            regions = []
+        for bbox, text, conf in results:
+            # Convert bbox points to x1,y1,x2,y2 format
+            x_coords = [point[0] for point in bbox]
+            y_coords = [point[1] for point in bbox]
+            x1, y1 = min(x_coords), min(y_coords)
+            x2, y2 = max(x_coords), max(y_coords)
             
-            for bbox, text, conf in results:
-                # Convert bbox points to x1,y1,x2,y2 format
-                x_coords = [point[0] for point in bbox]
-                y_coords = [point[1] for point in bbox]
-                x1, y1 = min(x_coords), min(y_coords)
-                x2, y2 = max(x_coords), max(y_coords)
-                
-                regions.append({
-                    "text": text,
-                    "confidence": conf,
-                    "bbox": [x1, y1, x2, y2]
-                })
-            
-            return regions
+            regions.append({
+                "text": text,
+                "confidence": conf,
+                "bbox": [x1, y1, x2, y2]
+            })
         
-        # Run OCR in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        text_regions = await loop.run_in_executor(None, recognize_text)
+        return regions
+
+    async def _run_ocr(self, image, state=None, region=None, incremental=True):
+        """
+        Run OCR on the image to detect text, incrementally when enabled. With
+        DOM masking, clickable elements whose text is in the state are blanked
+        out first and OCR text duplicating the DOM is dropped.
+        """
+        recognize_text = (incremental and self.incremental_ocr) or self._recognize_text
+        elements = (state or {}).get("clickable_elements") if self.ocr_dom_masking else None
+        if not elements:
+            return await self.executor.run("ocr", recognize_text, image)
         
+        transform = frame_transform(image.shape[1], state, region)
+        masked, fraction = mask_known_text(image, elements, transform, self.ocr_mask_max_height)
+        text_regions = await self.executor.run("ocr", recognize_text, masked)
+        text_regions, duplicates = drop_dom_duplicates(text_regions, elements, transform)
+        self.stats["ocr_masked_fraction"] = round(fraction, 3)
+        self.stats["ocr_dom_duplicates"] += duplicates
         return text_regions
\ No newline at end of file
@@ -1,9 +1,10 @@
-from ultralytics import YOLO
+from vision.model_registry import get_model_registry
 
 class YoloDetector:
-    def __init__(self, model_path):
-        # Load the YOLOv8x model from the given path
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, backend="torch", imgsz=640, int8=False):
+        # Use the process-wide YOLOv8x model for this path and runtime, loading it if needed
+        self.backend = get_model_registry().detector(model_path, backend=backend, imgsz=imgsz, int8=int8)
+        self.model = self.backend.load()
 
     def detect(self, image):
         """
@@ -18,21 +19,7 @@ class YoloDetector:
             - "class": Detected class name
             - "confidence": Confidence score of the detection
         """
-        results = self.model(image)
-        detections = []
-        for result in results:
-            # Iterate over detected boxes in each result
-            for box in result.boxes:
-                coords = box.xyxy[0].tolist()  # [x1, y1, x2, y2]
-                confidence = box.conf[0].item()
-                class_id = int(box.cls[0].item())
-                class_name = result.names.get(class_id, "unknown") if result.names else "unknown"
-                detections.append({
-                    "bbox": coords,
-                    "class": class_name,
-                    "confidence": confidence
-                })
-        return detections
+        return self.backend.detect(image)
 
 # For testing purposes:
 if __name__ == "__main__":